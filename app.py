@@ -1,11 +1,13 @@
 import os
 import sqlite3 
 from flask import Flask, request
-from sqlalchemy import event, inspect
+from sqlalchemy import event
 from sqlalchemy.engine import Engine
-from core.database import db
+from core.database import db, apply_sqlite_pragmas
 from core.models import ContactType, TaskStatus, FavoriteContact, MeetingType, MeetingNote
+from core.migrations import migrate
 from core.config import Config
+from services.event_stream import init_event_stream
 
 from routes.main import main_bp
 from routes.tasks import tasks_bp
@@ -16,47 +18,35 @@ from routes.dashboard import dashboard_bp
 from routes.reports import reports_bp
 from routes.meetings import meetings_bp
 from routes.export import export_bp
+from routes.events import events_bp
 
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
 db.init_app(app)
+init_event_stream(app)
 
 
 @event.listens_for(Engine, "connect")
 def set_sqlite_pragma(dbapi_connection, connection_record):
     if isinstance(dbapi_connection, sqlite3.Connection):
-        cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
-        cursor.close()
-
-        dbapi_connection.create_function("lower", 1, lambda x: x.lower() if x else None)
+        pragmas = {'foreign_keys': 'ON'}
+        pragmas.update(app.config['SQLITE_PROFILES'][app.config['SQLITE_PROFILE']])
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
 
 
 def init_db():
-    db.create_all()
-
-    # --- Миграция: добавление новых колонок в существующие таблицы ---
-    inspector = inspect(db.engine)
-    contacts_columns = [col['name'] for col in inspector.get_columns('contacts')]
-    if 'is_self' not in contacts_columns:
-        db.session.execute(db.text("ALTER TABLE contacts ADD COLUMN is_self BOOLEAN NOT NULL DEFAULT 0"))
-    if 'is_team' not in contacts_columns:
-        db.session.execute(db.text("ALTER TABLE contacts ADD COLUMN is_team BOOLEAN NOT NULL DEFAULT 0"))
+    # Схема: одна проверка версии, при отставании — недостающие миграции (core.migrations)
+    migrate()
 
-    # meeting_notes.category
-    if 'meeting_notes' in inspector.get_table_names():
-        mn_columns = [col['name'] for col in inspector.get_columns('meeting_notes')]
-        if 'category' not in mn_columns:
-            db.session.execute(db.text("ALTER TABLE meeting_notes ADD COLUMN category VARCHAR(20) DEFAULT 'note'"))
+    # FTS5 полнотекстовый поиск: перестройка только при смене схемы или расхождении индекса
+    from services.search_service import ensure_fts_index
+    ensure_fts_index()
 
-    db.session.commit()
-
-    # FTS5 полнотекстовый поиск
-    from services.search_service import init_fts_tables, rebuild_fts_index
-    init_fts_tables()
-    rebuild_fts_index()
+    # Очередь импорта живёт в памяти: незавершённые до перезапуска задачи — failed
+    from services.import_jobs import fail_interrupted_jobs
+    fail_interrupted_jobs()
 
     # Init Contact Types
     if not ContactType.query.first():
@@ -100,6 +90,12 @@ def init_db():
             db.session.add(TaskStatus(name=item['name'], color=item['color']))
         db.session.commit()
 
+    # Схема/данные могли смениться в обход ORM — снимок дашборда и индекс тегов строим заново
+    from services.dashboard_cache import invalidate_dashboard
+    from services.tag_index import invalidate_tag_index
+    invalidate_dashboard()
+    invalidate_tag_index()
+
 # Register Blueprints
 app.register_blueprint(main_bp)
 app.register_blueprint(tasks_bp, url_prefix='/api')
@@ -110,6 +106,7 @@ app.register_blueprint(dashboard_bp, url_prefix='/api')
 app.register_blueprint(reports_bp, url_prefix='/api')
 app.register_blueprint(meetings_bp, url_prefix='/api')
 app.register_blueprint(export_bp, url_prefix='/api')
+app.register_blueprint(events_bp, url_prefix='/api')
 
 @app.errorhandler(404)
 def page_not_found(e):
@@ -4,6 +4,29 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///kbase.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Профиль PRAGMA SQLite, применяемый на каждом соединении (app.set_sqlite_pragma).
+    # Сравнение профилей под конкурентной нагрузкой: scripts/bench_sqlite_profiles.py
+    SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'performance')
+    SQLITE_PROFILES = {
+        # Настройки SQLite по умолчанию: rollback-журнал, читатели ждут писателя
+        'default': {},
+        'performance': {
+            'journal_mode': 'WAL',       # читатели не блокируются записью
+            'synchronous': 'NORMAL',     # в WAL не теряет целостность, fsync только на checkpoint
+            'mmap_size': 256 * 1024 * 1024,
+            'cache_size': -64 * 1024,    # в КиБ (отрицательное значение) — 64 МиБ на соединение
+            'temp_store': 'MEMORY',
+            'busy_timeout': 5000,        # мс ожидания блокировки вместо мгновенного "database is locked"
+        },
+    }
+
+    # Поток изменений /api/events (services.event_stream): размер журнала для
+    # возобновления по Last-Event-ID, heartbeat и время жизни соединения в секундах
+    EVENT_STREAM_BUFFER = 1000
+    EVENT_STREAM_HEARTBEAT = 15
+    EVENT_STREAM_MAX_AGE = 300
+    EVENT_STREAM_RETRY_MS = 3000
+
     # LLM Gateway (для AI-анализа встреч)
     LLM_GATEWAY_URL = os.environ.get('LLM_GATEWAY_URL', 'http://localhost:8000')
     LLM_GATEWAY_SECRET = os.environ.get('LLM_GATEWAY_SECRET', '')
\ No newline at end of file
@@ -5,3 +5,11 @@ class Base(DeclarativeBase):
     pass
 
 db = SQLAlchemy(model_class=Base)
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas):
+    """Выполняет PRAGMA из словаря {имя: значение} на DB-API соединении SQLite."""
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
@@ -0,0 +1,216 @@
+"""
+Версионные миграции схемы БД.
+
+Таблица schema_version хранит по строке на применённую миграцию;
+текущая версия — MAX(version). При старте migrate() читает её одним
+запросом и, если она совпадает с последней версией MIGRATIONS, больше
+ничего не делает. Иначе недостающие миграции применяются по порядку,
+каждая отмечается в schema_version после успешного выполнения.
+
+БД без schema_version (новая или созданная до появления миграций) —
+версия 0: create_all создаёт недостающие таблицы, затем выполняются все
+миграции. Поэтому миграции идемпотентны: колонка добавляется, только если
+её нет, индекс строится, только если его нет.
+
+Новая миграция — функция с декоратором @migration(следующий номер, описание)
+в конце списка. Новая таблица создаётся в миграции через create_tables().
+
+Вспомогательные функции:
+- add_column     — ALTER TABLE ADD COLUMN, если колонки нет;
+- backfill       — заполнение колонки пачками по MIGRATION_BATCH_SIZE строк,
+                   каждая пачка в своей транзакции (запись не блокируется надолго);
+- build_indexes  — «онлайн»-построение индексов моделей: по одному индексу
+                   на транзакцию, в WAL читатели при этом не блокируются.
+"""
+import logging
+import time
+from datetime import datetime
+from core.database import db
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_BATCH_SIZE = 1000
+
+MIGRATIONS = []  # [(version, description, fn)] по возрастанию version
+
+
+def migration(version, description):
+    def register(fn):
+        if MIGRATIONS and version <= MIGRATIONS[-1][0]:
+            raise ValueError(f'Миграция {version} объявлена не по порядку')
+        MIGRATIONS.append((version, description, fn))
+        return fn
+    return register
+
+
+def latest_version():
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+# --- schema_version ---
+
+def _execute(sql, params=None):
+    return db.session.execute(db.text(sql), params or {})
+
+
+def current_version():
+    """Текущая версия схемы; None, если таблицы schema_version ещё нет."""
+    try:
+        return _execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").scalar()
+    except Exception:
+        db.session.rollback()
+        return None
+
+
+def _mark_applied(version, description):
+    _execute(
+        "INSERT INTO schema_version (version, description, applied_at) VALUES (:v, :d, :at)",
+        {'v': version, 'd': description, 'at': datetime.now().isoformat(sep=' ', timespec='seconds')}
+    )
+    db.session.commit()
+
+
+def migrate():
+    """
+    Приводит схему к последней версии. Возвращает список применённых версий.
+    """
+    version = current_version()
+    if version == latest_version():
+        return []
+
+    if version is None:
+        db.create_all()
+        _execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT,
+                applied_at TEXT NOT NULL
+            )
+        """)
+        db.session.commit()
+        version = 0
+
+    applied = []
+    for number, description, fn in MIGRATIONS:
+        if number <= version:
+            continue
+        started = time.time()
+        fn()
+        db.session.commit()
+        _mark_applied(number, description)
+        applied.append(number)
+        logger.info('Миграция %s: %s (%.2fs)', number, description, time.time() - started)
+    return applied
+
+
+# --- Вспомогательные операции ---
+
+def table_columns(table):
+    return {row[1] for row in _execute(f"PRAGMA table_info({table})")}
+
+
+def create_tables(*models):
+    """Создаёт таблицы моделей (вместе с их индексами), если их нет."""
+    for model in models:
+        model.__table__.create(db.session.connection(), checkfirst=True)
+    db.session.commit()
+
+
+def add_column(table, column, ddl):
+    """ALTER TABLE ADD COLUMN, если колонки нет. Возвращает True, если добавлена."""
+    if column in table_columns(table):
+        return False
+    _execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+    db.session.commit()
+    return True
+
+
+def backfill(table, column, source, transform, batch_size=None):
+    """
+    Заполняет table.column значениями transform(source) пачками по id:
+    каждая пачка — отдельная транзакция. Возвращает число обработанных строк.
+    """
+    batch_size = batch_size or MIGRATION_BATCH_SIZE
+    last_id, total = 0, 0
+    while True:
+        rows = _execute(
+            f"SELECT id, {source} FROM {table} WHERE id > :last ORDER BY id LIMIT :n",
+            {'last': last_id, 'n': batch_size}
+        ).all()
+        if not rows:
+            return total
+        _execute(
+            f"UPDATE {table} SET {column} = :value WHERE id = :id",
+            [{'id': row_id, 'value': transform(value)} for row_id, value in rows]
+        )
+        db.session.commit()
+        last_id = rows[-1][0]
+        total += len(rows)
+
+
+def build_indexes(*tables):
+    """
+    Строит недостающие индексы моделей (всех таблиц или перечисленных)
+    по одному на транзакцию. Возвращает имена построенных индексов.
+    """
+    existing = {name for (name,) in _execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    built = []
+    for table in tables or db.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            index.create(db.session.connection())
+            db.session.commit()
+            built.append(index.name)
+    if built:
+        # Статистика планировщика для таблиц с новыми индексами
+        _execute("PRAGMA optimize")
+        db.session.commit()
+    return built
+
+
+# --- Миграции ---
+
+@migration(1, 'contacts.is_self, contacts.is_team, meeting_notes.category')
+def _contact_flags_and_note_category():
+    add_column('contacts', 'is_self', 'BOOLEAN NOT NULL DEFAULT 0')
+    add_column('contacts', 'is_team', 'BOOLEAN NOT NULL DEFAULT 0')
+    add_column('meeting_notes', 'category', "VARCHAR(20) DEFAULT 'note'")
+
+
+@migration(2, 'Колонки *_folded для регистронезависимого поиска и сортировки')
+def _folded_columns():
+    from core.models import FOLDED_MODELS, fold
+    for model in FOLDED_MODELS:
+        table = model.__table__
+        for folded, source in model.__folded__.items():
+            if add_column(table.name, folded, f'VARCHAR({table.c[folded].type.length})'):
+                backfill(table.name, folded, source, fold)
+
+
+@migration(3, 'Вторичные индексы горячих запросов (задачи, журнал, встречи, теги)')
+def _secondary_indexes():
+    build_indexes()
+
+
+@migration(4, 'Колонки *_stem с основами слов для стеммированного FTS-индекса')
+def _stemmed_columns():
+    from core.models import STEMMED_MODELS
+    from core.stemmer import stem_text
+    # Триггеры FTS прежней схемы ({table}_ai/_ad/_au) вызывают SQL-функцию fts_stem,
+    # которой больше нет: удаляем их до заполнения. Таблицы и триггеры FTS заново
+    # создаёт ensure_fts_index при старте (новая FTS_SCHEMA_VERSION)
+    for model in STEMMED_MODELS:
+        for suffix in ('ai', 'ad', 'au'):
+            _execute(f"DROP TRIGGER IF EXISTS {model.__table__.name}_{suffix}")
+    db.session.commit()
+    for model in STEMMED_MODELS:
+        table = model.__table__.name
+        for stemmed, source in model.__stemmed__.items():
+            if add_column(table, stemmed, 'TEXT'):
+                backfill(table, stemmed, source, stem_text)
+
+
+@migration(5, 'import_jobs.upload_path: временные файлы прерванных импортов')
+def _import_job_upload_path():
+    add_column('import_jobs', 'upload_path', 'VARCHAR(500)')
@@ -1,15 +1,56 @@
+import json
+from sqlalchemy import event, inspect
 from core.database import db
 from datetime import datetime
+from core.stemmer import stem_text
+
+
+# --- CASE FOLDING ---
+# Регистронезависимые сравнения и сортировка идут по хранимым колонкам *_folded
+# с B-tree индексами: встроенный lower() SQLite понимает только ASCII.
+# Значение вычисляется в Python при записи: default колонки — для любых
+# INSERT (в том числе Core executemany), before_update — для изменений через ORM.
+
+def fold(value):
+    """Нормализованная форма строки для сравнения без учёта регистра (Unicode casefold)."""
+    return value.casefold() if value else value
+
+
+def _folded_default(source):
+    return lambda context: fold(context.get_current_parameters().get(source))
+
+
+def folded_column(source, length):
+    """Теневая колонка со сложенным регистром значения колонки source."""
+    return db.Column(db.String(length), default=_folded_default(source))
+
+
+# --- STEMMED TEXT ---
+# Основы слов индексируемых колонок (core.stemmer) для стеммированного
+# FTS-индекса хранятся в колонках *_stem и вычисляются тем же способом,
+# что *_folded. Триггеры FTS читают готовые значения и остаются чистым SQL.
+
+def _stemmed_default(source):
+    return lambda context: stem_text(context.get_current_parameters().get(source))
+
+
+def stemmed_column(source):
+    """Теневая колонка с основами слов текста колонки source."""
+    return db.Column(db.Text, default=_stemmed_default(source))
 
 # --- ASSOCIATION TABLES ---
+# Первичный ключ (owner_id, tag_id) покрывает поиск по владельцу,
+# обратный индекс — выборки по тегу (поиск по #тегу, частые теги)
 contact_tags = db.Table('contact_tags',
     db.Column('contact_id', db.Integer, db.ForeignKey('contacts.id'), primary_key=True),
-    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id'), primary_key=True)
+    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id'), primary_key=True),
+    db.Index('ix_contact_tags_tag', 'tag_id', 'contact_id'),
 )
 
 task_tags = db.Table('task_tags',
     db.Column('task_id', db.Integer, db.ForeignKey('tasks.id'), primary_key=True),
-    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id'), primary_key=True)
+    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id'), primary_key=True),
+    db.Index('ix_task_tags_tag', 'tag_id', 'task_id'),
 )
 
 meeting_participants = db.Table('meeting_participants',
@@ -38,6 +79,12 @@ class Tag(db.Model):
     __tablename__ = 'tags'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), nullable=False, unique=True)
+    name_folded = folded_column('name', 50)
+
+    __folded__ = {'name_folded': 'name'}
+    __table_args__ = (
+        db.Index('ix_tags_name_folded', 'name_folded'),
+    )
 
     def to_dict(self):
         return {'id': self.id, 'name': self.name}
@@ -50,6 +97,10 @@ class Project(db.Model):
     description = db.Column(db.Text)
     status = db.Column(db.String(50), default='Active') # Active, Archived, Planning, On Hold
     link = db.Column(db.String(256), nullable=True) # Ссылка на ресурсы проекта
+    title_stem = stemmed_column('title')
+    description_stem = stemmed_column('description')
+
+    __stemmed__ = {'title_stem': 'title', 'description_stem': 'description'}
     
     created_at = db.Column(db.DateTime, default=datetime.now)
     
@@ -101,6 +152,23 @@ class Contact(db.Model):
     type_id = db.Column(db.Integer, db.ForeignKey('contact_types.id'), nullable=True)
     is_self = db.Column(db.Boolean, default=False, nullable=False, server_default='0')
     is_team = db.Column(db.Boolean, default=False, nullable=False, server_default='0')
+    last_name_folded = folded_column('last_name', 100)
+    first_name_folded = folded_column('first_name', 100)
+    last_name_stem = stemmed_column('last_name')
+    first_name_stem = stemmed_column('first_name')
+    middle_name_stem = stemmed_column('middle_name')
+    department_stem = stemmed_column('department')
+    role_stem = stemmed_column('role')
+    notes_stem = stemmed_column('notes')
+
+    __folded__ = {'last_name_folded': 'last_name', 'first_name_folded': 'first_name'}
+    __stemmed__ = {
+        'last_name_stem': 'last_name', 'first_name_stem': 'first_name', 'middle_name_stem': 'middle_name',
+        'department_stem': 'department', 'role_stem': 'role', 'notes_stem': 'notes',
+    }
+    __table_args__ = (
+        db.Index('ix_contacts_name_folded', 'last_name_folded', 'first_name_folded'),
+    )
 
     # Relationship to Tags
     tags = db.relationship('Tag', secondary=contact_tags, lazy='subquery',
@@ -151,6 +219,10 @@ class Task(db.Model):
     assignee_id = db.Column(db.Integer, db.ForeignKey('contacts.id'), nullable=True)
     author_id = db.Column(db.Integer, db.ForeignKey('contacts.id'), nullable=True)
     project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=True)
+    title_stem = stemmed_column('title')
+    description_stem = stemmed_column('description')
+
+    __stemmed__ = {'title_stem': 'title', 'description_stem': 'description'}
 
     assignee = db.relationship('Contact', foreign_keys=[assignee_id], backref='tasks_assigned')
     author = db.relationship('Contact', foreign_keys=[author_id], backref='tasks_authored')
@@ -160,6 +232,18 @@ class Task(db.Model):
     
     comments = db.relationship('TaskComment', backref='task', lazy=True, cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Списки и выборки по статусу в порядке дедлайна (TASK_LIST_ORDER, дашборд, отчёты)
+        db.Index('ix_tasks_status_due', 'status_id', 'due_date'),
+        # Задачи с дедлайном: просроченные, на сегодня, на неделю вперёд.
+        # Частичный — задачи без срока (большинство) в индекс не попадают
+        db.Index('ix_tasks_due_date', 'due_date', 'status_id', sqlite_where=db.text('due_date IS NOT NULL')),
+        db.Index('ix_tasks_assignee', 'assignee_id', 'status_id'),
+        db.Index('ix_tasks_author', 'author_id', 'status_id'),
+        db.Index('ix_tasks_project', 'project_id', 'status_id'),
+        db.Index('ix_tasks_created_at', 'created_at'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -184,6 +268,12 @@ class TaskComment(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.now)
     
     task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False)
+    text_stem = stemmed_column('text')
+
+    __stemmed__ = {'text_stem': 'text'}
+    __table_args__ = (
+        db.Index('ix_task_comments_task', 'task_id'),
+    )
 
     def to_dict(self):
         return {
@@ -225,6 +315,15 @@ class ActivityLog(db.Model):
     
     created_at = db.Column(db.DateTime, default=datetime.now)
 
+    __table_args__ = (
+        # История сущности (карточка задачи/контакта)
+        db.Index('ix_activity_entity', 'entity_type', 'entity_id', 'created_at'),
+        # События смены поля на значение за период: закрытые/застрявшие задачи в отчётах
+        db.Index('ix_activity_field_value', 'field_name', 'new_value', 'created_at'),
+        # Лента последних действий
+        db.Index('ix_activity_created_at', 'created_at'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -251,6 +350,33 @@ class ViewLog(db.Model):
         db.Index('ix_viewlog_viewed_at', 'viewed_at'),
     )
 
+# --- IMPORT JOBS (фоновый импорт JSON) ---
+class ImportJob(db.Model):
+    __tablename__ = 'import_jobs'
+    id = db.Column(db.Integer, primary_key=True)
+    filename = db.Column(db.String(255))
+    format = db.Column(db.String(10), default='json')  # json, ndjson
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, running, done, failed
+    stats = db.Column(db.Text)  # JSON: число созданных записей по сущностям
+    error = db.Column(db.Text)
+    upload_path = db.Column(db.String(500))  # временный файл загрузки, пока задача не завершена
+    created_at = db.Column(db.DateTime, default=datetime.now)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'filename': self.filename,
+            'format': self.format,
+            'status': self.status,
+            'stats': json.loads(self.stats) if self.stats else None,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
 # --- NEW: FAVORITE CONTACTS ---
 class FavoriteContact(db.Model):
     __tablename__ = 'favorite_contacts'
@@ -293,18 +419,33 @@ class Meeting(db.Model):
     started_at = db.Column(db.DateTime, nullable=True)
     ended_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.now)
+    title_stem = stemmed_column('title')
+    agenda_stem = stemmed_column('agenda')
+    notes_stem = stemmed_column('notes')
+    summary_stem = stemmed_column('summary')
+
+    __stemmed__ = {'title_stem': 'title', 'agenda_stem': 'agenda', 'notes_stem': 'notes', 'summary_stem': 'summary'}
 
     # Relationships
+    # Коллекции грузятся лениво: списки встреч идут через services.serialization.meeting_summaries,
+    # карточка встречи — с loader-опциями with_meeting_detail()
     type = db.relationship('MeetingType', backref='meetings')
     project = db.relationship('Project', backref='meetings')
-    participants = db.relationship('Contact', secondary=meeting_participants, lazy='subquery',
+    participants = db.relationship('Contact', secondary=meeting_participants,
         backref=db.backref('meetings_participated', lazy=True))
-    related_tasks = db.relationship('Task', secondary=meeting_tasks, lazy='subquery',
+    related_tasks = db.relationship('Task', secondary=meeting_tasks,
         backref=db.backref('meetings_related', lazy=True))
     action_items = db.relationship('MeetingActionItem', backref='meeting',
-        cascade='all, delete-orphan', lazy='subquery')
+        cascade='all, delete-orphan')
     meeting_notes = db.relationship('MeetingNote', backref='meeting',
-        cascade='all, delete-orphan', lazy='subquery', order_by='MeetingNote.created_at')
+        cascade='all, delete-orphan', order_by='MeetingNote.created_at')
+
+    __table_args__ = (
+        # Встречи на дату/период (стендап, ближайшие встречи)
+        db.Index('ix_meetings_date', 'date', 'time'),
+        # История встреч типа (подготовка к 1-1)
+        db.Index('ix_meetings_type_date', 'type_id', 'date'),
+    )
 
     def to_dict(self):
         return {
@@ -343,10 +484,17 @@ class MeetingActionItem(db.Model):
     task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=True)
     assignee_id = db.Column(db.Integer, db.ForeignKey('contacts.id'), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.now)
+    text_stem = stemmed_column('text')
+
+    __stemmed__ = {'text_stem': 'text'}
 
     task = db.relationship('Task')
     assignee = db.relationship('Contact')
 
+    __table_args__ = (
+        db.Index('ix_meeting_action_items_meeting', 'meeting_id'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -370,9 +518,16 @@ class MeetingNote(db.Model):
     category = db.Column(db.String(20), default='note')  # note, decision, question, task
     task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.now)
+    text_stem = stemmed_column('text')
+
+    __stemmed__ = {'text_stem': 'text'}
 
     task = db.relationship('Task')
 
+    __table_args__ = (
+        db.Index('ix_meeting_notes_meeting', 'meeting_id', 'created_at'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -383,4 +538,35 @@ class MeetingNote(db.Model):
             'task_id': self.task_id,
             'task_title': self.task.title if self.task else None,
             'created_at': self.created_at.strftime('%Y-%m-%d %H:%M') if self.created_at else None
-        }
\ No newline at end of file
+        }
+
+
+# --- Пересчёт *_folded при изменении через ORM ---
+
+FOLDED_MODELS = (Tag, Contact)
+
+
+def _refresh_folded(mapper, connection, target):
+    for folded, source in target.__folded__.items():
+        setattr(target, folded, fold(getattr(target, source)))
+
+
+for _model in FOLDED_MODELS:
+    event.listen(_model, 'before_update', _refresh_folded)
+
+
+# --- Пересчёт *_stem при изменении через ORM ---
+
+STEMMED_MODELS = (Task, Contact, Project, Meeting, MeetingNote, MeetingActionItem, TaskComment)
+
+
+def _refresh_stemmed(mapper, connection, target):
+    # Стемминг дороже casefold: пересчитываются только изменённые колонки
+    state = inspect(target)
+    for stemmed, source in target.__stemmed__.items():
+        if state.attrs[source].history.has_changes():
+            setattr(target, stemmed, stem_text(getattr(target, source)))
+
+
+for _model in STEMMED_MODELS:
+    event.listen(_model, 'before_update', _refresh_stemmed)
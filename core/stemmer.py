@@ -0,0 +1,289 @@
+"""
+Стемминг для полнотекстового поиска: русский и английский алгоритмы Snowball.
+
+stem_text() приводит текст к строке основ через пробел — так заполняются
+колонки *_stem (core.models), из которых строится стеммированный FTS-индекс.
+Тот же стеммер применяется к словам запроса,
+поэтому «задача», «задачи» и «задачу» совпадают по основе «задач».
+
+Реализация следует описаниям алгоритмов на snowballstem.org
+(без словарей исключений английского варианта).
+"""
+import re
+from functools import lru_cache
+
+WORD_RE = re.compile(r'\w+')
+_CYRILLIC_RE = re.compile('[а-яё]')
+_LATIN_RE = re.compile('^[a-z]+$')
+
+
+def _longest(word, suffixes):
+    """Самое длинное окончание из suffixes, которым заканчивается word, иначе None."""
+    for suffix in suffixes:
+        if word.endswith(suffix):
+            return suffix
+    return None
+
+
+def _by_length(*groups):
+    return tuple(sorted({s for group in groups for s in group}, key=len, reverse=True))
+
+
+# --- Русский ---
+
+_RU_VOWELS = 'аеиоуыэюя'
+
+_RU_GERUND_1 = ('в', 'вши', 'вшись')
+_RU_GERUND_2 = ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись')
+_RU_ADJECTIVE = (
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем', 'им', 'ым', 'ом',
+    'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю', 'ая', 'яя', 'ою', 'ею',
+)
+_RU_PARTICIPLE_1 = ('ем', 'нн', 'вш', 'ющ', 'щ')
+_RU_PARTICIPLE_2 = ('ивш', 'ывш', 'ующ')
+_RU_REFLEXIVE = ('ся', 'сь')
+_RU_VERB_1 = (
+    'ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет', 'ют', 'ны',
+    'ть', 'ешь', 'нно',
+)
+_RU_VERB_2 = (
+    'ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй', 'ил', 'ыл',
+    'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят', 'ует', 'уют', 'ит', 'ыт', 'ены',
+    'ить', 'ыть', 'ишь', 'ую', 'ю',
+)
+_RU_NOUN = _by_length((
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии', 'и', 'ией', 'ей',
+    'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам', 'ом', 'о', 'у', 'ах', 'иях', 'ях',
+    'ы', 'ь', 'ию', 'ью', 'ю', 'ия', 'ья', 'я',
+))
+_RU_GERUND = _by_length(_RU_GERUND_1, _RU_GERUND_2)
+_RU_ADJECTIVE_SORTED = _by_length(_RU_ADJECTIVE)
+_RU_PARTICIPLE = _by_length(_RU_PARTICIPLE_1, _RU_PARTICIPLE_2)
+_RU_VERB = _by_length(_RU_VERB_1, _RU_VERB_2)
+
+
+def _ru_regions(word):
+    """Начала областей RV и R2 (индексы в word)."""
+    rv = len(word)
+    for i, ch in enumerate(word):
+        if ch in _RU_VOWELS:
+            rv = i + 1
+            break
+
+    def after_vc(start):
+        for i in range(start + 1, len(word)):
+            if word[i] not in _RU_VOWELS and word[i - 1] in _RU_VOWELS:
+                return i + 1
+        return len(word)
+
+    r1 = after_vc(0)
+    r2 = after_vc(r1)
+    return rv, r2
+
+
+def _ru_strip(word, rv, suffixes, group_1=()):
+    """
+    Снимает самое длинное окончание из suffixes в области RV.
+    Окончания group_1 снимаются, только если перед ними «а» или «я».
+    Возвращает новое слово или None, если окончание не найдено.
+    """
+    suffix = _longest(word[rv:], suffixes)
+    if suffix is None:
+        return None
+    stem = word[:-len(suffix)]
+    if suffix in group_1 and not (len(stem) > rv and stem[-1] in 'ая'):
+        return None
+    return stem
+
+
+def stem_ru(word):
+    word = word.replace('ё', 'е')
+    rv, r2 = _ru_regions(word)
+    if rv >= len(word):
+        return word
+
+    # Шаг 1: деепричастие; иначе возвратная частица и прилагательное/глагол/существительное
+    stem = _ru_strip(word, rv, _RU_GERUND, _RU_GERUND_1)
+    if stem is None:
+        word = _ru_strip(word, rv, _RU_REFLEXIVE) or word
+        stem = _ru_strip(word, rv, _RU_ADJECTIVE_SORTED)
+        if stem is not None:
+            stem = _ru_strip(stem, rv, _RU_PARTICIPLE, _RU_PARTICIPLE_1) or stem
+        else:
+            stem = _ru_strip(word, rv, _RU_VERB, _RU_VERB_1)
+            if stem is None:
+                stem = _ru_strip(word, rv, _RU_NOUN)
+    word = stem if stem is not None else word
+
+    # Шаг 2: «и» на конце
+    if word[rv:].endswith('и'):
+        word = word[:-1]
+
+    # Шаг 3: словообразовательное окончание в R2
+    if r2 < len(word):
+        suffix = _longest(word[r2:], ('ость', 'ост'))
+        if suffix:
+            word = word[:-len(suffix)]
+
+    # Шаг 4: превосходная степень, удвоенная «н», мягкий знак
+    if word[rv:].endswith('ь'):
+        return word[:-1]
+    suffix = _longest(word[rv:], ('ейше', 'ейш'))
+    if suffix:
+        word = word[:-len(suffix)]
+    if word[rv:].endswith('нн'):
+        word = word[:-1]
+    return word
+
+
+# --- Английский (Porter2) ---
+
+_EN_VOWELS = 'aeiouy'
+_EN_DOUBLES = ('bb', 'dd', 'ff', 'gg', 'mm', 'nn', 'pp', 'rr', 'tt')
+_EN_LI_ENDING = 'cdeghkmnrt'
+
+_EN_STEP_2 = (
+    ('ization', 'ize'), ('ational', 'ate'), ('fulness', 'ful'), ('ousness', 'ous'),
+    ('iveness', 'ive'), ('tional', 'tion'), ('biliti', 'ble'), ('lessli', 'less'),
+    ('entli', 'ent'), ('ation', 'ate'), ('alism', 'al'), ('aliti', 'al'), ('ousli', 'ous'),
+    ('iviti', 'ive'), ('fulli', 'ful'), ('enci', 'ence'), ('anci', 'ance'), ('abli', 'able'),
+    ('izer', 'ize'), ('ator', 'ate'), ('alli', 'al'), ('bli', 'ble'), ('ogi', 'og'), ('li', ''),
+)
+_EN_STEP_3 = (
+    ('ational', 'ate'), ('tional', 'tion'), ('alize', 'al'), ('icate', 'ic'), ('iciti', 'ic'),
+    ('ative', ''), ('ical', 'ic'), ('ness', ''), ('ful', ''),
+)
+_EN_STEP_4 = _by_length((
+    'al', 'ance', 'ence', 'er', 'ic', 'able', 'ible', 'ant', 'ement', 'ment', 'ent',
+    'ism', 'ate', 'iti', 'ous', 'ive', 'ize', 'ion',
+))
+
+
+def _en_is_vowel(word, i):
+    return word[i] in _EN_VOWELS
+
+
+def _en_regions(word):
+    def after_vc(start):
+        for i in range(start + 1, len(word)):
+            if not _en_is_vowel(word, i) and _en_is_vowel(word, i - 1):
+                return i + 1
+        return len(word)
+
+    for prefix in ('gener', 'commun', 'arsen'):
+        if word.startswith(prefix):
+            r1 = len(prefix)
+            break
+    else:
+        r1 = after_vc(0)
+    return r1, after_vc(r1)
+
+
+def _en_short_syllable(word, end):
+    """Заканчивается ли word[:end] коротким слогом."""
+    if end == 2:
+        return _en_is_vowel(word, 0) and not _en_is_vowel(word, 1)
+    if end < 3:
+        return False
+    return (not _en_is_vowel(word, end - 3) and _en_is_vowel(word, end - 2)
+            and not _en_is_vowel(word, end - 1) and word[end - 1] not in 'wxY')
+
+
+def _en_has_vowel(part):
+    return any(ch in _EN_VOWELS for ch in part)
+
+
+def stem_en(word):
+    if len(word) <= 2:
+        return word
+    word = word.lstrip("'")
+    if word.startswith('y'):
+        word = 'Y' + word[1:]
+    word = re.sub(r'(?<=[aeiouy])y', 'Y', word)
+    r1, r2 = _en_regions(word)
+
+    # Шаг 0 и 1a: притяжательные формы и множественное число
+    for suffix in ("'s'", "'s", "'"):
+        if word.endswith(suffix):
+            word = word[:-len(suffix)]
+            break
+    if word.endswith('sses'):
+        word = word[:-2]
+    elif word.endswith(('ied', 'ies')):
+        word = word[:-2] if len(word) > 4 else word[:-1]
+    elif word.endswith(('us', 'ss')):
+        pass
+    elif word.endswith('s') and _en_has_vowel(word[:-2]):
+        word = word[:-1]
+
+    # Шаг 1b: -eed, -ed, -ing
+    suffix = _longest(word, ('eedly', 'ingly', 'edly', 'eed', 'ing', 'ed'))
+    if suffix in ('eed', 'eedly'):
+        if len(word) - len(suffix) >= r1:
+            word = word[:-len(suffix)] + 'ee'
+    elif suffix and _en_has_vowel(word[:-len(suffix)]):
+        word = word[:-len(suffix)]
+        if word.endswith(('at', 'bl', 'iz')):
+            word += 'e'
+        elif word.endswith(_EN_DOUBLES):
+            word = word[:-1]
+        elif r1 >= len(word) and _en_short_syllable(word, len(word)):
+            word += 'e'
+
+    # Шаг 1c: y -> i после согласной
+    if len(word) > 2 and word[-1] in 'yY' and not _en_is_vowel(word, len(word) - 2):
+        word = word[:-1] + 'i'
+
+    # Шаги 2 и 3: суффиксы в R1
+    for rules in (_EN_STEP_2, _EN_STEP_3):
+        for suffix, replacement in rules:
+            if word.endswith(suffix):
+                start = len(word) - len(suffix)
+                if start >= r1:
+                    if suffix == 'ogi' and not word[:start].endswith('l'):
+                        break
+                    if suffix == 'li' and not (start and word[start - 1] in _EN_LI_ENDING):
+                        break
+                    if suffix == 'ative' and start < r2:
+                        break
+                    word = word[:start] + replacement
+                break
+
+    # Шаг 4: суффиксы в R2
+    suffix = _longest(word, _EN_STEP_4)
+    if suffix and len(word) - len(suffix) >= r2:
+        if suffix != 'ion' or word[:-3].endswith(('s', 't')):
+            word = word[:-len(suffix)]
+
+    # Шаг 5: конечные e и l
+    if word.endswith('e'):
+        start = len(word) - 1
+        if start >= r2 or (start >= r1 and not _en_short_syllable(word, start)):
+            word = word[:-1]
+    elif word.endswith('ll') and len(word) - 1 >= r2:
+        word = word[:-1]
+
+    return word.replace('Y', 'y')
+
+
+@lru_cache(maxsize=65536)
+def stem_word(word):
+    """Основа слова (в нижнем регистре): русский стеммер для кириллицы, английский для латиницы."""
+    word = word.lower()
+    if _CYRILLIC_RE.search(word):
+        return stem_ru(word)
+    if _LATIN_RE.match(word):
+        return stem_en(word)
+    return word
+
+
+def tokenize(text):
+    """Слова текста (как их делит unicode61) в нижнем регистре."""
+    return WORD_RE.findall(text.lower()) if text else []
+
+
+def stem_text(text):
+    """Текст -> основы слов через пробел; None для пустого значения (для SQL-функции fts_stem)."""
+    if text is None:
+        return None
+    return ' '.join(stem_word(w) for w in tokenize(text))
@@ -1,18 +1,12 @@
 from flask import Blueprint, jsonify, request
 from services.dashboard_service import (
-    get_priority_tasks,
-    get_waiting_tasks,
-    get_top_active_projects,
-    get_favorite_contacts_list,
     global_search,
-    get_recent_viewed,
-    get_frequent_tags,
-    get_recent_activity,
     get_daily_standup_data,
     get_one_on_one_prep_data
 )
+from services.dashboard_cache import get_dashboard_snapshot
 from services.validators import (
-    validate, validation_error,
+    validate, validation_error, task_view_arg,
     VIEW_LOG_SCHEMA, QUICK_LINK_CREATE_SCHEMA, QUICK_LINK_UPDATE_SCHEMA
 )
 from core.models import QuickLink, ViewLog
@@ -22,35 +16,8 @@ dashboard_bp = Blueprint('dashboard', __name__)
 
 @dashboard_bp.route('/dashboard', methods=['GET'])
 def get_dashboard_data():
-    """Сводные данные для главной страницы"""
-
-    priority = get_priority_tasks()
-    waiting = get_waiting_tasks()
-    projects = get_top_active_projects()
-    favorites = get_favorite_contacts_list()
-    links = QuickLink.query.order_by(QuickLink.created_at).all()
-
-    projects_data = []
-    for p in projects:
-        p_dict = p.to_dict()
-        active_count = sum(1 for t in p.tasks if t.status and t.status.name in ['В работе', 'К выполнению'])
-        p_dict['active_work_count'] = active_count
-        projects_data.append(p_dict)
-
-    recent_viewed = get_recent_viewed()
-    frequent_tags = get_frequent_tags()
-    recent_activity = get_recent_activity()
-
-    return jsonify({
-        'priority_tasks': [t.to_dict() for t in priority],
-        'waiting_tasks': [t.to_dict() for t in waiting],
-        'top_projects': projects_data,
-        'favorite_contacts': favorites,
-        'quick_links': [l.to_dict() for l in links],
-        'recent_viewed': recent_viewed,
-        'frequent_tags': frequent_tags,
-        'recent_activity': recent_activity
-    })
+    """Сводные данные для главной страницы (секции кэшируются, см. services.dashboard_cache)"""
+    return jsonify(get_dashboard_snapshot())
 
 @dashboard_bp.route('/views', methods=['POST'])
 def log_view():
@@ -67,7 +34,10 @@ def log_view():
 
 @dashboard_bp.route('/daily-standup', methods=['GET'])
 def daily_standup():
-    data = get_daily_standup_data()
+    view, view_error = task_view_arg()
+    if view_error:
+        return validation_error({'view': view_error})
+    data = get_daily_standup_data(view=view)
     return jsonify(data)
 
 
@@ -0,0 +1,24 @@
+from flask import Blueprint, request, jsonify, Response
+from services.event_stream import stream_events, events_since
+
+events_bp = Blueprint('events', __name__)
+
+
+@events_bp.route('/events', methods=['GET'])
+def event_stream():
+    """
+    Поток изменений задач, встреч и дашборда (text/event-stream).
+    Возобновление — заголовок Last-Event-ID (браузер шлёт его сам) или ?last_event_id=.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    return Response(
+        stream_events(last_event_id),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@events_bp.route('/events/since', methods=['GET'])
+def list_events_since():
+    """События после last_event_id одним JSON: {events, last_event_id, reset}."""
+    return jsonify(events_since(request.args.get('last_event_id')))
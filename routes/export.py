@@ -1,63 +1,115 @@
-from flask import Blueprint, jsonify, request, Response
+from flask import Blueprint, jsonify, request, Response, stream_with_context
 from services.export_service import (
-    export_all_json, export_tasks_csv, export_contacts_csv, import_from_json
+    stream_export_json, stream_export_ndjson,
+    stream_tasks_csv, stream_contacts_csv, gzip_stream
 )
-import json
+from services.import_jobs import IMPORT_FORMATS, save_upload, start_import_job, get_import_job
+import os
+from itertools import chain
 
 export_bp = Blueprint('export', __name__)
 
 
 @export_bp.route('/export/json', methods=['GET'])
 def export_json():
-    """Экспорт всех данных в JSON."""
-    data = export_all_json()
+    """Экспорт всех данных в JSON (потоком)."""
     response = Response(
-        json.dumps(data, ensure_ascii=False, indent=2),
+        stream_with_context(stream_export_json()),
         mimetype='application/json',
         headers={'Content-Disposition': 'attachment; filename=kbase_export.json'}
     )
     return response
 
 
-@export_bp.route('/export/tasks-csv', methods=['GET'])
-def export_tasks():
-    """Экспорт задач в CSV."""
-    csv_data = export_tasks_csv()
+@export_bp.route('/export/ndjson', methods=['GET'])
+def export_ndjson():
+    """Экспорт всех данных в NDJSON: по JSON-объекту на строку (потоком)."""
     response = Response(
-        '\ufeff' + csv_data,  # BOM для корректного открытия в Excel
-        mimetype='text/csv; charset=utf-8',
-        headers={'Content-Disposition': 'attachment; filename=kbase_tasks.csv'}
+        stream_with_context(stream_export_ndjson()),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': 'attachment; filename=kbase_export.ndjson'}
     )
     return response
 
 
-@export_bp.route('/export/contacts-csv', methods=['GET'])
-def export_contacts():
-    """Экспорт контактов в CSV."""
-    csv_data = export_contacts_csv()
-    response = Response(
-        '\ufeff' + csv_data,
+def _wants_gzip():
+    """gzip, если клиент его принимает (Accept-Encoding); ?gzip=1/0 — явно включить/выключить."""
+    flag = request.args.get('gzip')
+    if flag in ('1', 'true'):
+        return True
+    if flag in ('0', 'false'):
+        return False
+    return 'gzip' in request.accept_encodings
+
+
+def _csv_response(chunks, filename):
+    chunks = chain(['\ufeff'], chunks)  # BOM для корректного открытия в Excel
+    headers = {'Content-Disposition': f'attachment; filename={filename}', 'Vary': 'Accept-Encoding'}
+    if _wants_gzip():
+        chunks = gzip_stream(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    return Response(
+        stream_with_context(chunks),
         mimetype='text/csv; charset=utf-8',
-        headers={'Content-Disposition': 'attachment; filename=kbase_contacts.csv'}
+        headers=headers
     )
-    return response
+
+
+@export_bp.route('/export/tasks-csv', methods=['GET'])
+def export_tasks():
+    """Экспорт задач в CSV (потоком, gzip по запросу)."""
+    return _csv_response(stream_tasks_csv(), 'kbase_tasks.csv')
+
+
+@export_bp.route('/export/contacts-csv', methods=['GET'])
+def export_contacts():
+    """Экспорт контактов в CSV (потоком, gzip по запросу)."""
+    return _csv_response(stream_contacts_csv(), 'kbase_contacts.csv')
+
+
+def _import_format(filename):
+    fmt = request.args.get('format')
+    if fmt:
+        return fmt
+    if (filename or '').lower().endswith('.ndjson') or request.mimetype == 'application/x-ndjson':
+        return 'ndjson'
+    return 'json'
 
 
 @export_bp.route('/import/json', methods=['POST'])
 def import_json():
-    """Импорт данных из JSON."""
+    """
+    Импорт данных из JSON/NDJSON (файл в multipart или тело запроса).
+    Файл сохраняется потоком во временный файл, импорт идёт фоновой задачей:
+    ответ 202 с задачей, ход — GET /api/import/jobs/<id>.
+    """
     if request.content_type and 'multipart/form-data' in request.content_type:
         file = request.files.get('file')
         if not file:
             return jsonify({'error': 'No file provided'}), 400
-        try:
-            data = json.loads(file.read().decode('utf-8'))
-        except (json.JSONDecodeError, UnicodeDecodeError) as e:
-            return jsonify({'error': f'Invalid JSON: {str(e)}'}), 400
+        filename = file.filename
+        stream = file.stream
     else:
-        data = request.json
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
+        filename = None
+        stream = request.stream
+
+    fmt = _import_format(filename)
+    if fmt not in IMPORT_FORMATS:
+        return jsonify({'error': f'Unknown format: {fmt}'}), 400
+
+    path = save_upload(stream, suffix=f'.{fmt}')
+    if os.path.getsize(path) == 0:
+        os.remove(path)
+        return jsonify({'error': 'No data provided'}), 400
+
+    job = start_import_job(path, filename, fmt)
+    return jsonify(get_import_job(job.id)), 202
+
 
-    stats = import_from_json(data)
-    return jsonify({'message': 'Import completed', 'stats': stats})
+@export_bp.route('/import/jobs/<int:job_id>', methods=['GET'])
+def import_job_status(job_id):
+    """Статус и прогресс задачи импорта."""
+    job = get_import_job(job_id)
+    if not job:
+        return jsonify({'error': 'Import job not found'}), 404
+    return jsonify(job)
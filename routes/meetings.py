@@ -1,6 +1,7 @@
+from datetime import date
 from flask import Blueprint, request, jsonify
 from services.meeting_service import (
-    get_all_meetings, get_meeting_full_details, create_meeting,
+    get_meeting_list, get_meetings_page, get_meeting_full_details, create_meeting,
     update_meeting, delete_meeting, get_meeting_types,
     add_action_item, update_action_item, delete_action_item,
     convert_action_item_to_task, get_upcoming_meetings,
@@ -10,7 +11,7 @@ from services.meeting_service import (
 from services.validators import (
     validate, validation_error,
     MEETING_CREATE_SCHEMA, MEETING_UPDATE_SCHEMA,
-    MEETING_NOTE_SCHEMA, MEETING_ACTION_ITEM_SCHEMA
+    MEETING_NOTE_SCHEMA, MEETING_ACTION_ITEM_SCHEMA, MEETING_LIST_QUERY_SCHEMA
 )
 
 meetings_bp = Blueprint('meetings', __name__)
@@ -22,17 +23,62 @@ def list_meeting_types():
     return jsonify([t.to_dict() for t in types])
 
 
+def _int_arg(name):
+    """Целочисленный query-параметр; нечисловое значение оставляем строкой, чтобы валидатор его отклонил."""
+    raw = request.args.get(name)
+    if raw is None or raw == '':
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        return raw
+
+
+def _parse_meeting_list_args():
+    """Собирает фильтры списка встреч из query string. Возвращает (filters, errors)."""
+    args = {
+        'type_id': _int_arg('type_id'),
+        'date_from': request.args.get('date_from') or None,
+        'date_to': request.args.get('date_to') or None,
+        'limit': _int_arg('limit'),
+    }
+    errors = validate(args, MEETING_LIST_QUERY_SCHEMA)
+    if not errors:
+        for key in ('date_from', 'date_to'):
+            if args[key]:
+                args[key] = date.fromisoformat(args[key])
+    return args, errors
+
+
 @meetings_bp.route('/meetings', methods=['GET'])
 def list_meetings():
-    meetings = get_all_meetings()
-    return jsonify([m.to_dict() for m in meetings])
+    """
+    Список встреч в виде сводок (без участников целиком, задач, заметок и действий —
+    они в /meetings/<id>). Фильтры: type_id, date_from, date_to.
+    Без limit/cursor — плоский массив, с ними — страница {items, next_cursor, has_more}.
+    """
+    filters, errors = _parse_meeting_list_args()
+    if errors:
+        return validation_error(errors)
+
+    limit = filters.pop('limit')
+    cursor = request.args.get('cursor')
+
+    if limit is None and not cursor:
+        return jsonify(get_meeting_list(filters))
+
+    try:
+        page = get_meetings_page(filters, cursor=cursor, limit=limit)
+    except ValueError as e:
+        return validation_error({'cursor': [str(e)]})
+
+    return jsonify(page)
 
 
 @meetings_bp.route('/meetings/upcoming', methods=['GET'])
 def upcoming_meetings():
     days = request.args.get('days', 7, type=int)
-    meetings = get_upcoming_meetings(days)
-    return jsonify([m.to_dict() for m in meetings])
+    return jsonify(get_upcoming_meetings(days))
 
 
 @meetings_bp.route('/meetings/<int:meeting_id>', methods=['GET'])
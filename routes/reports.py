@@ -1,11 +1,16 @@
 from flask import Blueprint, jsonify, request
 from services.report_service import get_weekly_report_data
+from services.validators import task_view_arg, validation_error
 from datetime import datetime
 
 reports_bp = Blueprint('reports', __name__)
 
 @reports_bp.route('/reports/weekly', methods=['GET'])
 def weekly_report():
+    view, view_error = task_view_arg()
+    if view_error:
+        return validation_error({'view': view_error})
+
     try:
         # Получаем параметры дат из query string
         date_from = request.args.get('from')
@@ -20,7 +25,7 @@ def weekly_report():
         if date_to:
             parsed_to = datetime.strptime(date_to, '%Y-%m-%d')
 
-        data = get_weekly_report_data(date_from=parsed_from, date_to=parsed_to)
+        data = get_weekly_report_data(date_from=parsed_from, date_to=parsed_to, view=view)
         return jsonify(data)
     except Exception as e:
         print(f"Error generating report: {e}")
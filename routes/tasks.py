@@ -1,12 +1,14 @@
+from datetime import date
 from flask import Blueprint, request, jsonify
 from services.task_service import (
-    get_all_tasks, create_task, get_task_by_id,
+    get_task_list, get_tasks_page, create_task, get_task_by_id,
     update_task, delete_task, update_task_status, get_task_statuses,
     get_task_full_details, add_comment_to_task, delete_comment
 )
 from services.validators import (
-    validate, validation_error,
-    TASK_CREATE_SCHEMA, TASK_UPDATE_SCHEMA, TASK_COMMENT_SCHEMA
+    validate, validation_error, task_view_arg,
+    TASK_CREATE_SCHEMA, TASK_UPDATE_SCHEMA, TASK_COMMENT_SCHEMA,
+    TASK_LIST_QUERY_SCHEMA
 )
 
 tasks_bp = Blueprint('tasks', __name__)
@@ -16,10 +18,77 @@ def list_task_statuses():
     statuses = get_task_statuses()
     return jsonify([s.to_dict() for s in statuses])
 
+def _int_arg(name):
+    """Целочисленный query-параметр; нечисловое значение оставляем строкой, чтобы валидатор его отклонил."""
+    raw = request.args.get(name)
+    if raw is None or raw == '':
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        return raw
+
+
+def _parse_task_list_args():
+    """Собирает фильтры списка задач из query string. Возвращает (filters, errors)."""
+    args = {
+        'assignee_id': _int_arg('assignee_id'),
+        'author_id': _int_arg('author_id'),
+        'project_id': _int_arg('project_id'),
+        'tag': request.args.get('tag') or None,
+        'due_from': request.args.get('due_from') or None,
+        'due_to': request.args.get('due_to') or None,
+        'limit': _int_arg('limit'),
+    }
+    errors = validate(args, TASK_LIST_QUERY_SCHEMA)
+
+    # status_id можно передать списком: ?status_id=1,2 или ?status_id=1&status_id=2
+    status_ids = []
+    for raw in request.args.getlist('status_id'):
+        for part in raw.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            if not part.isdigit():
+                errors['status_id'] = ['Должно быть целым числом']
+                break
+            status_ids.append(int(part))
+    args['status_id'] = status_ids
+
+    if not errors:
+        for key in ('due_from', 'due_to'):
+            if args[key]:
+                args[key] = date.fromisoformat(args[key])
+    return args, errors
+
+
 @tasks_bp.route('/tasks', methods=['GET'])
 def list_tasks():
-    tasks = get_all_tasks()
-    return jsonify([t.to_dict() for t in tasks])
+    """
+    Список задач с серверными фильтрами.
+    Без limit/cursor — плоский массив (обратная совместимость),
+    с ними — страница {items, next_cursor, has_more}.
+    view=compact (или fields=compact) — облегчённые задачи: id, названия, цвета.
+    """
+    filters, errors = _parse_task_list_args()
+    view, view_error = task_view_arg()
+    if view_error:
+        errors['view'] = view_error
+    if errors:
+        return validation_error(errors)
+
+    limit = filters.pop('limit')
+    cursor = request.args.get('cursor')
+
+    if limit is None and not cursor:
+        return jsonify(get_task_list(filters, view=view))
+
+    try:
+        page = get_tasks_page(filters, cursor=cursor, limit=limit, view=view)
+    except ValueError as e:
+        return validation_error({'cursor': [str(e)]})
+
+    return jsonify(page)
 
 @tasks_bp.route('/tasks/<int:task_id>', methods=['GET'])
 def get_task_detail(task_id):
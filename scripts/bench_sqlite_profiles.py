@@ -0,0 +1,140 @@
+"""
+Сравнение профилей PRAGMA SQLite (Config.SQLITE_PROFILES) под конкурентной нагрузкой.
+
+Для каждого профиля создаётся временная файловая БД с таблицей задач,
+затем читатели и писатели в отдельных потоках работают заданное время.
+Выводится пропускная способность, p95 задержки и число ошибок блокировки.
+
+    python scripts/bench_sqlite_profiles.py
+    python scripts/bench_sqlite_profiles.py --rows 50000 --readers 8 --writers 2 --seconds 10
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+# Добавляем корень проекта в sys.path для корректных импортов
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config import Config
+from core.database import apply_sqlite_pragmas
+
+SCHEMA = """
+    CREATE TABLE tasks (
+        id INTEGER PRIMARY KEY,
+        title TEXT NOT NULL,
+        status_id INTEGER NOT NULL,
+        project_id INTEGER,
+        due_date TEXT
+    );
+    CREATE INDEX ix_tasks_project ON tasks(project_id);
+"""
+
+
+def connect(path, pragmas):
+    # Таймаут драйвера по умолчанию (5 с), как у соединений приложения;
+    # busy_timeout профиля, если задан, его переопределяет
+    conn = sqlite3.connect(path, check_same_thread=False)
+    apply_sqlite_pragmas(conn, pragmas)
+    return conn
+
+
+def seed(path, pragmas, rows):
+    conn = connect(path, pragmas)
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        "INSERT INTO tasks (title, status_id, project_id, due_date) VALUES (?, ?, ?, ?)",
+        ((f'Задача {i}', random.randint(1, 4), random.randint(1, 100), f'2026-{random.randint(1, 12):02d}-01')
+         for i in range(rows))
+    )
+    conn.commit()
+    conn.close()
+
+
+def reader(path, pragmas, stop, stats):
+    conn = connect(path, pragmas)
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            conn.execute(
+                "SELECT status_id, count(*) FROM tasks WHERE project_id = ? GROUP BY status_id",
+                (random.randint(1, 100),)
+            ).fetchall()
+            stats['latencies'].append(time.perf_counter() - started)
+        except sqlite3.OperationalError:
+            stats['errors'] += 1
+    conn.close()
+
+
+def writer(path, pragmas, stop, stats):
+    conn = connect(path, pragmas)
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT INTO tasks (title, status_id, project_id) VALUES (?, 1, ?)",
+                    ('Новая задача', random.randint(1, 100))
+                )
+                conn.execute(
+                    "UPDATE tasks SET status_id = ? WHERE id = ?",
+                    (random.randint(1, 4), random.randint(1, 1000))
+                )
+            stats['latencies'].append(time.perf_counter() - started)
+        except sqlite3.OperationalError:
+            stats['errors'] += 1
+    conn.close()
+
+
+def p95(values):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[int(len(values) * 0.95) - 1 if len(values) > 1 else 0]
+
+
+def run_profile(name, pragmas, args):
+    with tempfile.TemporaryDirectory(prefix='kbase_bench_') as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        seed(path, pragmas, args.rows)
+
+        stop = threading.Event()
+        read_stats = [{'latencies': [], 'errors': 0} for _ in range(args.readers)]
+        write_stats = [{'latencies': [], 'errors': 0} for _ in range(args.writers)]
+        threads = [threading.Thread(target=reader, args=(path, pragmas, stop, s)) for s in read_stats]
+        threads += [threading.Thread(target=writer, args=(path, pragmas, stop, s)) for s in write_stats]
+        for t in threads:
+            t.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+
+    def summary(stats):
+        latencies = [l for s in stats for l in s['latencies']]
+        return len(latencies) / args.seconds, p95(latencies) * 1000, sum(s['errors'] for s in stats)
+
+    reads, read_p95, read_errors = summary(read_stats)
+    writes, write_p95, write_errors = summary(write_stats)
+    print(f"{name:<12} {reads:>10.0f} {read_p95:>10.2f} {read_errors:>8} "
+          f"{writes:>10.0f} {write_p95:>10.2f} {write_errors:>8}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Бенчмарк профилей PRAGMA SQLite.")
+    parser.add_argument('--rows', type=int, default=20000, help='Строк в таблице перед замером.')
+    parser.add_argument('--readers', type=int, default=4, help='Потоков чтения.')
+    parser.add_argument('--writers', type=int, default=2, help='Потоков записи.')
+    parser.add_argument('--seconds', type=float, default=5, help='Длительность замера на профиль.')
+    parser.add_argument('--profile', action='append', choices=list(Config.SQLITE_PROFILES),
+                        help='Профиль для замера (можно повторять; по умолчанию все).')
+    args = parser.parse_args()
+
+    print(f"{'профиль':<12} {'чтений/с':>10} {'p95, мс':>10} {'ошибок':>8} "
+          f"{'записей/с':>10} {'p95, мс':>10} {'ошибок':>8}")
+    for name in args.profile or Config.SQLITE_PROFILES:
+        run_profile(name, {'foreign_keys': 'ON', **Config.SQLITE_PROFILES[name]}, args)
@@ -1,7 +1,6 @@
 import argparse
 import sys
 import os
-import shutil
 import sqlite3
 import random
 from datetime import datetime, timedelta, timezone
@@ -12,6 +11,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from sqlalchemy.sql import sqltypes
 
 from app import app
+from services.backup_service import copy_database
 from core.database import db
 from core.models import (
     ContactType, TaskStatus, Tag, Contact, Project, ProjectContact,
@@ -260,7 +260,7 @@ def migrate_data():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     backup_path = f"{db_path}.backup_{timestamp}"
     print(f"📦 Создание резервной копии: {backup_path}")
-    shutil.copy2(db_path, backup_path)
+    copy_database(db_path, backup_path)
 
     # 2. Подключение к СТАРОЙ базе
     try:
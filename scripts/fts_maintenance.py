@@ -0,0 +1,48 @@
+"""
+Обслуживание FTS5-индекса поиска.
+
+    python scripts/fts_maintenance.py --check           # какие индексы расходятся с таблицами
+    python scripts/fts_maintenance.py --rebuild         # принудительная полная перестройка
+    python scripts/fts_maintenance.py --optimize        # слить сегменты индекса в один
+    python scripts/fts_maintenance.py --merge 500       # инкрементальное слияние (для cron)
+"""
+import argparse
+import sys
+import os
+import time
+
+# Добавляем корень проекта в sys.path для корректных импортов
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from services.search_service import (
+    FTS_TABLES, fts_stale_tables, ensure_fts_index, optimize_fts_index, merge_fts_index
+)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Обслуживание FTS-индекса KBase.")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--check', action='store_true', help='Показать индексы, требующие перестройки.')
+    group.add_argument('--rebuild', action='store_true', help='Принудительно перестроить все индексы.')
+    group.add_argument('--optimize', action='store_true', help='FTS5 optimize: слить все сегменты.')
+    group.add_argument('--merge', type=int, metavar='PAGES', help='FTS5 merge: слить до PAGES страниц на таблицу.')
+    parser.add_argument('--table', action='append', choices=list(FTS_TABLES),
+                        help='Ограничить optimize/merge таблицей (можно повторять).')
+    args = parser.parse_args()
+
+    with app.app_context():
+        started = time.time()
+        if args.check:
+            stale = fts_stale_tables()
+            print('Требуют перестройки: ' + ', '.join(stale) if stale else 'Индексы актуальны.')
+        elif args.rebuild:
+            rebuilt = ensure_fts_index(force=True)
+            print(f"Перестроено: {', '.join(rebuilt)}")
+        elif args.optimize:
+            optimize_fts_index(args.table)
+            print('optimize выполнен.')
+        else:
+            merge_fts_index(args.merge, args.table)
+            print(f'merge ({args.merge} стр.) выполнен.')
+        print(f'Время: {time.time() - started:.2f} с')
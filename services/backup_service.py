@@ -1,9 +1,24 @@
 import os
-import shutil
 import glob
+import sqlite3
 from datetime import datetime
 
 
+def copy_database(db_path, backup_path):
+    """
+    Согласованная копия БД через online backup API SQLite.
+    В режиме WAL часть закоммиченных данных лежит в файле -wal,
+    поэтому простое копирование файла БД её бы потеряло.
+    """
+    src = sqlite3.connect(db_path)
+    dst = sqlite3.connect(backup_path)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
 def auto_backup(db_path, backup_dir='backups', max_backups=10):
     """Создаёт резервную копию БД при запуске. Ротация старых бэкапов."""
     if not os.path.exists(db_path):
@@ -21,7 +36,7 @@ def auto_backup(db_path, backup_dir='backups', max_backups=10):
         print(f'[backup] Бэкап за сегодня уже есть: {backup_name}')
         return backup_path
 
-    shutil.copy2(db_path, backup_path)
+    copy_database(db_path, backup_path)
     print(f'[backup] Создан бэкап: {backup_name} ({os.path.getsize(backup_path)} bytes)')
 
     # Ротация: удалить старые бэкапы, оставить последние max_backups
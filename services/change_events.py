@@ -0,0 +1,221 @@
+"""
+Шина событий изменения данных (change data capture).
+
+Сервисы пишут через ORM-сессию; шина превращает эти записи в события
+ChangeEvent(entity, entity_id, op, fields) и раздаёт их подписчикам:
+- after_flush  — изменения каждого flush собираются в session.info
+  (после flush уже известны id новых строк, а история атрибутов ещё не сброшена);
+  несколько изменений одной сущности в транзакции сливаются в одно событие;
+- after_commit — накопленные события публикуются пачкой;
+- after_rollback — отбрасываются.
+
+Изменения дочерних записей (комментарии задачи, заметки и действия встречи)
+публикуются как update родителя с полем коллекции: ('task', 12, 'update', ('comments',)).
+
+Подписчики:
+    subscribe(fn, entities=None, sync=False) — fn(events) получает список событий
+    (только перечисленных типов сущностей, если они заданы).
+Асинхронные подписчики выполняются по очереди в одном фоновом потоке, без
+контекста приложения, — коммит не ждёт индексации и уведомлений. sync=True —
+вызов прямо в коммитящем потоке; только для дешёвой инвалидации кэшей, которую
+следующий запрос обязан увидеть (services.dashboard_cache, services.tag_index,
+services.lookup_service).
+
+Массовые записи в обход ORM событий не порождают — после них нужно вызвать
+publish_reset(типы сущностей): подписчики получат событие с op='reset'.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from core.models import (
+    Task, Contact, Project, Tag, Meeting, TaskComment, MeetingNote, MeetingActionItem,
+    FavoriteContact, QuickLink, ViewLog, ActivityLog, TaskStatus, ContactType, MeetingType
+)
+
+logger = logging.getLogger(__name__)
+
+CHANGE_OPS = ('create', 'update', 'delete', 'reset')
+
+# Модель -> тип сущности в событиях
+ENTITY_TYPES = {
+    Task: 'task',
+    Contact: 'contact',
+    Project: 'project',
+    Tag: 'tag',
+    Meeting: 'meeting',
+    FavoriteContact: 'favorite',
+    QuickLink: 'quick_link',
+    ViewLog: 'view',
+    ActivityLog: 'activity',
+    TaskStatus: 'task_status',
+    ContactType: 'contact_type',
+    MeetingType: 'meeting_type',
+}
+
+# Дочерняя модель -> (тип родителя, атрибут со ссылкой на родителя, поле родителя)
+CHILD_ENTITIES = {
+    TaskComment: ('task', 'task_id', 'comments'),
+    MeetingNote: ('meeting', 'meeting_id', 'meeting_notes'),
+    MeetingActionItem: ('meeting', 'meeting_id', 'action_items'),
+}
+
+# Кроме колонок, в fields попадают только собственные many-to-many коллекции:
+# обратные стороны (Tag.tasks, Contact.tasks_assigned, ...) дублировали бы событие владельца
+TRACKED_COLLECTIONS = {
+    Task: ('tags',),
+    Contact: ('tags',),
+    Meeting: ('participants', 'related_tasks'),
+}
+
+
+class ChangeEvent:
+    __slots__ = ('entity', 'entity_id', 'op', 'fields')
+
+    def __init__(self, entity, entity_id, op, fields=()):
+        self.entity = entity
+        self.entity_id = entity_id
+        self.op = op
+        self.fields = tuple(fields)
+
+    def to_dict(self):
+        return {'entity': self.entity, 'id': self.entity_id, 'op': self.op, 'fields': list(self.fields)}
+
+    def __repr__(self):
+        return f'ChangeEvent({self.entity}, {self.entity_id}, {self.op}, {self.fields})'
+
+
+# --- Подписчики ---
+
+_subscribers = []  # [(fn, entities | None, sync)]
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='change-events')
+
+
+def subscribe(fn, entities=None, sync=False):
+    """Подписывает fn(events) на события; entities — типы сущностей (None — все)."""
+    with _lock:
+        _subscribers.append((fn, frozenset(entities) if entities else None, sync))
+    return fn
+
+
+def unsubscribe(fn):
+    with _lock:
+        _subscribers[:] = [s for s in _subscribers if s[0] is not fn]
+
+
+def _deliver(fn, events):
+    try:
+        fn(events)
+    except Exception:
+        # Ошибка подписчика не должна ломать коммит и других подписчиков
+        logger.exception('Подписчик %s упал на событиях изменения', getattr(fn, '__name__', fn))
+
+
+def publish(events):
+    """Раздаёт события подписчикам: sync — сразу, остальным — через фоновый поток."""
+    if not events:
+        return
+    with _lock:
+        subscribers = list(_subscribers)
+    for fn, entities, sync in subscribers:
+        batch = events if entities is None else [e for e in events if e.entity in entities]
+        if not batch:
+            continue
+        if sync:
+            _deliver(fn, batch)
+        else:
+            _executor.submit(_deliver, fn, batch)
+
+
+def publish_reset(*entities):
+    """Событие «данные типов entities изменились целиком» — после записи в обход ORM."""
+    publish([ChangeEvent(entity, None, 'reset') for entity in entities])
+
+
+def drain(timeout=None):
+    """Ждёт, пока асинхронные подписчики обработают всё опубликованное ранее."""
+    _executor.submit(lambda: None).result(timeout)
+
+
+# --- Захват изменений из ORM-сессии ---
+
+_PENDING_KEY = 'change_events'
+
+
+def _entity_id(obj, state):
+    return state.identity[0] if state.identity else obj.id
+
+
+def _changed_fields(model, state):
+    names = [attr.key for attr in state.mapper.column_attrs]
+    names += TRACKED_COLLECTIONS.get(model, ())
+    return tuple(name for name in names if state.attrs[name].history.has_changes())
+
+
+def _describe(obj, op):
+    """(entity, id, op, fields) для изменённого объекта или None, если он не отслеживается."""
+    model = type(obj)
+    state = inspect(obj)
+
+    entity = ENTITY_TYPES.get(model)
+    if entity:
+        if op == 'delete':
+            return entity, _entity_id(obj, state), op, ()
+        fields = _changed_fields(model, state)
+        if op == 'update' and not fields:
+            return None  # dirty без реальных изменений (например, тронута обратная коллекция)
+        return entity, _entity_id(obj, state), op, fields
+
+    child = CHILD_ENTITIES.get(model)
+    if child:
+        parent, parent_attr, field = child
+        # Значение из state.dict: у удалённой строки ленивая загрузка уже невозможна
+        parent_id = state.dict.get(parent_attr)
+        if parent_id is not None:
+            return parent, parent_id, 'update', (field,)
+    return None
+
+
+def _merge(pending, entity, entity_id, op, fields):
+    current = pending.get((entity, entity_id))
+    if current is None:
+        pending[(entity, entity_id)] = ChangeEvent(entity, entity_id, op, fields)
+        return
+    if op == 'delete':
+        current.op = 'delete'
+    current.fields = tuple(dict.fromkeys(current.fields + tuple(fields)))
+
+
+def _collect_changes(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    for op, objects in (('create', session.new), ('update', session.dirty), ('delete', session.deleted)):
+        for obj in objects:
+            change = _describe(obj, op)
+            if change:
+                _merge(pending, *change)
+
+
+def pending_entities(session):
+    """Типы сущностей, изменённых в текущей транзакции сессии (до коммита)."""
+    return {entity for entity, _ in session.info.get(_PENDING_KEY, ())}
+
+
+def _publish_changes(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        publish(list(pending.values()))
+
+
+def _discard_changes(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _register_capture():
+    event.listen(Session, 'after_flush', _collect_changes)
+    event.listen(Session, 'after_commit', _publish_changes)
+    event.listen(Session, 'after_rollback', _discard_changes)
+
+
+_register_capture()
@@ -1,18 +1,18 @@
 from core.database import db
 from core.models import Contact, ContactType, FavoriteContact
 from services.tag_service import process_tags
+from services.lookup_service import contact_type_id
 
 def get_contact_types():
     return ContactType.query.all()
 
 def get_all_contacts():
-    return Contact.query.order_by(Contact.last_name, Contact.first_name).all()
+    return Contact.query.order_by(Contact.last_name_folded, Contact.first_name_folded).all()
 
 def create_contact(data):
     type_id = data.get('type_id')
     if not type_id:
-        default = ContactType.query.filter_by(name_type='Контрагенты').first()
-        if default: type_id = default.id
+        type_id = contact_type_id('Контрагенты')
 
     new_c = Contact(
         last_name=data.get('last_name'), first_name=data.get('first_name'),
@@ -171,4 +171,4 @@ def toggle_team(contact_id):
 
 def get_team_contacts():
     """Вернуть список контактов с is_team=True."""
-    return Contact.query.filter_by(is_team=True).order_by(Contact.last_name, Contact.first_name).all()
\ No newline at end of file
+    return Contact.query.filter_by(is_team=True).order_by(Contact.last_name_folded, Contact.first_name_folded).all()
\ No newline at end of file
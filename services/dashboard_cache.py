@@ -0,0 +1,118 @@
+"""
+Материализованный снимок главной страницы.
+
+Дашборд собирается из независимых секций. Каждая секция хранится в
+памяти процесса уже сериализованной и пересчитывается только после
+инвалидации. После коммита сессии сбрасываются лишь секции, зависящие
+от изменённых сущностей (синхронный подписчик services.change_events).
+Массовые UPDATE/DELETE в обход ORM событий не порождают — после них
+нужно вызвать invalidate_dashboard() или change_events.publish_reset().
+
+Снимок привязан к дате: секции с просрочками зависят от «сегодня»,
+поэтому со сменой дня он пересчитывается целиком.
+
+Кэш живёт в рамках процесса: при нескольких воркерах запись в одном
+не сбрасывает снимки в других.
+"""
+import threading
+from datetime import date
+from core.models import QuickLink
+from services.change_events import subscribe
+from services.serialization import serialize_tasks
+from services.dashboard_service import (
+    get_priority_tasks, get_waiting_tasks, get_top_projects_data,
+    get_favorite_contacts_list, get_recent_viewed, get_frequent_tags,
+    get_recent_activity
+)
+
+
+def _quick_links():
+    return [l.to_dict() for l in QuickLink.query.order_by(QuickLink.created_at).all()]
+
+
+# Секция -> функция, возвращающая готовые к JSON данные
+DASHBOARD_SECTIONS = {
+    'priority_tasks': lambda: serialize_tasks(get_priority_tasks()),
+    'waiting_tasks': lambda: serialize_tasks(get_waiting_tasks()),
+    'top_projects': get_top_projects_data,
+    'favorite_contacts': get_favorite_contacts_list,
+    'quick_links': _quick_links,
+    'recent_viewed': get_recent_viewed,
+    'frequent_tags': get_frequent_tags,
+    'recent_activity': get_recent_activity,
+}
+
+_TASK_LISTS = {'priority_tasks', 'waiting_tasks'}
+
+# Тип изменённой сущности -> секции, которые от неё зависят
+SECTION_DEPENDENCIES = {
+    'task': _TASK_LISTS | {'top_projects', 'favorite_contacts', 'recent_viewed',
+                           'frequent_tags', 'recent_activity'},
+    # Контакты вложены в задачи (исполнитель/автор)
+    'contact': _TASK_LISTS | {'favorite_contacts', 'recent_viewed', 'recent_activity'},
+    # Название проекта есть в задачах
+    'project': _TASK_LISTS | {'top_projects', 'recent_viewed', 'recent_activity'},
+    # Теги есть в задачах и контактах
+    'tag': _TASK_LISTS | {'favorite_contacts', 'frequent_tags'},
+    # Название и цвет статуса есть в задачах и ссылках на них; по именам статусов
+    # считаются активные задачи проектов и избранных контактов
+    'task_status': _TASK_LISTS | {'top_projects', 'favorite_contacts', 'recent_viewed', 'recent_activity'},
+    # Цвет типа контакта есть в контактах задач, избранном и ссылках на контакты
+    'contact_type': _TASK_LISTS | {'favorite_contacts', 'recent_viewed', 'recent_activity'},
+    'favorite': {'favorite_contacts'},
+    'quick_link': {'quick_links'},
+    'view': {'recent_viewed'},
+    'activity': {'recent_activity'},
+}
+
+_snapshot = {}
+_snapshot_day = None
+_lock = threading.Lock()
+
+
+def invalidate_dashboard(*entity_types):
+    """
+    Сбрасывает секции, зависящие от перечисленных типов сущностей.
+    Без аргументов — весь снимок.
+    """
+    with _lock:
+        if not entity_types:
+            _snapshot.clear()
+            return
+        for entity_type in entity_types:
+            for section in SECTION_DEPENDENCIES.get(entity_type, DASHBOARD_SECTIONS):
+                _snapshot.pop(section, None)
+
+
+def get_dashboard_snapshot():
+    """Данные главной страницы: из кэша, с пересчётом только сброшенных секций."""
+    global _snapshot_day
+
+    with _lock:
+        today = date.today()
+        if _snapshot_day != today:
+            _snapshot.clear()
+            _snapshot_day = today
+
+        for section, build in DASHBOARD_SECTIONS.items():
+            if section not in _snapshot:
+                _snapshot[section] = build()
+
+        return dict(_snapshot)
+
+
+# --- Инвалидация по событиям изменения данных ---
+
+def _on_changes(events):
+    changed = set()
+    for e in events:
+        if e.op == 'reset':
+            invalidate_dashboard()
+            return
+        changed.add(e.entity)
+        if 'tags' in e.fields:
+            changed.add('tag')  # смена тегов задачи/контакта меняет частые теги
+    invalidate_dashboard(*changed)
+
+
+subscribe(_on_changes, entities=SECTION_DEPENDENCIES, sync=True)
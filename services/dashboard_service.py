@@ -1,4 +1,4 @@
-from sqlalchemy import or_, func, desc
+from sqlalchemy import func, desc, and_, or_, case
 from datetime import date, datetime, timedelta
 from core.database import db
 from core.models import (
@@ -7,35 +7,37 @@ from core.models import (
     Meeting, MeetingNote, MeetingType,
     task_tags, contact_tags
 )
+from services.serialization import with_profile, with_contact_profile, load_tasks_by_ids, meeting_summaries
+from services.lookup_service import status_id, status_ids, status_map, meeting_type_id
+from services.entity_resolver import resolve_entities
 
 
 def get_priority_tasks(limit=7):
-    # Ищем статус "Готово", чтобы исключить его
-    done_status = TaskStatus.query.filter_by(name='Готово').first()
-    done_id = done_status.id if done_status else 9999
+    # Все статусы, кроме «Готово»: IN по списку идёт по индексу ix_tasks_status_due,
+    # а != читал бы и все закрытые задачи
+    active_ids = [sid for name, sid in status_map().items() if name != 'Готово']
 
-    query = Task.query.filter(Task.status_id != done_id)
+    query = with_profile(Task.query).filter(Task.status_id.in_(active_ids))
     query = query.order_by(Task.due_date.asc().nullslast(), Task.created_at.desc())
     
     return query.limit(limit).all()
 
 def get_waiting_tasks(limit=5):
-    waiting_status = TaskStatus.query.filter_by(name='Жду ответа').first()
-    if not waiting_status:
+    waiting_id = status_id('Жду ответа')
+    if not waiting_id:
         return []
 
-    return Task.query.filter_by(status_id=waiting_status.id)\
+    return with_profile(Task.query).filter_by(status_id=waiting_id)\
         .order_by(Task.due_date.asc().nullslast())\
         .limit(limit).all()
 
 def get_top_active_projects(limit=3):
-    active_task_statuses = ['В работе', 'К выполнению']
+    active_status_ids = status_ids('В работе', 'К выполнению')
     
     projects = db.session.query(Project)\
         .join(Task)\
-        .join(TaskStatus)\
         .filter(Project.status == 'Active')\
-        .filter(TaskStatus.name.in_(active_task_statuses))\
+        .filter(Task.status_id.in_(active_status_ids))\
         .group_by(Project.id)\
         .order_by(func.count(Task.id).desc())\
         .limit(limit)\
@@ -46,6 +48,29 @@ def get_top_active_projects(limit=3):
         
     return projects
 
+def get_top_projects_data(limit=3):
+    """
+    Топ активных проектов для дашборда в виде dict.
+    active_work_count считается одним GROUP BY, а не перебором p.tasks.
+    """
+    projects = get_top_active_projects(limit)
+    if not projects:
+        return []
+
+    project_ids = [p.id for p in projects]
+    active_counts = dict(db.session.query(Task.project_id, func.count(Task.id))
+        .filter(Task.project_id.in_(project_ids))
+        .filter(Task.status_id.in_(status_ids('В работе', 'К выполнению')))
+        .group_by(Task.project_id)
+        .all())
+
+    result = []
+    for p in projects:
+        p_dict = p.to_dict()
+        p_dict['active_work_count'] = active_counts.get(p.id, 0)
+        result.append(p_dict)
+    return result
+
 def get_favorite_contacts_list():
     """
     Получает список избранных контактов с подгрузкой данных самого контакта.
@@ -60,8 +85,7 @@ def get_favorite_contacts_list():
         .all()
     
     # Получаем ID статуса "Готово" для исключения
-    done_status = TaskStatus.query.filter_by(name='Готово').first()
-    done_id = done_status.id if done_status else -1
+    done_id = status_id('Готово', -1)
     today = date.today()
 
     result = []
@@ -98,45 +122,32 @@ def global_search(query_str: str):
     if query_str.startswith('#'):
         return search_by_tag(query_str[1:])  # Убираем # из запроса
 
-    # FTS5 полнотекстовый поиск с fallback на ILIKE
-    try:
-        from services.search_service import fts_search
-        return fts_search(query_str, limit=10)
-    except Exception:
-        # Fallback на ILIKE если FTS-таблицы отсутствуют
-        term = f"%{query_str}%"
-        tasks = Task.query.filter(Task.title.ilike(term)).limit(5).all()
-        projects = Project.query.filter(Project.title.ilike(term)).limit(5).all()
-        contacts = Contact.query.filter(
-            or_(Contact.last_name.ilike(term), Contact.first_name.ilike(term))
-        ).limit(5).all()
-        return {
-            'tasks': [t.to_dict() for t in tasks],
-            'projects': [p.to_dict() for p in projects],
-            'contacts': [c.to_dict() for c in contacts]
-        }
+    # FTS5: слова, основы и подстроки (триграммы). FTS-таблицы создаются при
+    # старте (init_db), поэтому запасного полного сканирования таблиц нет.
+    from services.search_service import fts_search
+    return fts_search(query_str, limit=10)
 
 
 def search_by_tag(tag_query: str):
     """
     Поиск сущностей по тегам.
     Возвращает задачи, контакты и проекты (через связанные задачи) с указанными тегами.
+    Теги ищутся по началу имени или слова в имени, сущности — по postings
+    индекса тегов (services.tag_index); из БД загружаются только найденные строки.
     """
+    from services.tag_index import get_tag_index
+    index = get_tag_index()
+
     if not tag_query:
         # Если ввели только #, показываем список всех тегов для автодополнения
-        tags = Tag.query.order_by(Tag.name).limit(10).all()
         return {
-            'tag_suggestions': [t.to_dict() for t in tags],
+            'tag_suggestions': index.suggest('', limit=10),
             'tasks': [],
             'projects': [],
             'contacts': []
         }
 
-    term = f"%{tag_query}%"
-
-    # Находим теги, соответствующие запросу
-    matching_tags = Tag.query.filter(Tag.name.ilike(term)).all()
-
+    matching_tags = index.suggest(tag_query)
     if not matching_tags:
         return {
             'tag_suggestions': [],
@@ -145,27 +156,18 @@ def search_by_tag(tag_query: str):
             'contacts': []
         }
 
-    tag_ids = [t.id for t in matching_tags]
+    tag_ids = [t['id'] for t in matching_tags]
+    task_ids = index.merge(index.tasks, tag_ids, 10)
+    contact_ids = index.merge(index.contacts, tag_ids, 10)
+    project_ids = index.merge(index.projects, tag_ids, 10)
 
-    # Задачи с этими тегами
-    tasks = Task.query.filter(Task.tags.any(Tag.id.in_(tag_ids))).limit(10).all()
-
-    # Контакты с этими тегами
-    contacts = Contact.query.filter(Contact.tags.any(Tag.id.in_(tag_ids))).limit(10).all()
-
-    # Проекты: находим через задачи с этими тегами
-    project_ids = db.session.query(Task.project_id)\
-        .filter(Task.tags.any(Tag.id.in_(tag_ids)))\
-        .filter(Task.project_id.isnot(None))\
-        .distinct()\
-        .limit(10)\
-        .all()
-    project_ids = [p[0] for p in project_ids]
-    projects = Project.query.filter(Project.id.in_(project_ids)).all() if project_ids else []
+    tasks = load_tasks_by_ids(task_ids)
+    contacts = with_contact_profile(Contact.query.filter(Contact.id.in_(contact_ids))).order_by(Contact.id).all() if contact_ids else []
+    projects = Project.query.filter(Project.id.in_(project_ids)).order_by(Project.id).all() if project_ids else []
 
     return {
-        'tag_suggestions': [t.to_dict() for t in matching_tags],
-        'tasks': [t.to_dict() for t in tasks],
+        'tag_suggestions': matching_tags,
+        'tasks': [tasks[i] for i in task_ids if i in tasks],
         'projects': [p.to_dict() for p in projects],
         'contacts': [c.to_dict() for c in contacts]
     }
@@ -186,53 +188,18 @@ def get_recent_viewed(limit=8):
      .limit(limit)\
      .all()
 
+    entities = resolve_entities((entity_type, entity_id) for entity_type, entity_id, _ in subq)
+
     result = []
     for entity_type, entity_id, last_viewed in subq:
-        item = _resolve_entity(entity_type, entity_id)
+        item = entities.get((entity_type, entity_id))
         if item:
-            item['last_viewed'] = last_viewed.strftime('%d.%m %H:%M')
+            item = dict(item, last_viewed=last_viewed.strftime('%d.%m %H:%M'))
             result.append(item)
 
     return result
 
 
-def _resolve_entity(entity_type, entity_id):
-    """Получает краткую информацию о сущности по типу и ID."""
-    if entity_type == 'task':
-        t = Task.query.get(entity_id)
-        if not t:
-            return None
-        return {
-            'entity_type': 'task',
-            'id': t.id,
-            'title': t.title,
-            'status_name': t.status.name if t.status else None,
-            'status_color': t.status.color if t.status else '#94a3b8',
-        }
-    elif entity_type == 'project':
-        p = Project.query.get(entity_id)
-        if not p:
-            return None
-        return {
-            'entity_type': 'project',
-            'id': p.id,
-            'title': p.title,
-            'status_name': p.status,
-        }
-    elif entity_type == 'contact':
-        c = Contact.query.get(entity_id)
-        if not c:
-            return None
-        return {
-            'entity_type': 'contact',
-            'id': c.id,
-            'title': f"{c.last_name} {c.first_name or ''}".strip(),
-            'role': c.role,
-            'type_color': c.contact_type.render_color if c.contact_type else '#cbd5e1',
-        }
-    return None
-
-
 def get_frequent_tags(limit=10):
     """
     Часто используемые теги — по количеству привязок к задачам и контактам.
@@ -271,6 +238,7 @@ def get_recent_activity(limit=15):
     Последние действия (история изменений) из ActivityLog.
     """
     logs = ActivityLog.query.order_by(ActivityLog.created_at.desc()).limit(limit).all()
+    entities = resolve_entities((log.entity_type, log.entity_id) for log in logs)
 
     result = []
     for log in logs:
@@ -285,128 +253,131 @@ def get_recent_activity(limit=15):
             'created_at': log.created_at.strftime('%d.%m %H:%M'),
         }
         # Подгружаем название сущности
-        entity = _resolve_entity(log.entity_type, log.entity_id)
+        entity = entities.get((log.entity_type, log.entity_id))
         item['entity_title'] = entity['title'] if entity else f'#{log.entity_id}'
         result.append(item)
 
     return result
 
 
-def get_daily_standup_data():
+STANDUP_CATEGORIES = ('completed', 'in_progress', 'due_today', 'overdue', 'waiting')
+
+# Категория задачи в блоках по людям, если она попала в несколько списков
+_STANDUP_PRIORITY = ('completed', 'overdue', 'waiting', 'due_today', 'in_progress')
+
+
+def get_daily_standup_data(view='full'):
     """
     Собирает данные для подготовки к дейлику:
     1. Задачи, закрытые за последние 24 часа (Что сделал)
     2. Задачи в работе + к выполнению с дедлайном сегодня (Что планирую)
     3. Блокеры: просроченные и «жду ответа» (Проблемы/блокеры)
     4. Встречи на сегодня
+
+    Все задачи дейлика выбираются одним запросом и сериализуются по одному
+    разу в словарь tasks {id: задача}; списки категорий и блоки по людям
+    (self_tasks, team[].tasks, other_tasks) содержат только id задач.
+
+    view='compact' — задачи в облегчённом представлении (см. services.serialization).
     """
     now = datetime.now()
     since = now - timedelta(hours=24)
     today = date.today()
 
-    done_status = TaskStatus.query.filter_by(name='Готово').first()
-    in_progress_status = TaskStatus.query.filter_by(name='В работе').first()
-    todo_status = TaskStatus.query.filter_by(name='К выполнению').first()
-    waiting_status = TaskStatus.query.filter_by(name='Жду ответа').first()
+    done_id = status_id('Готово')
+    in_progress_id = status_id('В работе')
+    todo_id = status_id('К выполнению')
+    waiting_id = status_id('Жду ответа')
 
     # 1. Закрытые за 24ч (через ActivityLog — событие смены статуса на «Готово»)
-    completed_tasks = []
-    if done_status:
-        done_logs = ActivityLog.query.filter(
+    done_task_ids = set()
+    if done_id:
+        done_task_ids = {task_id for (task_id,) in db.session.query(ActivityLog.entity_id).filter(
             ActivityLog.entity_type == 'task',
             ActivityLog.event_type == 'update',
-            ActivityLog.field_name == 'status',
+            ActivityLog.field_name == 'Статус',
             ActivityLog.new_value == 'Готово',
             ActivityLog.created_at >= since
-        ).all()
-        done_task_ids = [log.entity_id for log in done_logs]
-        if done_task_ids:
-            completed_tasks = Task.query.filter(Task.id.in_(done_task_ids)).all()
-
-    # 2. В работе + к выполнению с дедлайном сегодня
-    in_progress_tasks = []
-    if in_progress_status:
-        in_progress_tasks = Task.query.filter_by(status_id=in_progress_status.id).all()
-
-    due_today_tasks = []
-    if todo_status:
-        due_today_tasks = Task.query.filter(
-            Task.status_id == todo_status.id,
-            Task.due_date == today
-        ).all()
-
-    # 3. Блокеры
-    overdue_tasks = []
-    if in_progress_status and todo_status:
-        overdue_tasks = Task.query.filter(
-            Task.status_id.in_([in_progress_status.id, todo_status.id]),
-            Task.due_date < today
-        ).all()
-
-    waiting_tasks = []
-    if waiting_status:
-        waiting_tasks = Task.query.filter_by(status_id=waiting_status.id).all()
+        ).distinct()}
+
+    # 2-3. Всё остальное — одним запросом: в работе, жду ответа, к выполнению с дедлайном не позже сегодня
+    conditions = [Task.status_id.in_([sid for sid in (in_progress_id, waiting_id) if sid])]
+    if todo_id:
+        conditions.append(and_(Task.status_id == todo_id, Task.due_date <= today))
+    if done_task_ids:
+        conditions.append(Task.id.in_(done_task_ids))
+
+    if view == 'full':
+        query = with_profile(Task.query)
+    else:
+        # Для compact нужны только поля категоризации, задачи сериализуются отдельно
+        query = db.session.query(Task.id, Task.status_id, Task.due_date, Task.assignee_id)
+    tasks = query.filter(or_(*conditions)).order_by(Task.id).all()
+
+    # Категории: id-множества вместо поиска по спискам объектов
+    categories = {name: [] for name in STANDUP_CATEGORIES}
+    for t in tasks:
+        if t.id in done_task_ids:
+            categories['completed'].append(t.id)
+        if t.status_id == in_progress_id:
+            categories['in_progress'].append(t.id)
+        elif t.status_id == waiting_id:
+            categories['waiting'].append(t.id)
+        if t.status_id == todo_id and t.due_date == today:
+            categories['due_today'].append(t.id)
+        if t.status_id in (in_progress_id, todo_id) and t.due_date and t.due_date < today:
+            categories['overdue'].append(t.id)
+
+    category_of = {}
+    for name in reversed(_STANDUP_PRIORITY):
+        category_of.update(dict.fromkeys(categories[name], name))
+
+    if view == 'compact':
+        serialized = load_tasks_by_ids(category_of, 'compact')
+    else:
+        serialized = {t.id: t.to_dict() for t in tasks if t.id in category_of}
 
     # 4. Встречи на сегодня
-    today_meetings = Meeting.query.filter(Meeting.date == today).order_by(Meeting.time).all()
+    today_meetings = meeting_summaries(Meeting.query.filter(Meeting.date == today).order_by(Meeting.time))
 
-    # --- Группировка по команде ---
+    # --- Группировка по людям: один проход по задачам ---
     self_contact = Contact.query.filter_by(is_self=True).first()
-    team_contacts = Contact.query.filter_by(is_team=True).order_by(Contact.last_name).all()
-
-    all_active_tasks = completed_tasks + in_progress_tasks + due_today_tasks + overdue_tasks + waiting_tasks
-    team_ids = {c.id for c in team_contacts}
+    team_contacts = with_contact_profile(Contact.query).filter_by(is_team=True).order_by(Contact.last_name_folded).all()
     self_id = self_contact.id if self_contact else None
 
-    def categorize_task(t):
-        """Определяет категорию задачи: completed/in_progress/due_today/overdue/waiting"""
-        if t in completed_tasks: return 'completed'
-        if t in overdue_tasks: return 'overdue'
-        if t in waiting_tasks: return 'waiting'
-        if t in due_today_tasks: return 'due_today'
-        if t in in_progress_tasks: return 'in_progress'
-        return 'in_progress'
-
-    def build_person_block(tasks_list):
-        """Группирует список задач по категориям"""
-        block = {'completed': [], 'in_progress': [], 'due_today': [], 'overdue': [], 'waiting': []}
-        for t in tasks_list:
-            cat = categorize_task(t)
-            block[cat].append(t.to_dict())
-        return block
-
-    # Задачи self
-    self_tasks = [t for t in all_active_tasks if t.assignee_id == self_id] if self_id else []
-
-    # Задачи каждого члена команды
+    by_assignee = {}
+    for t in tasks:
+        if t.id in category_of:
+            block = by_assignee.setdefault(t.assignee_id, {name: [] for name in STANDUP_CATEGORIES})
+            block[category_of[t.id]].append(t.id)
+
     team_data = []
     for member in team_contacts:
         if member.id == self_id:
             continue  # self уже отдельно
-        member_tasks = [t for t in all_active_tasks if t.assignee_id == member.id]
-        if member_tasks:
-            team_data.append({
-                'contact': member.to_dict(),
-                'tasks': build_person_block(member_tasks),
-            })
+        if member.id in by_assignee:
+            team_data.append({'contact': member.to_dict(), 'tasks': by_assignee[member.id]})
 
     # Прочие задачи (не self, не team)
-    excluded_ids = team_ids | ({self_id} if self_id else set())
-    other_tasks = [t for t in all_active_tasks if t.assignee_id not in excluded_ids]
+    grouped_ids = {c.id for c in team_contacts} | ({self_id} if self_id else set())
+    other_tasks = {name: [] for name in STANDUP_CATEGORIES}
+    for assignee_id, block in by_assignee.items():
+        if assignee_id not in grouped_ids:
+            for name in STANDUP_CATEGORIES:
+                other_tasks[name].extend(block[name])
+    for ids in other_tasks.values():
+        ids.sort()
 
     return {
-        'completed': [t.to_dict() for t in completed_tasks],
-        'in_progress': [t.to_dict() for t in in_progress_tasks],
-        'due_today': [t.to_dict() for t in due_today_tasks],
-        'overdue': [t.to_dict() for t in overdue_tasks],
-        'waiting': [t.to_dict() for t in waiting_tasks],
-        'today_meetings': [m.to_dict() for m in today_meetings],
+        'tasks': serialized,
+        **categories,
+        'today_meetings': today_meetings,
         'generated_at': now.strftime('%d.%m.%Y %H:%M'),
         # Группировка по команде
         'self_contact': self_contact.to_dict() if self_contact else None,
-        'self_tasks': build_person_block(self_tasks) if self_tasks else None,
+        'self_tasks': by_assignee.get(self_id) if self_id else None,
         'team': team_data,
-        'other_tasks': build_person_block(other_tasks) if other_tasks else None,
+        'other_tasks': other_tasks if any(other_tasks.values()) else None,
     }
 
 
@@ -422,75 +393,71 @@ def get_one_on_one_prep_data():
     today = date.today()
     week_ago = now - timedelta(days=7)
 
-    done_status = TaskStatus.query.filter_by(name='Готово').first()
-    in_progress_status = TaskStatus.query.filter_by(name='В работе').first()
-    todo_status = TaskStatus.query.filter_by(name='К выполнению').first()
-    waiting_status = TaskStatus.query.filter_by(name='Жду ответа').first()
-
-    done_id = done_status.id if done_status else -1
-    active_status_ids = [s.id for s in [in_progress_status, todo_status] if s]
-
-    # --- 1. Прогресс по проектам ---
-    active_projects = Project.query.filter_by(status='Active').all()
-    projects_progress = []
-    for p in active_projects:
-        total = len(p.tasks)
-        if total == 0:
-            continue
-        done_count = sum(1 for t in p.tasks if t.status_id == done_id)
-        active_count = sum(1 for t in p.tasks if t.status_id in active_status_ids)
-        overdue_count = sum(
-            1 for t in p.tasks
-            if t.status_id in active_status_ids and t.due_date and t.due_date < today
-        )
-        projects_progress.append({
-            'id': p.id,
-            'title': p.title,
-            'total_tasks': total,
-            'done_tasks': done_count,
-            'active_tasks': active_count,
-            'overdue_tasks': overdue_count,
-            'progress_pct': round(done_count / total * 100) if total else 0,
-        })
-    projects_progress.sort(key=lambda x: x['active_tasks'], reverse=True)
+    done_id = status_id('Готово', -1)
+    waiting_id = status_id('Жду ответа')
+    active_status_ids = status_ids('В работе', 'К выполнению')
+
+    # --- 1. Прогресс по проектам: один GROUP BY с условными суммами ---
+    is_active = Task.status_id.in_(active_status_ids)
+    active_count = func.sum(case((is_active, 1), else_=0))
+    rows = db.session.query(
+        Project.id, Project.title,
+        func.count(Task.id),
+        func.sum(case((Task.status_id == done_id, 1), else_=0)),
+        active_count,
+        func.sum(case((and_(is_active, Task.due_date < today), 1), else_=0)),
+    ).join(Task, Task.project_id == Project.id)\
+     .filter(Project.status == 'Active')\
+     .group_by(Project.id, Project.title)\
+     .order_by(active_count.desc(), Project.id)\
+     .all()
+
+    projects_progress = [{
+        'id': project_id,
+        'title': title,
+        'total_tasks': total,
+        'done_tasks': done_count,
+        'active_tasks': active,
+        'overdue_tasks': overdue,
+        'progress_pct': round(done_count / total * 100),
+    } for project_id, title, total, done_count, active, overdue in rows]
 
     # --- 2. Риски и блокеры ---
-    overdue_tasks = Task.query.filter(
+    overdue_tasks = with_profile(Task.query).filter(
         Task.status_id.in_(active_status_ids),
         Task.due_date < today
     ).order_by(Task.due_date.asc()).all()
 
     waiting_tasks = []
-    if waiting_status:
-        waiting_tasks = Task.query.filter_by(status_id=waiting_status.id).all()
+    if waiting_id:
+        waiting_tasks = with_profile(Task.query).filter_by(status_id=waiting_id).all()
 
     # --- 3. Достижения за неделю (закрытые задачи) ---
-    completed_logs = ActivityLog.query.filter(
+    completed_task_ids = db.session.query(ActivityLog.entity_id).filter(
         ActivityLog.entity_type == 'task',
         ActivityLog.event_type == 'update',
-        ActivityLog.field_name == 'status',
+        ActivityLog.field_name == 'Статус',
         ActivityLog.new_value == 'Готово',
         ActivityLog.created_at >= week_ago
-    ).all()
-    completed_task_ids = list({log.entity_id for log in completed_logs})
-    completed_tasks = Task.query.filter(Task.id.in_(completed_task_ids)).all() if completed_task_ids else []
+    )
+    completed_tasks = with_profile(Task.query).filter(Task.id.in_(completed_task_ids)).all()
 
-    # --- 4. История 1-1 встреч ---
-    one_on_one_type = MeetingType.query.filter_by(name='1-1').first()
+    # --- 4. История 1-1 встреч (сводка без участников, заметок и действий) ---
+    one_on_one_type_id = meeting_type_id('1-1')
     past_meetings = []
-    if one_on_one_type:
-        past_meetings = Meeting.query.filter(
-            Meeting.type_id == one_on_one_type.id,
+    if one_on_one_type_id:
+        past_meetings = meeting_summaries(Meeting.query.filter(
+            Meeting.type_id == one_on_one_type_id,
             Meeting.date <= today
-        ).order_by(Meeting.date.desc()).limit(5).all()
+        ).order_by(Meeting.date.desc()).limit(5))
 
     # --- 5. Запросы ресурсов / вопросы (задачи со статусом "Жду ответа" от автора = self) ---
     self_contact = Contact.query.filter_by(is_self=True).first()
     questions = []
-    if self_contact and waiting_status:
-        questions = Task.query.filter(
+    if self_contact and waiting_id:
+        questions = with_profile(Task.query).filter(
             Task.author_id == self_contact.id,
-            Task.status_id == waiting_status.id
+            Task.status_id == waiting_id
         ).all()
 
     return {
@@ -498,7 +465,7 @@ def get_one_on_one_prep_data():
         'overdue_tasks': [t.to_dict() for t in overdue_tasks],
         'waiting_tasks': [t.to_dict() for t in waiting_tasks],
         'completed_this_week': [t.to_dict() for t in completed_tasks],
-        'past_one_on_ones': [m.to_dict() for m in past_meetings],
+        'past_one_on_ones': past_meetings,
         'questions': [t.to_dict() for t in questions],
         'generated_at': now.strftime('%d.%m.%Y %H:%M'),
     }
\ No newline at end of file
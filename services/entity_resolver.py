@@ -0,0 +1,98 @@
+"""
+Пакетное разрешение ссылок на сущности (entity_type, entity_id).
+
+Ленты «недавно просмотренные», история изменений и подобные списки
+хранят только пару (тип, id). Вместо Task.query.get(...) на каждую строку
+пары группируются по типу, и каждый тип загружается одним IN-запросом
+по колонкам — вместе с цветами статуса и типа контакта через JOIN.
+
+Использование:
+    from services.entity_resolver import resolve_entities
+    refs = resolve_entities([('task', 1), ('contact', 5)])
+    refs.get(('task', 1))  # -> dict или None, если сущность удалена
+"""
+from collections import defaultdict
+from core.database import db
+from core.models import Task, TaskStatus, Project, Contact, ContactType
+
+
+def _contact_title(last_name, first_name):
+    return f"{last_name} {first_name or ''}".strip()
+
+
+def _resolve_tasks(ids):
+    rows = db.session.query(Task.id, Task.title, TaskStatus.id, TaskStatus.name, TaskStatus.color)\
+        .outerjoin(TaskStatus, TaskStatus.id == Task.status_id)\
+        .filter(Task.id.in_(ids))\
+        .all()
+    return {
+        task_id: {
+            'entity_type': 'task',
+            'id': task_id,
+            'title': title,
+            'status_name': status_name,
+            'status_color': status_color if status_id else '#94a3b8',
+        }
+        for task_id, title, status_id, status_name, status_color in rows
+    }
+
+
+def _resolve_projects(ids):
+    rows = db.session.query(Project.id, Project.title, Project.status)\
+        .filter(Project.id.in_(ids))\
+        .all()
+    return {
+        project_id: {
+            'entity_type': 'project',
+            'id': project_id,
+            'title': title,
+            'status_name': status,
+        }
+        for project_id, title, status in rows
+    }
+
+
+def _resolve_contacts(ids):
+    rows = db.session.query(
+        Contact.id, Contact.last_name, Contact.first_name, Contact.role,
+        ContactType.id, ContactType.render_color
+    ).outerjoin(ContactType, ContactType.id == Contact.type_id)\
+     .filter(Contact.id.in_(ids))\
+     .all()
+    return {
+        contact_id: {
+            'entity_type': 'contact',
+            'id': contact_id,
+            'title': _contact_title(last_name, first_name),
+            'role': role,
+            'type_color': type_color if type_id else '#cbd5e1',
+        }
+        for contact_id, last_name, first_name, role, type_id, type_color in rows
+    }
+
+
+# entity_type -> функция {id: dict} по набору id
+ENTITY_RESOLVERS = {
+    'task': _resolve_tasks,
+    'project': _resolve_projects,
+    'contact': _resolve_contacts,
+}
+
+
+def resolve_entities(refs):
+    """
+    refs — итерируемое пар (entity_type, entity_id).
+    Возвращает {(entity_type, entity_id): краткий dict}. Удалённые сущности
+    и неизвестные типы в результат не попадают.
+    Один запрос на каждый встретившийся тип.
+    """
+    ids_by_type = defaultdict(set)
+    for entity_type, entity_id in refs:
+        if entity_type in ENTITY_RESOLVERS and entity_id is not None:
+            ids_by_type[entity_type].add(entity_id)
+
+    resolved = {}
+    for entity_type, ids in ids_by_type.items():
+        for entity_id, item in ENTITY_RESOLVERS[entity_type](ids).items():
+            resolved[(entity_type, entity_id)] = item
+    return resolved
@@ -0,0 +1,209 @@
+"""
+Поток изменений для клиента (Server-Sent Events, /api/events).
+
+Асинхронный подписчик services.change_events превращает события изменения
+данных в события потока и складывает их в кольцевой журнал процесса:
+- task    — {'op', 'id', 'fields', 'task'}: задача в компактном представлении
+            (services.serialization), None для удалённой;
+- meeting — {'op', 'id', 'fields', 'meeting'}: сводка встречи (meeting_summaries);
+- dashboard — {'sections'}: секции главной, которые нужно перечитать
+            (кроме журналов просмотров и действий, QUIET_ENTITIES);
+- reset   — {'entities'}: данные изменены целиком (импорт) — перечитать списки.
+
+Id события — «<эпоха процесса>-<номер>». Клиент возобновляет поток с
+последнего полученного id (заголовок Last-Event-ID или ?last_event_id=).
+Если id из другой эпохи (сервер перезапускался) или уже вытеснен из журнала,
+клиент получает reset и перечитывает данные целиком.
+
+Журнал живёт в памяти процесса: при нескольких воркерах клиент видит
+только изменения, сделанные в том же процессе.
+"""
+import json
+import threading
+import time
+from collections import deque
+from core.models import Meeting
+from services.change_events import subscribe
+from services.dashboard_cache import SECTION_DEPENDENCIES
+from services.serialization import load_tasks_by_ids, meeting_summaries
+
+STREAM_ENTITIES = ('task', 'meeting')
+
+# Журналы просмотров и действий пишутся на каждое открытие карточки и каждое
+# действие — событие dashboard на них перечитывало бы главную у всех клиентов.
+# Их секции обновятся вместе с изменением самих сущностей или при загрузке главной.
+QUIET_ENTITIES = frozenset({'view', 'activity'})
+
+
+class EventLog:
+    """Кольцевой журнал событий потока с ожиданием новых записей."""
+
+    def __init__(self, size):
+        self.epoch = format(int(time.time() * 1000), 'x')
+        self._events = deque(maxlen=size)
+        self._seq = 0
+        self._cond = threading.Condition()
+
+    def _event_id(self, seq):
+        return f'{self.epoch}-{seq}'
+
+    @property
+    def last_event_id(self):
+        with self._cond:
+            return self._event_id(self._seq)
+
+    def append(self, items):
+        """Добавляет [(type, data)] и будит ожидающие потоки."""
+        if not items:
+            return
+        with self._cond:
+            for event_type, data in items:
+                self._seq += 1
+                self._events.append({'id': self._event_id(self._seq), 'seq': self._seq,
+                                     'type': event_type, 'data': data})
+            self._cond.notify_all()
+
+    def parse(self, event_id):
+        """Номер события из id этой эпохи; None — id чужой эпохи или некорректный."""
+        epoch, _, seq = (event_id or '').partition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def since(self, seq):
+        """
+        События после номера seq: (events, reset). reset=True — часть событий
+        уже вытеснена из журнала, клиенту нужно перечитать данные.
+        """
+        with self._cond:
+            if seq > self._seq:
+                return [], True
+            oldest = self._events[0]['seq'] if self._events else self._seq + 1
+            if seq + 1 < oldest:
+                return [], True
+            return [e for e in self._events if e['seq'] > seq], False
+
+    def wait(self, seq, timeout):
+        """Ждёт событие с номером больше seq не дольше timeout секунд."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._seq > seq, timeout)
+
+
+_log = None
+_app = None
+
+
+def get_event_log():
+    return _log
+
+
+def init_event_stream(app):
+    """Создаёт журнал потока и подписывает его на изменения данных."""
+    global _log, _app
+    _log = EventLog(app.config['EVENT_STREAM_BUFFER'])
+    _app = app
+
+
+def _entity_events(events, entity, load):
+    changed = [e for e in events if e.entity == entity and e.op != 'reset']
+    payloads = load({e.entity_id for e in changed if e.op != 'delete'})
+    return [(entity, {'op': e.op, 'id': e.entity_id, 'fields': list(e.fields),
+                      entity: payloads.get(e.entity_id)}) for e in changed]
+
+
+def _load_meetings(meeting_ids):
+    if not meeting_ids:
+        return {}
+    return {m['id']: m for m in meeting_summaries(Meeting.query.filter(Meeting.id.in_(meeting_ids)))}
+
+
+def build_stream_events(events):
+    """[(type, data)] событий потока для пачки ChangeEvent."""
+    items = []
+    reset = sorted({e.entity for e in events if e.op == 'reset'})
+    if reset:
+        items.append(('reset', {'entities': reset}))
+
+    items += _entity_events(events, 'task', lambda ids: load_tasks_by_ids(ids, 'compact'))
+    items += _entity_events(events, 'meeting', _load_meetings)
+
+    sections = set()
+    for e in events:
+        if e.entity not in QUIET_ENTITIES:
+            sections.update(SECTION_DEPENDENCIES.get(e.entity, ()))
+    if sections:
+        items.append(('dashboard', {'sections': sorted(sections)}))
+    return items
+
+
+def _on_changes(events):
+    if _log is None:
+        return
+    with _app.app_context():
+        _log.append(build_stream_events(events))
+
+
+subscribe(_on_changes)
+
+
+# --- Формат text/event-stream ---
+
+def format_sse(event):
+    data = json.dumps(event['data'], ensure_ascii=False, separators=(',', ':'))
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+
+def stream_events(last_event_id=None, heartbeat=None, max_age=None):
+    """
+    Генератор SSE: события после last_event_id, затем новые по мере появления.
+    Без last_event_id поток начинается с текущего момента. Каждые heartbeat
+    секунд без событий — комментарий (соединение не закрывается прокси);
+    через max_age секунд поток завершается, браузер переподключится с Last-Event-ID.
+    """
+    log = _log
+    heartbeat = heartbeat or _app.config['EVENT_STREAM_HEARTBEAT']
+    max_age = max_age or _app.config['EVENT_STREAM_MAX_AGE']
+    deadline = time.monotonic() + max_age
+
+    yield f"retry: {_app.config['EVENT_STREAM_RETRY_MS']}\n\n"
+
+    seq = log.parse(last_event_id) if last_event_id else None
+    if seq is None:
+        # Новый клиент или чужая эпоха: позиция — текущий конец журнала
+        current = log.last_event_id
+        event_type = 'reset' if last_event_id else 'ready'
+        data = {'entities': list(STREAM_ENTITIES)} if last_event_id else {}
+        yield format_sse({'id': current, 'type': event_type, 'data': data})
+        seq = log.parse(current)
+
+    while True:
+        events, reset = log.since(seq)
+        if reset:
+            current = log.last_event_id
+            yield format_sse({'id': current, 'type': 'reset', 'data': {'entities': list(STREAM_ENTITIES)}})
+            seq = log.parse(current)
+            continue
+        for event in events:
+            yield format_sse(event)
+            seq = event['seq']
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        if not log.wait(seq, min(heartbeat, remaining)):
+            yield ': heartbeat\n\n'
+
+
+def events_since(last_event_id):
+    """JSON-вариант возобновления: {'events', 'last_event_id', 'reset'}."""
+    log = _log
+    seq = log.parse(last_event_id)
+    if seq is None:
+        return {'events': [], 'last_event_id': log.last_event_id, 'reset': bool(last_event_id)}
+    events, reset = log.since(seq)
+    last = events[-1]['id'] if events else (log.last_event_id if reset else last_event_id)
+    return {
+        'events': [{'id': e['id'], 'type': e['type'], 'data': e['data']} for e in events],
+        'last_event_id': last,
+        'reset': reset,
+    }
@@ -1,76 +1,166 @@
-"""Сервис экспорта/импорта данных (JSON, CSV)."""
+"""Сервис экспорта/импорта данных (JSON, CSV).
+
+Полный экспорт и CSV отдаются потоком: каждая таблица читается через
+yield_per пачками по EXPORT_BATCH_SIZE (связи подгружаются профилями из
+services.serialization), строки сериализуются и сразу уходят клиенту.
+Отдельные объекты не удерживаются, поэтому память не растёт с размером БД,
+а первые байты уходят до чтения всей базы.
+"""
 import json
 import csv
 import io
+import zlib
 from datetime import datetime
-from core.database import db
-from core.models import Task, Contact, Project, Tag, TaskComment, ActivityLog
+from itertools import chain
+from sqlalchemy.orm import selectinload
+from core.models import Task, Contact, Project, ProjectContact, Tag, TaskComment
+from services.serialization import with_profile, with_contact_profile
+from services.import_service import bulk_import
+
+EXPORT_VERSION = '1.0'
+EXPORT_BATCH_SIZE = 500
+# Размер текстового чанка ответа: мелкие строки склеиваются перед отправкой
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _project_query():
+    # Project.to_dict() считает задачи по статусам и перечисляет команду
+    return Project.query.options(
+        selectinload(Project.tasks).joinedload(Task.status),
+        selectinload(Project.contact_associations).joinedload(ProjectContact.contact),
+    )
+
+
+def _export_sections():
+    """(ключ, модель, запрос) в порядке, удобном для импорта: справочники раньше ссылок на них."""
+    return [
+        ('tags', Tag, Tag.query),
+        ('contacts', Contact, with_contact_profile(Contact.query)),
+        ('projects', Project, _project_query()),
+        ('tasks', Task, with_profile(Task.query)),
+        ('comments', TaskComment, TaskComment.query),
+    ]
+
+
+def _iter_dicts(model, query, batch_size=EXPORT_BATCH_SIZE):
+    """Строки таблицы как dict, пачками по batch_size, в порядке id."""
+    for obj in query.order_by(model.id).yield_per(batch_size):
+        yield obj.to_dict()
+
+
+def _export_meta():
+    return {'exported_at': datetime.now().isoformat(), 'version': EXPORT_VERSION}
+
+
+def _buffered(parts, size=STREAM_CHUNK_SIZE):
+    """Склеивает мелкие строки в чанки примерно по size символов."""
+    buf, buf_len = [], 0
+    for part in parts:
+        buf.append(part)
+        buf_len += len(part)
+        if buf_len >= size:
+            yield ''.join(buf)
+            buf, buf_len = [], 0
+    if buf:
+        yield ''.join(buf)
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False)
 
 
 def export_all_json():
-    """Экспорт всех данных в JSON."""
-    tasks = Task.query.all()
-    contacts = Contact.query.all()
-    projects = Project.query.all()
-    tags = Tag.query.all()
-    comments = TaskComment.query.all()
-
-    data = {
-        'exported_at': datetime.now().isoformat(),
-        'version': '1.0',
-        'tags': [t.to_dict() for t in tags],
-        'contacts': [c.to_dict() for c in contacts],
-        'projects': [p.to_dict() for p in projects],
-        'tasks': [t.to_dict() for t in tasks],
-        'comments': [c.to_dict() for c in comments],
-    }
+    """Экспорт всех данных в JSON (целиком в памяти — для небольших объёмов и тестов)."""
+    data = _export_meta()
+    for key, model, query in _export_sections():
+        data[key] = list(_iter_dicts(model, query))
     return data
 
 
-def export_tasks_csv():
-    """Экспорт задач в CSV (для Excel)."""
-    tasks = Task.query.all()
+def _json_parts():
+    meta = _export_meta()
+    yield '{\n'
+    yield ',\n'.join(f'  {_dumps(k)}: {_dumps(v)}' for k, v in meta.items())
+    for key, model, query in _export_sections():
+        yield f',\n  {_dumps(key)}: ['
+        empty = True
+        for row in _iter_dicts(model, query):
+            yield ('\n    ' if empty else ',\n    ') + _dumps(row)
+            empty = False
+        yield ']' if empty else '\n  ]'
+    yield '\n}\n'
+
+
+def stream_export_json():
+    """
+    Генератор JSON-документа того же формата, что export_all_json().
+    Отдаётся через Response(stream_with_context(...)).
+    """
+    return _buffered(_json_parts())
+
+
+def _ndjson_parts():
+    yield _dumps(dict(_export_meta(), type='meta')) + '\n'
+    for key, model, query in _export_sections():
+        for row in _iter_dicts(model, query):
+            yield _dumps({'type': key, 'data': row}) + '\n'
+
+
+def stream_export_ndjson():
+    """
+    Генератор NDJSON: первая строка — {"type": "meta", ...},
+    далее по строке на запись: {"type": <ключ таблицы>, "data": {...}}.
+    """
+    return _buffered(_ndjson_parts())
 
+
+def _contact_name(c):
+    return f"{c.last_name} {c.first_name or ''}".strip() if c else ''
+
+
+def _csv_lines(header, rows):
+    """Строки CSV (разделитель ';') по одной: писатель пишет в буфер, который сразу очищается."""
     output = io.StringIO()
     writer = csv.writer(output, delimiter=';')
+    for row in chain([header], rows):
+        writer.writerow(row)
+        yield output.getvalue()
+        output.seek(0)
+        output.truncate()
+
+
+TASKS_CSV_HEADER = [
+    'ID', 'Название', 'Описание', 'Статус', 'Дедлайн',
+    'Исполнитель', 'Автор', 'Проект', 'Теги', 'Создано'
+]
+
+CONTACTS_CSV_HEADER = [
+    'ID', 'Фамилия', 'Имя', 'Отчество', 'Должность',
+    'Отдел', 'Email', 'Телефон', 'Тип', 'Теги'
+]
 
-    # Header
-    writer.writerow([
-        'ID', 'Название', 'Описание', 'Статус', 'Дедлайн',
-        'Исполнитель', 'Автор', 'Проект', 'Теги', 'Создано'
-    ])
 
-    for t in tasks:
-        writer.writerow([
+def _task_csv_rows():
+    query = with_profile(Task.query).order_by(Task.id).yield_per(EXPORT_BATCH_SIZE)
+    for t in query:
+        yield [
             t.id,
             t.title,
             t.description or '',
             t.status.name if t.status else '',
             t.due_date.isoformat() if t.due_date else '',
-            f"{t.assignee.last_name} {t.assignee.first_name or ''}".strip() if t.assignee else '',
-            f"{t.author.last_name} {t.author.first_name or ''}".strip() if t.author else '',
+            _contact_name(t.assignee),
+            _contact_name(t.author),
             t.project.title if t.project else '',
             ', '.join(tag.name for tag in t.tags),
             t.created_at.strftime('%Y-%m-%d %H:%M') if t.created_at else '',
-        ])
-
-    return output.getvalue()
-
-
-def export_contacts_csv():
-    """Экспорт контактов в CSV."""
-    contacts = Contact.query.all()
-
-    output = io.StringIO()
-    writer = csv.writer(output, delimiter=';')
+        ]
 
-    writer.writerow([
-        'ID', 'Фамилия', 'Имя', 'Отчество', 'Должность',
-        'Отдел', 'Email', 'Телефон', 'Тип', 'Теги'
-    ])
 
-    for c in contacts:
-        writer.writerow([
+def _contact_csv_rows():
+    query = with_contact_profile(Contact.query).order_by(Contact.id).yield_per(EXPORT_BATCH_SIZE)
+    for c in query:
+        yield [
             c.id,
             c.last_name,
             c.first_name or '',
@@ -81,126 +171,42 @@ def export_contacts_csv():
             c.phone or '',
             c.contact_type.name_type if c.contact_type else '',
             ', '.join(tag.name for tag in c.tags),
-        ])
+        ]
+
+
+def stream_tasks_csv():
+    """Генератор CSV задач (для Excel), чанками по STREAM_CHUNK_SIZE."""
+    return _buffered(_csv_lines(TASKS_CSV_HEADER, _task_csv_rows()))
+
+
+def stream_contacts_csv():
+    """Генератор CSV контактов, чанками по STREAM_CHUNK_SIZE."""
+    return _buffered(_csv_lines(CONTACTS_CSV_HEADER, _contact_csv_rows()))
+
+
+def export_tasks_csv():
+    """Экспорт задач в CSV (для Excel) одной строкой."""
+    return ''.join(stream_tasks_csv())
+
+
+def export_contacts_csv():
+    """Экспорт контактов в CSV одной строкой."""
+    return ''.join(stream_contacts_csv())
+
 
-    return output.getvalue()
+def gzip_stream(chunks, encoding='utf-8'):
+    """Сжимает поток текстовых чанков в gzip на лету, не накапливая результат."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode(encoding))
+        if data:
+            yield data
+    yield compressor.flush()
 
 
-def import_from_json(data):
+def import_from_json(data, progress=None):
     """
-    Импорт данных из JSON.
+    Импорт данных из JSON (пакетный, см. services.import_service).
     Возвращает словарь с количеством импортированных сущностей.
     """
-    from core.models import ContactType, TaskStatus
-
-    stats = {'tags': 0, 'contacts': 0, 'projects': 0, 'tasks': 0}
-
-    # Теги
-    for tag_data in data.get('tags', []):
-        existing = Tag.query.filter_by(name=tag_data['name']).first()
-        if not existing:
-            db.session.add(Tag(name=tag_data['name']))
-            stats['tags'] += 1
-    db.session.flush()
-
-    # Контакты (без связей)
-    contact_map = {}  # old_id -> new Contact
-    for c_data in data.get('contacts', []):
-        existing = Contact.query.filter_by(
-            last_name=c_data['last_name'],
-            first_name=c_data.get('first_name')
-        ).first()
-        if existing:
-            contact_map[c_data['id']] = existing
-            continue
-
-        type_id = None
-        if c_data.get('type') and c_data['type'].get('name_type'):
-            ct = ContactType.query.filter_by(name_type=c_data['type']['name_type']).first()
-            type_id = ct.id if ct else None
-
-        c = Contact(
-            last_name=c_data['last_name'],
-            first_name=c_data.get('first_name'),
-            middle_name=c_data.get('middle_name'),
-            role=c_data.get('role'),
-            department=c_data.get('department'),
-            email=c_data.get('email'),
-            phone=c_data.get('phone'),
-            notes=c_data.get('notes'),
-            type_id=type_id,
-        )
-        # Теги
-        for tag_info in c_data.get('tags', []):
-            tag = Tag.query.filter_by(name=tag_info['name']).first()
-            if tag:
-                c.tags.append(tag)
-
-        db.session.add(c)
-        db.session.flush()
-        contact_map[c_data['id']] = c
-        stats['contacts'] += 1
-
-    # Проекты
-    project_map = {}
-    for p_data in data.get('projects', []):
-        existing = Project.query.filter_by(title=p_data['title']).first()
-        if existing:
-            project_map[p_data['id']] = existing
-            continue
-
-        p = Project(
-            title=p_data['title'],
-            description=p_data.get('description'),
-            status=p_data.get('status', 'Active'),
-        )
-        db.session.add(p)
-        db.session.flush()
-        project_map[p_data['id']] = p
-        stats['projects'] += 1
-
-    # Задачи
-    for t_data in data.get('tasks', []):
-        existing = Task.query.filter_by(title=t_data['title']).first()
-        if existing:
-            continue
-
-        status_id = None
-        if t_data.get('status') and t_data['status'].get('name'):
-            st = TaskStatus.query.filter_by(name=t_data['status']['name']).first()
-            status_id = st.id if st else None
-        if not status_id:
-            default_st = TaskStatus.query.first()
-            status_id = default_st.id if default_st else 1
-
-        assignee = contact_map.get(t_data.get('assignee_id'))
-        author = contact_map.get(t_data.get('author_id'))
-        project = project_map.get(t_data.get('project_id'))
-
-        from datetime import date as date_cls
-        due = None
-        if t_data.get('due_date'):
-            try:
-                due = date_cls.fromisoformat(t_data['due_date'])
-            except (ValueError, TypeError):
-                pass
-
-        t = Task(
-            title=t_data['title'],
-            description=t_data.get('description'),
-            due_date=due,
-            status_id=status_id,
-            assignee_id=assignee.id if assignee else None,
-            author_id=author.id if author else None,
-            project_id=project.id if project else None,
-        )
-        for tag_info in t_data.get('tags', []):
-            tag = Tag.query.filter_by(name=tag_info['name']).first()
-            if tag:
-                t.tags.append(tag)
-
-        db.session.add(t)
-        stats['tasks'] += 1
-
-    db.session.commit()
-    return stats
+    return bulk_import(data, progress)
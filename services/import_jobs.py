@@ -0,0 +1,137 @@
+"""
+Фоновые задачи импорта JSON/NDJSON.
+
+Запрос только сохраняет загруженный файл во временный файл (потоково)
+и создаёт запись ImportJob. Сам импорт выполняется в пуле из одного
+потока: SQLite допускает одного писателя, так что импорты всё равно
+шли бы по очереди. Файл разбирается инкрементально (services.json_stream)
+и вставляется пачками (services.import_service).
+
+Статус и итоговая статистика хранятся в таблице import_jobs. Текущий
+прогресс (этап и число обработанных записей) держится в памяти процесса:
+импорт идёт одной транзакцией, и промежуточные записи в таблицу были бы
+невидимы до её конца.
+
+Очередь тоже живёт в памяти: задачи, не завершённые до перезапуска,
+при старте (fail_interrupted_jobs из init_db) помечаются failed,
+а их временные файлы удаляются.
+"""
+import os
+import json
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from core.database import db
+from core.models import ImportJob
+from services.import_service import bulk_import_sections
+from services.json_stream import iter_json_sections, iter_ndjson_sections
+
+IMPORT_FORMATS = ('json', 'ndjson')
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='import-job')
+_progress = {}  # job_id -> {'stage', 'processed', 'total'}
+_lock = threading.Lock()
+
+
+def _set_progress(job_id, stage, done, total):
+    with _lock:
+        _progress[job_id] = {'stage': stage, 'processed': done, 'total': total}
+
+
+def save_upload(stream, suffix='.json'):
+    """Копирует поток загрузки во временный файл кусками; возвращает путь."""
+    fd, path = tempfile.mkstemp(prefix='kbase_import_', suffix=suffix)
+    with os.fdopen(fd, 'wb') as out:
+        shutil.copyfileobj(stream, out)
+    return path
+
+
+def _iter_sections(fp, fmt):
+    return iter_ndjson_sections(fp) if fmt == 'ndjson' else iter_json_sections(fp)
+
+
+def _run_job(app, job_id, path):
+    with app.app_context():
+        # Вся работа с задачей — внутри try: даже если не удалось записать статус
+        # running (например, database is locked), задача станет failed, а файл удалится
+        try:
+            job = db.session.get(ImportJob, job_id)
+            job.status = 'running'
+            job.started_at = datetime.now()
+            db.session.commit()
+
+            with open(path, 'rb') as fp:
+                stats = bulk_import_sections(
+                    _iter_sections(fp, job.format),
+                    progress=lambda stage, done, total: _set_progress(job_id, stage, done, total)
+                )
+            job = db.session.get(ImportJob, job_id)
+            job.status = 'done'
+            job.stats = json.dumps(stats)
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(ImportJob, job_id)
+            job.status = 'failed'
+            job.error = str(e)
+        finally:
+            with _lock:
+                _progress.pop(job_id, None)
+            os.remove(path)
+            job.finished_at = datetime.now()
+            job.upload_path = None
+            db.session.commit()
+
+
+def start_import_job(path, filename=None, fmt='json'):
+    """
+    Регистрирует задачу импорта файла path (файл удаляется по завершении)
+    и ставит её в очередь. Ключ конфигурации IMPORT_JOBS_INLINE (по умолчанию
+    False, в Config не задан) выполняет задачу сразу, в текущем запросе, —
+    его включают тесты (tests/conftest.py). Возвращает ImportJob.
+    """
+    job = ImportJob(filename=filename, format=fmt, status='pending', upload_path=path)
+    db.session.add(job)
+    db.session.commit()
+
+    app = current_app._get_current_object()
+    if app.config.get('IMPORT_JOBS_INLINE', False):
+        _run_job(app, job.id, path)
+        db.session.refresh(job)
+    else:
+        _executor.submit(_run_job, app, job.id, path)
+    return job
+
+
+def get_import_job(job_id):
+    """Состояние задачи: запись import_jobs плюс текущий прогресс, если она выполняется."""
+    job = db.session.get(ImportJob, job_id)
+    if not job:
+        return None
+    data = job.to_dict()
+    with _lock:
+        data['progress'] = _progress.get(job_id)
+    return data
+
+
+INTERRUPTED_ERROR = 'Импорт прерван перезапуском сервера'
+
+
+def fail_interrupted_jobs():
+    """
+    Помечает failed задачи, оставшиеся pending/running после перезапуска
+    (очередь в памяти потеряна), и удаляет их временные файлы.
+    Возвращает число таких задач.
+    """
+    jobs = ImportJob.query.filter(ImportJob.status.in_(('pending', 'running'))).all()
+    for job in jobs:
+        if job.upload_path and os.path.exists(job.upload_path):
+            os.remove(job.upload_path)
+        job.status = 'failed'
+        job.error = INTERRUPTED_ERROR
+        job.finished_at = datetime.now()
+        job.upload_path = None
+    db.session.commit()
+    return len(jobs)
@@ -0,0 +1,298 @@
+"""
+Пакетный импорт JSON-экспорта (формат services.export_service).
+
+Вместо запроса на каждую сущность и каждую ссылку на тег:
+1. существующие натуральные ключи (имя тега, ФИО контакта, название
+   проекта/задачи) и справочники загружаются в dict одним запросом на таблицу;
+2. записи обрабатываются пачками по IMPORT_CHUNK_SIZE: новые строки
+   вставляются одним executemany, их id дочитываются одним запросом
+   (id > максимума до вставки), связи task_tags / contact_tags пишутся
+   одним executemany на пачку.
+
+Источник — dict (bulk_import) или поток секций (bulk_import_sections),
+в том числе разбираемый из файла инкрементально (services.json_stream).
+
+Всё выполняется в одной транзакции: при ошибке сессия откатывается целиком.
+
+Семантика прежняя: сущность с уже существующим ключом не создаётся
+(контакты и проекты при этом используются для ссылок из задач),
+теги берутся по имени, статус — по имени или первый существующий.
+Комментарии не импортируются.
+
+Ход выполнения передаётся в progress(stage, done, total), если он задан.
+"""
+from datetime import date
+from itertools import islice
+from sqlalchemy import insert, func
+from core.database import db
+from core.models import (
+    Task, Contact, Project, Tag, ContactType, TaskStatus, task_tags, contact_tags
+)
+from services.change_events import publish_reset
+
+IMPORT_CHUNK_SIZE = 1000
+
+IMPORT_STAGES = ('tags', 'contacts', 'projects', 'tasks')
+
+
+def _chunks(records, size=IMPORT_CHUNK_SIZE):
+    """Списки по size элементов из любого итерируемого (в том числе генератора)."""
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _max_id(model):
+    return db.session.query(func.coalesce(func.max(model.id), 0)).scalar()
+
+
+def _contact_key(last_name, first_name):
+    return (last_name, first_name)
+
+
+def _parse_date(value):
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _tag_names(record):
+    return [t['name'] for t in record.get('tags', []) if t.get('name')]
+
+
+class _Importer:
+    def __init__(self, progress=None):
+        self.progress = progress
+        self.stats = {stage: 0 for stage in IMPORT_STAGES}
+        self.tag_ids = {}
+        self.contact_map = {}  # id из файла -> id в БД
+        self.project_map = {}
+
+    def _report(self, stage, done, total=None):
+        if self.progress:
+            self.progress(stage, done, total)
+
+    def _stage(self, stage, records, total, import_chunk):
+        """Прогоняет записи этапа пачками: import_chunk(chunk) -> число созданных строк."""
+        done = 0
+        self._report(stage, done, total)
+        for chunk in _chunks(records):
+            self.stats[stage] += import_chunk(chunk)
+            done += len(chunk)
+            self._report(stage, done, total)
+
+    def _insert(self, model, rows):
+        """executemany новых строк; возвращает запрос на только что вставленные."""
+        before = _max_id(model)
+        db.session.execute(insert(model.__table__), rows)
+        return lambda *cols: db.session.query(*cols).filter(model.id > before)
+
+    def _link_tags(self, table, owner_col, owner_tags):
+        """owner_tags — [(owner_id, [имена тегов])]; пишет связи одним executemany."""
+        rows = []
+        seen = set()
+        for owner_id, names in owner_tags:
+            for name in names:
+                tag_id = self.tag_ids.get(name)
+                if tag_id and (owner_id, tag_id) not in seen:
+                    seen.add((owner_id, tag_id))
+                    rows.append({owner_col: owner_id, 'tag_id': tag_id})
+        if rows:
+            db.session.execute(insert(table), rows)
+
+    # --- этапы ---
+
+    def import_tags(self, records, total=None):
+        def import_chunk(chunk):
+            new_names = []
+            for tag_data in chunk:
+                name = tag_data.get('name')
+                if name and name not in self.tag_ids and name not in new_names:
+                    new_names.append(name)
+            if not new_names:
+                return 0
+            inserted = self._insert(Tag, [{'name': n} for n in new_names])
+            self.tag_ids.update(inserted(Tag.name, Tag.id).all())
+            return len(new_names)
+
+        self._stage('tags', records, total, import_chunk)
+
+    def import_contacts(self, records, total=None):
+        type_ids = dict(db.session.query(ContactType.name_type, ContactType.id).all())
+        existing = {
+            _contact_key(last, first): cid
+            for cid, last, first in db.session.query(Contact.id, Contact.last_name, Contact.first_name).all()
+        }
+
+        def import_chunk(chunk):
+            pending = {}  # ключ -> [id из файла]
+            rows, tag_names = [], {}
+            for c_data in chunk:
+                key = _contact_key(c_data['last_name'], c_data.get('first_name'))
+                if key in existing:
+                    self.contact_map[c_data.get('id')] = existing[key]
+                    continue
+                if key in pending:
+                    pending[key].append(c_data.get('id'))
+                    continue
+                pending[key] = [c_data.get('id')]
+
+                contact_type = c_data.get('type') or {}
+                rows.append({
+                    'last_name': c_data['last_name'],
+                    'first_name': c_data.get('first_name'),
+                    'middle_name': c_data.get('middle_name'),
+                    'role': c_data.get('role'),
+                    'department': c_data.get('department'),
+                    'email': c_data.get('email'),
+                    'phone': c_data.get('phone'),
+                    'notes': c_data.get('notes'),
+                    'type_id': type_ids.get(contact_type.get('name_type')),
+                })
+                tag_names[key] = _tag_names(c_data)
+
+            if not rows:
+                return 0
+            inserted = self._insert(Contact, rows)
+            owner_tags = []
+            for cid, last, first in inserted(Contact.id, Contact.last_name, Contact.first_name).all():
+                key = _contact_key(last, first)
+                existing[key] = cid
+                for file_id in pending.get(key, []):
+                    self.contact_map[file_id] = cid
+                owner_tags.append((cid, tag_names.get(key, [])))
+            self._link_tags(contact_tags, 'contact_id', owner_tags)
+            return len(rows)
+
+        self._stage('contacts', records, total, import_chunk)
+
+    def import_projects(self, records, total=None):
+        existing = dict(db.session.query(Project.title, Project.id).all())
+
+        def import_chunk(chunk):
+            pending = {}
+            rows = []
+            for p_data in chunk:
+                title = p_data['title']
+                if title in existing:
+                    self.project_map[p_data.get('id')] = existing[title]
+                    continue
+                if title in pending:
+                    pending[title].append(p_data.get('id'))
+                    continue
+                pending[title] = [p_data.get('id')]
+                rows.append({
+                    'title': title,
+                    'description': p_data.get('description'),
+                    'status': p_data.get('status', 'Active'),
+                })
+
+            if not rows:
+                return 0
+            inserted = self._insert(Project, rows)
+            for pid, title in inserted(Project.id, Project.title).all():
+                existing[title] = pid
+                for file_id in pending.get(title, []):
+                    self.project_map[file_id] = pid
+            return len(rows)
+
+        self._stage('projects', records, total, import_chunk)
+
+    def import_tasks(self, records, total=None):
+        status_ids = dict(db.session.query(TaskStatus.name, TaskStatus.id).all())
+        default_status = db.session.query(func.min(TaskStatus.id)).scalar() or 1
+        existing = {title for (title,) in db.session.query(Task.title).all()}
+
+        def import_chunk(chunk):
+            rows, tag_names = [], {}
+            for t_data in chunk:
+                title = t_data['title']
+                if title in existing:
+                    continue
+                existing.add(title)
+
+                status = t_data.get('status') or {}
+                rows.append({
+                    'title': title,
+                    'description': t_data.get('description'),
+                    'due_date': _parse_date(t_data.get('due_date')),
+                    'status_id': status_ids.get(status.get('name')) or default_status,
+                    'assignee_id': self.contact_map.get(t_data.get('assignee_id')),
+                    'author_id': self.contact_map.get(t_data.get('author_id')),
+                    'project_id': self.project_map.get(t_data.get('project_id')),
+                })
+                tag_names[title] = _tag_names(t_data)
+
+            if not rows:
+                return 0
+            inserted = self._insert(Task, rows)
+            self._link_tags(task_tags, 'task_id', [
+                (tid, tag_names.get(title, [])) for tid, title in inserted(Task.id, Task.title).all()
+            ])
+            return len(rows)
+
+        self._stage('tasks', records, total, import_chunk)
+
+    def run(self, sections):
+        """
+        sections — пары (ключ, итерируемое записей) в порядке документа.
+        Этап выполняется потоково, если все предыдущие этапы уже прошли;
+        иначе его записи откладываются в память до конца документа.
+        """
+        stages = {
+            'tags': self.import_tags,
+            'contacts': self.import_contacts,
+            'projects': self.import_projects,
+            'tasks': self.import_tasks,
+        }
+        self.tag_ids = dict(db.session.query(Tag.name, Tag.id).all())
+        done, deferred = set(), {}
+        try:
+            for key, records in sections:
+                if key not in stages or key in done or key in deferred:
+                    continue
+                if not isinstance(records, (list, tuple)) and not hasattr(records, '__next__'):
+                    raise ValueError(f'Секция {key!r} должна быть массивом')
+                if all(s in done for s in IMPORT_STAGES[:IMPORT_STAGES.index(key)]):
+                    stages[key](records, getattr(records, '__len__', lambda: None)())
+                    done.add(key)
+                else:
+                    deferred[key] = list(records)
+            for key in IMPORT_STAGES:
+                if key in deferred:
+                    stages[key](deferred[key], len(deferred[key]))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return self.stats
+
+
+def _finish(stats):
+    # Вставки шли в обход ORM — событий изменения не было, сообщаем подписчикам целиком
+    publish_reset('tag', 'contact', 'project', 'task')
+    return stats
+
+
+def bulk_import(data, progress=None):
+    """
+    Импортирует данные экспорта (dict) одной транзакцией.
+    Возвращает {'tags', 'contacts', 'projects', 'tasks'} — число созданных записей.
+    """
+    sections = ((key, data.get(key) or []) for key in IMPORT_STAGES)
+    return _finish(_Importer(progress).run(sections))
+
+
+def bulk_import_sections(sections, progress=None):
+    """
+    То же для потока секций (см. services.json_stream): записи читаются
+    и вставляются пачками, документ целиком в память не загружается.
+    total в progress для потоковых секций — None.
+    """
+    return _finish(_Importer(progress).run(sections))
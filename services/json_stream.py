@@ -0,0 +1,134 @@
+"""
+Инкрементальное чтение JSON-экспорта из файла.
+
+Документ вида {"key": scalar, "section": [{...}, {...}], ...} читается
+кусками по READ_SIZE: элементы массивов разбираются по одному через
+JSONDecoder.raw_decode, поэтому в памяти одновременно находится только
+текущий элемент и небольшой буфер, а не весь документ.
+
+NDJSON-экспорт ({"type": ..., "data": ...} по строке) читается построчно
+и группируется в секции по подряд идущим type.
+"""
+import codecs
+import json
+from itertools import groupby
+
+READ_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\r\n\ufeff'
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    def __init__(self, fp):
+        self.fp = fp
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        # Инкрементальный декодер: многобайтный символ может разрезаться границей куска
+        self.decoder = codecs.getincrementaldecoder('utf-8-sig')()
+
+    def _fill(self):
+        """Дочитывает следующий кусок в буфер. False — файл закончился."""
+        while not self.eof:
+            raw = self.fp.read(READ_SIZE)
+            chunk = self.decoder.decode(raw, final=not raw) if isinstance(raw, bytes) else raw
+            if not raw:
+                self.eof = True
+            if chunk:
+                # Отбрасываем уже разобранную часть буфера
+                self.buf = self.buf[self.pos:] + chunk
+                self.pos = 0
+                return True
+        return False
+
+    def peek(self):
+        """Следующий непробельный символ (без потребления) или '' в конце файла."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f'Ожидался символ {char!r} (позиция {self.pos})')
+        self.pos += 1
+
+    def value(self):
+        """Следующее JSON-значение целиком."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # Число в конце буфера может продолжаться в следующем куске
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def _iter_array(reader):
+    reader.expect('[')
+    if reader.peek() == ']':
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        char = reader.peek()
+        reader.pos += 1
+        if char == ']':
+            return
+        if char != ',':
+            raise ValueError(f'Ожидался "," или "]" (позиция {reader.pos})')
+
+
+def iter_json_sections(fp):
+    """
+    Пары (ключ, значение) верхнего уровня JSON-объекта из файла fp.
+    Для массивов значение — генератор элементов; его нужно дочитать
+    (или бросить — остаток будет пропущен) до перехода к следующей паре.
+    """
+    reader = _Reader(fp)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        key = reader.value()
+        reader.expect(':')
+        if reader.peek() == '[':
+            items = _iter_array(reader)
+            yield key, items
+            for _ in items:  # дочитываем непрочитанный остаток
+                pass
+        else:
+            yield key, reader.value()
+
+        char = reader.peek()
+        reader.pos += 1
+        if char == '}':
+            return
+        if char != ',':
+            raise ValueError(f'Ожидался "," или "}}" (позиция {reader.pos})')
+
+
+def iter_ndjson_sections(fp):
+    """(type, генератор data) для подряд идущих строк NDJSON-экспорта с одинаковым type."""
+    def records():
+        for line in fp:
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+    for key, group in groupby(records(), key=lambda r: r.get('type')):
+        if key == 'meta':
+            continue
+        yield key, (r.get('data') or {} for r in group)
@@ -0,0 +1,111 @@
+"""
+Процессный кэш справочников: статусы задач, типы контактов, типы встреч.
+
+Сервисы постоянно ищут статус по имени ('Готово', 'В работе', ...).
+Вместо TaskStatus.query.filter_by(name=...) на каждый вызов справочник
+загружается одним запросом и дальше разрешается из памяти.
+
+Кэш сбрасывается по событиям шины services.change_events, то есть после
+коммита: откатанные изменения его не трогают. Справочник, загруженный
+в транзакции с ещё не закоммиченными правками справочника, в кэш
+не кладётся. Массовые UPDATE/DELETE в обход ORM событий не порождают —
+после них нужно вызвать invalidate() или change_events.publish_reset().
+
+Использование:
+    from services.lookup_service import status_id
+    done_id = status_id('Готово')
+"""
+import threading
+from core.database import db
+from core.models import TaskStatus, ContactType, MeetingType
+from services.change_events import subscribe, pending_entities
+
+# kind (он же тип сущности в change_events) -> (модель, колонка имени, колонка цвета)
+_LOOKUPS = {
+    'task_status': (TaskStatus, TaskStatus.name, TaskStatus.color),
+    'contact_type': (ContactType, ContactType.name_type, ContactType.render_color),
+    'meeting_type': (MeetingType, MeetingType.name, MeetingType.color),
+}
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def _load(kind):
+    """{'by_name': {name: id}, 'by_id': {id: {'id', 'name', 'color'}}} для справочника kind."""
+    entry = _cache.get(kind)
+    if entry is not None:
+        return entry
+
+    model, name_col, color_col = _LOOKUPS[kind]
+    with _lock:
+        entry = _cache.get(kind)
+        if entry is None:
+            rows = db.session.query(model.id, name_col, color_col).all()
+            entry = {
+                'by_name': {name: row_id for row_id, name, _ in rows},
+                'by_id': {row_id: {'id': row_id, 'name': name, 'color': color} for row_id, name, color in rows},
+            }
+            # Незакоммиченные строки видны только своей транзакции — в общий кэш их не кладём
+            if kind not in pending_entities(db.session):
+                _cache[kind] = entry
+    return entry
+
+
+def invalidate(kind=None):
+    """Сбрасывает кэш одного справочника или всех сразу."""
+    with _lock:
+        if kind is None:
+            _cache.clear()
+        else:
+            _cache.pop(kind, None)
+
+
+def lookup_id(kind, name, default=None):
+    return _load(kind)['by_name'].get(name, default)
+
+
+def lookup(kind, row_id):
+    """Запись справочника по id: {'id', 'name', 'color'} или None."""
+    return _load(kind)['by_id'].get(row_id)
+
+
+# --- Статусы задач ---
+
+def status_id(name, default=None):
+    """id статуса задачи по имени."""
+    return lookup_id('task_status', name, default)
+
+
+def status_ids(*names):
+    """id существующих статусов из перечня имён (отсутствующие пропускаются)."""
+    by_name = _load('task_status')['by_name']
+    return [by_name[n] for n in names if n in by_name]
+
+
+def status_map():
+    """Копия {name: id} по всем статусам задач."""
+    return dict(_load('task_status')['by_name'])
+
+
+def status_name(row_id):
+    item = lookup('task_status', row_id)
+    return item['name'] if item else None
+
+
+# --- Типы контактов и встреч ---
+
+def contact_type_id(name, default=None):
+    return lookup_id('contact_type', name, default)
+
+
+def meeting_type_id(name, default=None):
+    return lookup_id('meeting_type', name, default)
+
+
+def _on_changes(events):
+    for kind in {e.entity for e in events}:
+        invalidate(kind)
+
+
+subscribe(_on_changes, entities=_LOOKUPS, sync=True)
@@ -1,18 +1,115 @@
+import base64
+import json
+from sqlalchemy import and_, or_
 from core.database import db
 from core.models import (
     Meeting, MeetingType, MeetingActionItem, MeetingNote,
     Task, TaskStatus, Contact
 )
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, time, timedelta
 from services.activity_service import log_change, get_activity_log
+from services.lookup_service import status_id as lookup_status_id
+from services.serialization import meeting_summaries, with_meeting_detail
 
 
 def get_meeting_types():
     return MeetingType.query.order_by(MeetingType.id).all()
 
 
-def get_all_meetings():
-    return Meeting.query.order_by(Meeting.date.desc(), Meeting.time.desc()).all()
+# Порядок списка встреч — новые сверху. Он же — ключ keyset-пагинации: (date, time, id).
+# Встречи без времени идут в конце своего дня.
+MEETING_LIST_ORDER = (Meeting.date.desc(), Meeting.time.is_(None), Meeting.time.desc(), Meeting.id.desc())
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def _apply_meeting_filters(query, filters):
+    """
+    Накладывает серверные фильтры на запрос встреч.
+
+    filters — dict с необязательными ключами:
+        type_id            — int
+        date_from, date_to — date (включительно)
+    """
+    if not filters:
+        return query
+
+    if filters.get('type_id'):
+        query = query.filter(Meeting.type_id == filters['type_id'])
+    if filters.get('date_from'):
+        query = query.filter(Meeting.date >= filters['date_from'])
+    if filters.get('date_to'):
+        query = query.filter(Meeting.date <= filters['date_to'])
+
+    return query
+
+
+def encode_meeting_cursor(item):
+    """Упаковывает ключ сортировки сводки встречи в непрозрачную строку курсора."""
+    key = [item['date'], item['time'], item['id']]
+    raw = json.dumps(key, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_meeting_cursor(cursor):
+    """Распаковывает курсор. При некорректном значении бросает ValueError."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        day, at, meeting_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return date.fromisoformat(day), time.fromisoformat(at) if at is not None else None, int(meeting_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError('Некорректный курсор')
+
+
+def _after_cursor(query, cursor):
+    """Условие keyset: строки строго после (date, time, id) в порядке MEETING_LIST_ORDER."""
+    day, at, meeting_id = decode_meeting_cursor(cursor)
+
+    if at is None:
+        # Внутри дня остались только встречи без времени с меньшим id
+        same_day = and_(Meeting.time.is_(None), Meeting.id < meeting_id)
+    else:
+        same_day = or_(
+            Meeting.time.is_(None),
+            Meeting.time < at,
+            and_(Meeting.time == at, Meeting.id < meeting_id)
+        )
+
+    return query.filter(or_(
+        Meeting.date < day,
+        and_(Meeting.date == day, same_day)
+    ))
+
+
+def get_meeting_list(filters=None):
+    """Отфильтрованный список встреч в виде сводок (см. services.serialization.meeting_summaries)."""
+    query = _apply_meeting_filters(Meeting.query, filters)
+    return meeting_summaries(query.order_by(*MEETING_LIST_ORDER))
+
+
+def get_meetings_page(filters=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Страница сводок встреч с keyset-пагинацией по (date, time, id).
+
+    Возвращает dict: items, next_cursor (str или None), has_more.
+    """
+    limit = max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+
+    query = _apply_meeting_filters(Meeting.query, filters)
+    if cursor:
+        query = _after_cursor(query, cursor)
+
+    # Берём на одну строку больше, чтобы понять, есть ли следующая страница
+    rows = meeting_summaries(query.order_by(*MEETING_LIST_ORDER).limit(limit + 1))
+    has_more = len(rows) > limit
+    items = rows[:limit]
+
+    return {
+        'items': items,
+        'next_cursor': encode_meeting_cursor(items[-1]) if has_more else None,
+        'has_more': has_more,
+    }
 
 
 def get_meeting_by_id(meeting_id):
@@ -20,7 +117,7 @@ def get_meeting_by_id(meeting_id):
 
 
 def get_meeting_full_details(meeting_id):
-    m = Meeting.query.get(meeting_id)
+    m = with_meeting_detail(Meeting.query).filter(Meeting.id == meeting_id).first()
     if not m:
         return None
 
@@ -230,8 +327,7 @@ def convert_note_to_task(note_id):
     if not note:
         return None
 
-    default_status = TaskStatus.query.filter_by(name='К выполнению').first()
-    status_id = default_status.id if default_status else 1
+    status_id = lookup_status_id('К выполнению', 1)
 
     meeting = note.meeting
 
@@ -308,8 +404,7 @@ def convert_action_item_to_task(item_id):
     if not ai:
         return None
 
-    default_status = TaskStatus.query.filter_by(name='К выполнению').first()
-    status_id = default_status.id if default_status else 1
+    status_id = lookup_status_id('К выполнению', 1)
 
     meeting = ai.meeting
 
@@ -336,8 +431,8 @@ def convert_action_item_to_task(item_id):
 def get_upcoming_meetings(days=7):
     today = date.today()
     end_date = today + timedelta(days=days)
-    return Meeting.query.filter(
+    return meeting_summaries(Meeting.query.filter(
         Meeting.date >= today,
         Meeting.date <= end_date,
         Meeting.status.in_(['planned', 'in_progress'])
-    ).order_by(Meeting.date, Meeting.time).all()
+    ).order_by(Meeting.date, Meeting.time))
@@ -1,163 +1,200 @@
+"""
+Еженедельный отчёт.
+
+Секции считаются агрегатами в SQL (GROUP BY project_id, status_id /
+GROUP BY assignee_id) и id-запросами. Все задачи, которые попадают в
+отчёт, гидрируются одним пакетом в конце — число запросов не зависит
+от количества задач.
+"""
 from datetime import datetime, timedelta, date
+from sqlalchemy import func
 from core.database import db
-from core.models import Task, ActivityLog, TaskStatus, Project, Contact
+from core.models import Task, ActivityLog, Project, Contact
+from services.serialization import load_tasks_by_ids, with_contact_profile
+from services.lookup_service import status_map
 
 
-def get_blockers_and_risks():
+def _ids(query):
+    """Выполняет id-запрос задач, сохраняя порядок."""
+    return [row[0] for row in query.with_entities(Task.id).all()]
+
+
+def _completed_log_ids(date_from, date_to_end):
+    """Подзапрос: id задач, переведённых в «Готово» за период."""
+    return db.session.query(ActivityLog.entity_id).filter(
+        ActivityLog.entity_type == 'task',
+        ActivityLog.field_name == 'Статус',
+        ActivityLog.new_value == 'Готово',
+        ActivityLog.created_at >= date_from,
+        ActivityLog.created_at <= date_to_end
+    )
+
+
+def _hydrate(sections, view):
     """
-    Возвращает задачи-блокеры и риски:
-    1. Просроченные задачи (due_date в прошлом, не завершены)
-    2. Задачи без исполнителя (активные)
-    3. Застрявшие в работе (>7 дней в статусе "В работе")
+    sections — вложенный dict, где листья — списки id задач.
+    Все id загружаются одним пакетом, листья заменяются сериализованными задачами.
     """
+    all_ids = set()
+
+    def collect(node):
+        for value in node.values():
+            if isinstance(value, dict):
+                collect(value)
+            else:
+                all_ids.update(value)
+
+    collect(sections)
+    tasks = load_tasks_by_ids(all_ids, view)
+
+    def fill(node):
+        return {
+            key: fill(value) if isinstance(value, dict) else [tasks[i] for i in value if i in tasks]
+            for key, value in node.items()
+        }
+
+    return fill(sections)
+
+
+def _blocker_ids(statuses):
     today = date.today()
-    done_status = TaskStatus.query.filter_by(name='Готово').first()
-    done_id = done_status.id if done_status else -1
-    in_progress_status = TaskStatus.query.filter_by(name='В работе').first()
+    done_id = statuses.get('Готово', -1)
+    in_progress_id = statuses.get('В работе')
 
     # 1. Просроченные задачи
-    overdue_tasks = Task.query.filter(
+    overdue = _ids(Task.query.filter(
         Task.due_date < today,
         Task.status_id != done_id
-    ).order_by(Task.due_date.asc()).all()
+    ).order_by(Task.due_date.asc()))
 
     # 2. Задачи без исполнителя (активные - не завершённые)
-    no_assignee_tasks = Task.query.filter(
+    no_assignee = _ids(Task.query.filter(
         Task.assignee_id.is_(None),
         Task.status_id != done_id
-    ).order_by(Task.created_at.desc()).all()
+    ).order_by(Task.created_at.desc()))
 
-    # 3. Застрявшие в работе (>7 дней)
-    stuck_tasks = []
-    if in_progress_status:
+    # 3. Застрявшие в работе (>7 дней): перешли в «В работе» больше недели назад
+    #    и до сих пор в этом статусе — одним запросом с подзапросом по логам
+    stuck = []
+    if in_progress_id:
         stuck_threshold = datetime.now() - timedelta(days=7)
-
-        # Находим задачи, которые перешли в "В работе" более 7 дней назад
-        stuck_logs = ActivityLog.query.filter(
+        stuck_logs = db.session.query(ActivityLog.entity_id).filter(
             ActivityLog.entity_type == 'task',
             ActivityLog.field_name == 'Статус',
             ActivityLog.new_value == 'В работе',
             ActivityLog.created_at < stuck_threshold
-        ).all()
+        )
+        stuck = _ids(Task.query.filter(
+            Task.id.in_(stuck_logs),
+            Task.status_id == in_progress_id
+        ))
 
-        # Собираем ID задач, которые до сих пор в статусе "В работе"
-        stuck_task_ids = set()
-        for log in stuck_logs:
-            task = Task.query.get(log.entity_id)
-            if task and task.status_id == in_progress_status.id:
-                stuck_task_ids.add(task.id)
+    return {'overdue': overdue, 'no_assignee': no_assignee, 'stuck': stuck}
 
-        if stuck_task_ids:
-            stuck_tasks = Task.query.filter(Task.id.in_(stuck_task_ids)).all()
 
-    return {
-        'overdue': [t.to_dict() for t in overdue_tasks],
-        'no_assignee': [t.to_dict() for t in no_assignee_tasks],
-        'stuck': [t.to_dict() for t in stuck_tasks]
-    }
+def get_blockers_and_risks(view='full'):
+    """
+    Возвращает задачи-блокеры и риски:
+    1. Просроченные задачи (due_date в прошлом, не завершены)
+    2. Задачи без исполнителя (активные)
+    3. Застрявшие в работе (>7 дней в статусе "В работе")
+    """
+    return _hydrate(_blocker_ids(status_map()), view)
 
 
-def get_project_breakdown():
+def get_project_breakdown(statuses=None):
     """
     Возвращает статистику по каждому активному проекту.
+    Один запрос: GROUP BY project_id, status_id.
     """
-    done_status = TaskStatus.query.filter_by(name='Готово').first()
-    in_progress_status = TaskStatus.query.filter_by(name='В работе').first()
-    todo_status = TaskStatus.query.filter_by(name='К выполнению').first()
-
-    projects = Project.query.filter_by(status='Active').all()
-    result = []
-
-    for project in projects:
-        tasks = project.tasks
-        total = len(tasks)
-        if total == 0:
-            continue
-
-        completed = sum(1 for t in tasks if done_status and t.status_id == done_status.id)
-        in_progress = sum(1 for t in tasks if in_progress_status and t.status_id == in_progress_status.id)
-        todo = sum(1 for t in tasks if todo_status and t.status_id == todo_status.id)
-
-        # Процент выполнения
-        progress = round((completed / total) * 100) if total > 0 else 0
-
-        result.append({
-            'project_id': project.id,
-            'project_title': project.title,
-            'total': total,
-            'completed': completed,
-            'in_progress': in_progress,
-            'todo': todo,
-            'progress': progress
+    statuses = statuses or status_map()
+    done_id = statuses.get('Готово')
+    in_progress_id = statuses.get('В работе')
+    todo_id = statuses.get('К выполнению')
+
+    rows = db.session.query(
+        Project.id, Project.title, Task.status_id, func.count(Task.id)
+    ).join(Task, Task.project_id == Project.id)\
+     .filter(Project.status == 'Active')\
+     .group_by(Project.id, Project.title, Task.status_id)\
+     .order_by(Project.id)\
+     .all()
+
+    by_project = {}
+    for project_id, title, status_id, cnt in rows:
+        item = by_project.setdefault(project_id, {
+            'project_id': project_id,
+            'project_title': title,
+            'total': 0,
+            'completed': 0,
+            'in_progress': 0,
+            'todo': 0,
+            'progress': 0
         })
+        item['total'] += cnt
+        if status_id == done_id:
+            item['completed'] += cnt
+        elif status_id == in_progress_id:
+            item['in_progress'] += cnt
+        elif status_id == todo_id:
+            item['todo'] += cnt
+
+    result = list(by_project.values())
+    for item in result:
+        # Процент выполнения
+        item['progress'] = round((item['completed'] / item['total']) * 100)
 
     # Сортируем по количеству задач в работе (наиболее активные первыми)
     result.sort(key=lambda x: x['in_progress'], reverse=True)
     return result
 
 
-def get_team_workload(date_from, date_to_end):
+def get_team_workload(date_from, date_to_end, statuses=None):
     """
     Возвращает нагрузку команды:
     1. Завершённые задачи за период (по исполнителям)
     2. Текущее количество активных задач у каждого
+    Оба счётчика — GROUP BY assignee_id, контакты загружаются одним пакетом.
     """
-    done_status = TaskStatus.query.filter_by(name='Готово').first()
-    done_id = done_status.id if done_status else -1
+    statuses = statuses or status_map()
+    done_id = statuses.get('Готово', -1)
 
-    # Получаем логи завершения за период
-    completed_logs = ActivityLog.query.filter(
-        ActivityLog.entity_type == 'task',
-        ActivityLog.field_name == 'Статус',
-        ActivityLog.new_value == 'Готово',
-        ActivityLog.created_at >= date_from,
-        ActivityLog.created_at <= date_to_end
-    ).all()
+    completed_counts = db.session.query(Task.assignee_id, func.count(Task.id))\
+        .filter(Task.id.in_(_completed_log_ids(date_from, date_to_end)))\
+        .filter(Task.assignee_id.isnot(None))\
+        .group_by(Task.assignee_id)\
+        .all()
 
-    completed_task_ids = list(set(log.entity_id for log in completed_logs))
-    completed_tasks = Task.query.filter(Task.id.in_(completed_task_ids)).all() if completed_task_ids else []
+    active_counts = db.session.query(Task.assignee_id, func.count(Task.id))\
+        .filter(Task.status_id != done_id, Task.assignee_id.isnot(None))\
+        .group_by(Task.assignee_id)\
+        .all()
 
     # Агрегируем по исполнителям
     workload = {}
-
-    # Считаем завершённые
-    for task in completed_tasks:
-        if task.assignee_id:
-            if task.assignee_id not in workload:
-                workload[task.assignee_id] = {
-                    'contact': task.assignee.to_dict() if task.assignee else None,
-                    'completed_count': 0,
-                    'active_count': 0
-                }
-            workload[task.assignee_id]['completed_count'] += 1
-
-    # Считаем текущие активные задачи
-    active_tasks = Task.query.filter(
-        Task.status_id != done_id,
-        Task.assignee_id.isnot(None)
-    ).all()
-
-    for task in active_tasks:
-        if task.assignee_id not in workload:
-            workload[task.assignee_id] = {
-                'contact': task.assignee.to_dict() if task.assignee else None,
-                'completed_count': 0,
-                'active_count': 0
-            }
-        workload[task.assignee_id]['active_count'] += 1
-
-    # Преобразуем в список и сортируем по количеству завершённых
-    result = list(workload.values())
+    for assignee_id, cnt in completed_counts:
+        workload.setdefault(assignee_id, {'completed_count': 0, 'active_count': 0})['completed_count'] = cnt
+    for assignee_id, cnt in active_counts:
+        workload.setdefault(assignee_id, {'completed_count': 0, 'active_count': 0})['active_count'] = cnt
+
+    contacts = {}
+    if workload:
+        contacts = {
+            c.id: c for c in with_contact_profile(Contact.query).filter(Contact.id.in_(list(workload))).all()
+        }
+
+    result = [{
+        'contact': contacts[cid].to_dict() if cid in contacts else None,
+        'completed_count': counts['completed_count'],
+        'active_count': counts['active_count']
+    } for cid, counts in workload.items()]
+
+    # Сортируем по количеству завершённых
     result.sort(key=lambda x: x['completed_count'], reverse=True)
     return result
 
 
-def get_next_week_plans(date_to):
-    """
-    Возвращает планы на следующую неделю:
-    1. Задачи с дедлайном в следующие 7 дней
-    2. Приоритетные задачи из бэклога (без дедлайна, но к выполнению)
-    """
+def _next_week_plan_ids(date_to, statuses):
     # Определяем диапазон следующей недели
     if isinstance(date_to, datetime):
         next_week_start = (date_to + timedelta(days=1)).date()
@@ -165,32 +202,41 @@ def get_next_week_plans(date_to):
         next_week_start = date_to + timedelta(days=1)
     next_week_end = next_week_start + timedelta(days=7)
 
-    done_status = TaskStatus.query.filter_by(name='Готово').first()
-    done_id = done_status.id if done_status else -1
-    todo_status = TaskStatus.query.filter_by(name='К выполнению').first()
+    done_id = statuses.get('Готово', -1)
+    todo_id = statuses.get('К выполнению')
 
     # Задачи с дедлайном на следующей неделе
-    next_week_tasks = Task.query.filter(
+    next_week = _ids(Task.query.filter(
         Task.due_date >= next_week_start,
         Task.due_date <= next_week_end,
         Task.status_id != done_id
-    ).order_by(Task.due_date.asc()).all()
+    ).order_by(Task.due_date.asc()))
 
     # Приоритетные из бэклога (без дедлайна, статус "К выполнению")
     backlog_priority = []
-    if todo_status:
-        backlog_priority = Task.query.filter(
-            Task.status_id == todo_status.id,
+    if todo_id:
+        backlog_priority = _ids(Task.query.filter(
+            Task.status_id == todo_id,
             Task.due_date.is_(None)
-        ).order_by(Task.created_at.desc()).limit(5).all()
+        ).order_by(Task.created_at.desc()).limit(5))
 
-    return {
-        'next_week': [t.to_dict() for t in next_week_tasks],
-        'backlog_priority': [t.to_dict() for t in backlog_priority]
-    }
+    return {'next_week': next_week, 'backlog_priority': backlog_priority}
+
+
+def get_next_week_plans(date_to, view='full'):
+    """
+    Возвращает планы на следующую неделю:
+    1. Задачи с дедлайном в следующие 7 дней
+    2. Приоритетные задачи из бэклога (без дедлайна, но к выполнению)
+    """
+    return _hydrate(_next_week_plan_ids(date_to, status_map()), view)
 
 
-def get_weekly_report_data(date_from=None, date_to=None):
+def get_weekly_report_data(date_from=None, date_to=None, view='full'):
+    """
+    Данные еженедельного отчёта.
+    view='compact' — списки задач в облегчённом представлении (см. services.serialization).
+    """
     # Если даты не переданы, используем последние 7 дней
     today = datetime.now()
     if date_to is None:
@@ -200,71 +246,51 @@ def get_weekly_report_data(date_from=None, date_to=None):
 
     # Устанавливаем время на конец дня для date_to
     date_to_end = date_to.replace(hour=23, minute=59, second=59)
-    
+
+    statuses = status_map()
+    done_id = statuses.get('Готово', -1)
+    in_progress_id = statuses.get('В работе')
+    todo_id = statuses.get('К выполнению')
+
     # 1. СДЕЛАНО ЗА ПЕРИОД (Completed)
-    # Ищем в логах записи, где статус изменился на "Готово" за выбранный период
-    completed_logs = ActivityLog.query.filter(
-        ActivityLog.entity_type == 'task',
-        ActivityLog.field_name == 'Статус',
-        ActivityLog.new_value == 'Готово',
-        ActivityLog.created_at >= date_from,
-        ActivityLog.created_at <= date_to_end
-    ).all()
-    
-    # Собираем уникальные ID задач (если задачу переоткрывали и закрывали несколько раз)
-    completed_ids = list(set(log.entity_id for log in completed_logs))
-    
-    # Загружаем сами задачи (проверяем, что они до сих пор "Готово", а не были переоткрыты)
-    done_status = TaskStatus.query.filter_by(name='Готово').first()
-    done_status_id = done_status.id if done_status else -1
-    
-    completed_tasks = []
-    if completed_ids:
-        completed_tasks = Task.query.filter(
-            Task.id.in_(completed_ids),
-            Task.status_id == done_status_id
-        ).all()
+    # Задачи, переведённые в «Готово» за период и до сих пор не переоткрытые
+    completed = _ids(Task.query.filter(
+        Task.id.in_(_completed_log_ids(date_from, date_to_end)),
+        Task.status_id == done_id
+    ))
 
     # 2. В РАБОТЕ (In Progress)
-    # Задачи со статусом "В работе"
-    in_progress_status = TaskStatus.query.filter_by(name='В работе').first()
-    in_progress_tasks = []
-    if in_progress_status:
-        in_progress_tasks = Task.query.filter(Task.status_id == in_progress_status.id).all()
-
-    # 3. ПЛАНЫ (К выполнению / Backlog) - опционально, берем "К выполнению"
-    todo_status = TaskStatus.query.filter_by(name='К выполнению').first()
-    todo_tasks = []
-    if todo_status:
-        # Ограничим вывод, чтобы не завалить отчет
-        todo_tasks = Task.query.filter(Task.status_id == todo_status.id).limit(10).all()
+    in_progress = _ids(Task.query.filter(Task.status_id == in_progress_id)) if in_progress_id else []
+
+    # 3. ПЛАНЫ (К выполнению / Backlog) — ограничим вывод, чтобы не завалить отчет
+    todo = _ids(Task.query.filter(Task.status_id == todo_id).limit(10)) if todo_id else []
 
     # 4. СОЗДАНО ЗА ПЕРИОД (New)
-    created_tasks = Task.query.filter(
+    created = _ids(Task.query.filter(
         Task.created_at >= date_from,
         Task.created_at <= date_to_end
-    ).order_by(Task.created_at.desc()).all()
-
-    # 5. БЛОКЕРЫ И РИСКИ
-    blockers = get_blockers_and_risks()
-
-    # 6. РАЗБИВКА ПО ПРОЕКТАМ
-    project_breakdown = get_project_breakdown()
-
-    # 7. НАГРУЗКА КОМАНДЫ
-    team_workload = get_team_workload(date_from, date_to_end)
-
-    # 8. ПЛАНЫ НА СЛЕДУЮЩУЮ НЕДЕЛЮ
-    next_week_plans = get_next_week_plans(date_to)
+    ).order_by(Task.created_at.desc()))
+
+    # 5. БЛОКЕРЫ И РИСКИ + 8. ПЛАНЫ НА СЛЕДУЮЩУЮ НЕДЕЛЮ — тоже id, гидрируются общим пакетом
+    sections = _hydrate({
+        'completed': completed,
+        'in_progress': in_progress,
+        'todo': todo,
+        'created': created,
+        'blockers': _blocker_ids(statuses),
+        'next_week_plans': _next_week_plan_ids(date_to, statuses),
+    }, view)
 
     return {
         'date_range': f"{date_from.strftime('%d.%m.%Y')} - {date_to.strftime('%d.%m.%Y')}",
-        'completed': [t.to_dict() for t in completed_tasks],
-        'in_progress': [t.to_dict() for t in in_progress_tasks],
-        'todo': [t.to_dict() for t in todo_tasks],
-        'created': [t.to_dict() for t in created_tasks],
-        'blockers': blockers,
-        'project_breakdown': project_breakdown,
-        'team_workload': team_workload,
-        'next_week_plans': next_week_plans
+        'completed': sections['completed'],
+        'in_progress': sections['in_progress'],
+        'todo': sections['todo'],
+        'created': sections['created'],
+        'blockers': sections['blockers'],
+        # 6. РАЗБИВКА ПО ПРОЕКТАМ
+        'project_breakdown': get_project_breakdown(statuses),
+        # 7. НАГРУЗКА КОМАНДЫ
+        'team_workload': get_team_workload(date_from, date_to_end, statuses),
+        'next_week_plans': sections['next_week_plans']
     }
@@ -1,8 +1,109 @@
 """
-FTS5 полнотекстовый поиск для задач, контактов и проектов.
+FTS5 полнотекстовый поиск: задачи, контакты, проекты, встречи, заметки
+встреч, договорённости (action items) и комментарии к задачам.
 Использует SQLite FTS5 content-sync триггеры для автоматической синхронизации.
+
+FTS-таблицы и триггеры описаны декларативно: источники в FTS_SOURCES,
+токенизаторы (слова, основы, триграммы) в FTS_TOKENIZERS / FTS_PIPELINE.
+
+Поиск — один UNION ALL-запрос по всем FTS-таблицам: ранг — взвешенная
+сумма bm25 по индексам, лёгкие поля выдачи берутся прямо из SQL,
+ORM-объекты не создаются. Подсветка (highlight/snippet) строится в Python
+по тем же правилам совпадения, что у индексов: highlight() FTS5 доступен
+только для строк, найденных в одной конкретной таблице.
+Новый источник добавляет ветку в тот же запрос, а не отдельный запрос.
 """
+from functools import lru_cache
 from core.database import db
+from core.stemmer import stem_word, tokenize, WORD_RE
+
+# Источник -> (content-таблица, индексируемые колонки)
+FTS_SOURCES = {
+    'tasks_fts': ('tasks', ('title', 'description')),
+    'contacts_fts': ('contacts', ('last_name', 'first_name', 'middle_name', 'department', 'role', 'notes')),
+    'projects_fts': ('projects', ('title', 'description')),
+    'meetings_fts': ('meetings', ('title', 'agenda', 'notes', 'summary')),
+    'meeting_notes_fts': ('meeting_notes', ('text',)),
+    'action_items_fts': ('meeting_action_items', ('text',)),
+    'task_comments_fts': ('task_comments', ('text',)),
+}
+
+# Конвейер токенизации: каждый источник индексируется в нескольких FTS-таблицах,
+# результаты которых объединяются в поиске (ранг — взвешенная сумма bm25).
+#   word    — слова как есть (unicode61), prefix-поиск по набираемому слову;
+#   stem    — основы слов (core.stemmer): «задача»/«задачи»/«задачу» совпадают;
+#   trigram — триграммы: поиск подстроки внутри слова (от 3 символов).
+# column_suffix — какие колонки content-таблицы читает индекс: stem индексирует
+# теневые колонки *_stem (core.models), основы в них вычисляются при записи.
+# Поэтому триггеры — чистый SQL, а 'rebuild' работает для всех индексов одинаково.
+# fallback — индекс опрашивается, только если остальные нашли меньше limit строк
+# источника: trigram самый дорогой и нужен, когда по словам и основам пусто.
+FTS_TOKENIZERS = {
+    'word': {'suffix': '', 'tokenize': 'unicode61', 'column_suffix': '', 'weight': 1.0, 'fallback': False},
+    'stem': {'suffix': '_stem', 'tokenize': 'unicode61', 'column_suffix': '_stem', 'weight': 0.75,
+             'fallback': False},
+    'trigram': {'suffix': '_tri', 'tokenize': 'trigram', 'column_suffix': '', 'weight': 0.5, 'fallback': True},
+}
+
+# Включённые токенизаторы (порядок — порядок веток в поисковом запросе)
+FTS_PIPELINE = ('word', 'stem', 'trigram')
+
+# Кандидатов из каждого индекса — limit * FTS_CANDIDATE_FACTOR лучших по bm25:
+# суммирование рангов и JOIN с таблицей идут по ним, а не по всем совпадениям
+FTS_CANDIDATE_FACTOR = 5
+
+
+def _index_table(source, kind):
+    return source + FTS_TOKENIZERS[kind]['suffix']
+
+
+def _index_columns(source, kind):
+    """Колонки content-таблицы, которые индексирует FTS-таблица."""
+    suffix = FTS_TOKENIZERS[kind]['column_suffix']
+    return tuple(c + suffix for c in FTS_SOURCES[source][1])
+
+
+# FTS-таблица -> content-таблица (по ней сверяется число проиндексированных строк)
+FTS_TABLES = {
+    _index_table(source, kind): content
+    for source, (content, _) in FTS_SOURCES.items()
+    for kind in FTS_PIPELINE
+}
+
+
+def _create_fts_sql(source, kind):
+    return f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {_index_table(source, kind)} USING fts5(
+            {', '.join(_index_columns(source, kind))},
+            content='{FTS_SOURCES[source][0]}', content_rowid='id',
+            tokenize='{FTS_TOKENIZERS[kind]['tokenize']}'
+        )
+    """
+
+
+def _trigger_sql(source):
+    """
+    Триггеры синхронизации content-таблицы со всеми её FTS-таблицами: {content}_ai / _ad / _au.
+    """
+    content = FTS_SOURCES[source][0]
+    # _au срабатывает только на изменение индексируемых колонок: смена статуса,
+    # срока или *_folded не переписывает строку во всех FTS-таблицах
+    indexed = ', '.join(dict.fromkeys(c for kind in FTS_PIPELINE for c in _index_columns(source, kind)))
+    insert_new, delete_old = [], []
+    for kind in FTS_PIPELINE:
+        fts_table = _index_table(source, kind)
+        columns = _index_columns(source, kind)
+        cols = ', '.join(columns)
+        new_vals = ', '.join(f'new.{c}' for c in columns)
+        old_vals = ', '.join(f'old.{c}' for c in columns)
+        insert_new.append(f"INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new_vals});")
+        delete_old.append(f"INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_vals});")
+    insert_new, delete_old = ' '.join(insert_new), ' '.join(delete_old)
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {content}_ai AFTER INSERT ON {content} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {content}_ad AFTER DELETE ON {content} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {content}_au AFTER UPDATE OF {indexed} ON {content} BEGIN {delete_old} {insert_new} END",
+    ]
 
 
 def init_fts_tables():
@@ -11,117 +112,30 @@ def init_fts_tables():
     cur = conn.cursor()
 
     # Проверяем целостность существующих FTS-таблиц, при повреждении — удаляем
-    for table in ['tasks_fts', 'contacts_fts', 'projects_fts']:
+    for table in FTS_TABLES:
         try:
-            cur.execute(f"SELECT count(*) FROM {table} LIMIT 1")
+            cur.execute(f"SELECT rowid FROM {table} LIMIT 1")
         except Exception:
             # Таблица повреждена или не существует — дропаем для пересоздания
             cur.execute(f"DROP TABLE IF EXISTS {table}")
             conn.commit()
 
-    # --- tasks_fts ---
-    cur.execute("""
-        CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
-            title, description,
-            content='tasks', content_rowid='id',
-            tokenize='unicode61'
-        )
-    """)
-
-    # --- contacts_fts ---
-    cur.execute("""
-        CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
-            last_name, first_name, middle_name, department, role, notes,
-            content='contacts', content_rowid='id',
-            tokenize='unicode61'
-        )
-    """)
-
-    # --- projects_fts ---
-    cur.execute("""
-        CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5(
-            title, description,
-            content='projects', content_rowid='id',
-            tokenize='unicode61'
-        )
-    """)
-
-    # --- Триггеры синхронизации: tasks ---
-    cur.execute("""
-        CREATE TRIGGER IF NOT EXISTS tasks_ai AFTER INSERT ON tasks BEGIN
-            INSERT INTO tasks_fts(rowid, title, description)
-            VALUES (new.id, new.title, new.description);
-        END
-    """)
-    cur.execute("""
-        CREATE TRIGGER IF NOT EXISTS tasks_ad AFTER DELETE ON tasks BEGIN
-            INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
-            VALUES ('delete', old.id, old.title, old.description);
-        END
-    """)
-    cur.execute("""
-        CREATE TRIGGER IF NOT EXISTS tasks_au AFTER UPDATE ON tasks BEGIN
-            INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
-            VALUES ('delete', old.id, old.title, old.description);
-            INSERT INTO tasks_fts(rowid, title, description)
-            VALUES (new.id, new.title, new.description);
-        END
-    """)
-
-    # --- Триггеры синхронизации: contacts ---
-    cur.execute("""
-        CREATE TRIGGER IF NOT EXISTS contacts_ai AFTER INSERT ON contacts BEGIN
-            INSERT INTO contacts_fts(rowid, last_name, first_name, middle_name, department, role, notes)
-            VALUES (new.id, new.last_name, new.first_name, new.middle_name, new.department, new.role, new.notes);
-        END
-    """)
-    cur.execute("""
-        CREATE TRIGGER IF NOT EXISTS contacts_ad AFTER DELETE ON contacts BEGIN
-            INSERT INTO contacts_fts(contacts_fts, rowid, last_name, first_name, middle_name, department, role, notes)
-            VALUES ('delete', old.id, old.last_name, old.first_name, old.middle_name, old.department, old.role, old.notes);
-        END
-    """)
-    cur.execute("""
-        CREATE TRIGGER IF NOT EXISTS contacts_au AFTER UPDATE ON contacts BEGIN
-            INSERT INTO contacts_fts(contacts_fts, rowid, last_name, first_name, middle_name, department, role, notes)
-            VALUES ('delete', old.id, old.last_name, old.first_name, old.middle_name, old.department, old.role, old.notes);
-            INSERT INTO contacts_fts(rowid, last_name, first_name, middle_name, department, role, notes)
-            VALUES (new.id, new.last_name, new.first_name, new.middle_name, new.department, new.role, new.notes);
-        END
-    """)
-
-    # --- Триггеры синхронизации: projects ---
-    cur.execute("""
-        CREATE TRIGGER IF NOT EXISTS projects_ai AFTER INSERT ON projects BEGIN
-            INSERT INTO projects_fts(rowid, title, description)
-            VALUES (new.id, new.title, new.description);
-        END
-    """)
-    cur.execute("""
-        CREATE TRIGGER IF NOT EXISTS projects_ad AFTER DELETE ON projects BEGIN
-            INSERT INTO projects_fts(projects_fts, rowid, title, description)
-            VALUES ('delete', old.id, old.title, old.description);
-        END
-    """)
-    cur.execute("""
-        CREATE TRIGGER IF NOT EXISTS projects_au AFTER UPDATE ON projects BEGIN
-            INSERT INTO projects_fts(projects_fts, rowid, title, description)
-            VALUES ('delete', old.id, old.title, old.description);
-            INSERT INTO projects_fts(rowid, title, description)
-            VALUES (new.id, new.title, new.description);
-        END
-    """)
+    for source in FTS_SOURCES:
+        for kind in FTS_PIPELINE:
+            cur.execute(_create_fts_sql(source, kind))
+        for sql in _trigger_sql(source):
+            cur.execute(sql)
 
     conn.commit()
     conn.close()
 
 
-def rebuild_fts_index():
-    """Полная перестройка FTS-индексов из основных таблиц."""
+def rebuild_fts_index(tables=None):
+    """Полная перестройка FTS-индексов (всех или перечисленных) из основных таблиц."""
     conn = db.engine.raw_connection()
     cur = conn.cursor()
 
-    fts_tables = ['tasks_fts', 'contacts_fts', 'projects_fts']
+    fts_tables = list(tables or FTS_TABLES)
 
     for table in fts_tables:
         try:
@@ -134,8 +148,134 @@ def rebuild_fts_index():
             conn.close()
             # Пересоздаём таблицы и триггеры, потом повторяем rebuild
             init_fts_tables()
-            return rebuild_fts_index()
+            return rebuild_fts_index(tables)
+
+    conn.commit()
+    conn.close()
+
+
+# --- Обслуживание индекса ---
+#
+# Триггеры держат индекс актуальным, поэтому полная перестройка нужна
+# только при смене схемы FTS (FTS_SCHEMA_VERSION) или расхождении индекса
+# с таблицей (например, после записи в БД при отключённых триггерах).
+# Версия схемы хранится в таблице fts_meta.
+
+# Увеличивать при изменении колонок/токенизатора FTS-таблиц или триггеров
+FTS_SCHEMA_VERSION = 5
+
+
+def _fts_meta_get(cur, key):
+    cur.execute("CREATE TABLE IF NOT EXISTS fts_meta (key TEXT PRIMARY KEY, value TEXT)")
+    row = cur.execute("SELECT value FROM fts_meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
 
+
+def _fts_meta_set(cur, key, value):
+    cur.execute("CREATE TABLE IF NOT EXISTS fts_meta (key TEXT PRIMARY KEY, value TEXT)")
+    cur.execute("INSERT OR REPLACE INTO fts_meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+
+def _fts_schema_current(cur):
+    return _fts_meta_get(cur, 'schema_version') == str(FTS_SCHEMA_VERSION)
+
+
+def fts_stale_tables():
+    """
+    FTS-таблицы, которым нужна перестройка: все — при другой версии схемы,
+    иначе те, где число проиндексированных документов (shadow-таблица _docsize)
+    не совпадает с числом строк content-таблицы.
+    """
+    conn = db.engine.raw_connection()
+    cur = conn.cursor()
+    try:
+        if not _fts_schema_current(cur):
+            return list(FTS_TABLES)
+
+        stale = []
+        for fts_table, content_table in FTS_TABLES.items():
+            try:
+                indexed = cur.execute(f"SELECT count(*) FROM {fts_table}_docsize").fetchone()[0]
+            except Exception:
+                stale.append(fts_table)
+                continue
+            rows = cur.execute(f"SELECT count(*) FROM {content_table}").fetchone()[0]
+            if indexed != rows:
+                stale.append(fts_table)
+        return stale
+    finally:
+        conn.commit()
+        conn.close()
+
+
+def _set_fts_schema_current():
+    conn = db.engine.raw_connection()
+    cur = conn.cursor()
+    _fts_meta_set(cur, 'schema_version', FTS_SCHEMA_VERSION)
+    conn.commit()
+    conn.close()
+
+
+def ensure_fts_index(force=False):
+    """
+    Вызывается при старте вместо безусловного rebuild.
+    Новая версия схемы — таблицы и триггеры пересоздаются и индекс строится заново;
+    иначе перестраиваются только таблицы с расхождением (или все при force).
+    Возвращает список перестроенных FTS-таблиц.
+    """
+    conn = db.engine.raw_connection()
+    cur = conn.cursor()
+    schema_current = _fts_schema_current(cur)
+    conn.commit()
+    conn.close()
+
+    if not schema_current:
+        _drop_fts_tables()
+    init_fts_tables()
+
+    stale = list(FTS_TABLES) if force or not schema_current else fts_stale_tables()
+    if stale:
+        rebuild_fts_index(stale)
+    _set_fts_schema_current()
+    return stale
+
+
+def _drop_fts_tables():
+    """Удаляет FTS-таблицы и триггеры синхронизации (их пересоздаёт ensure_fts_index)."""
+    conn = db.engine.raw_connection()
+    cur = conn.cursor()
+    # Удаляем и объекты прежних схем: до stem/trigram был только word-индекс,
+    # в схеме 3 stem-индекс читал представление {fts}_src
+    for source, (content_table, _) in FTS_SOURCES.items():
+        for kind in FTS_TOKENIZERS:
+            fts_table = _index_table(source, kind)
+            cur.execute(f"DROP TABLE IF EXISTS {fts_table}")
+            cur.execute(f"DROP VIEW IF EXISTS {fts_table}_src")
+        for suffix in ('ai', 'ad', 'au'):
+            cur.execute(f"DROP TRIGGER IF EXISTS {content_table}_{suffix}")
+    conn.commit()
+    conn.close()
+
+
+def optimize_fts_index(tables=None):
+    """FTS5 'optimize': сливает все b-tree сегменты индекса в один (долго, но поиск быстрее)."""
+    conn = db.engine.raw_connection()
+    cur = conn.cursor()
+    for table in tables or FTS_TABLES:
+        cur.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+    conn.commit()
+    conn.close()
+
+
+def merge_fts_index(pages=500, tables=None):
+    """
+    FTS5 'merge': инкрементальное слияние сегментов, не больше pages страниц
+    на таблицу за вызов. Подходит для периодического запуска в фоне.
+    """
+    conn = db.engine.raw_connection()
+    cur = conn.cursor()
+    for table in tables or FTS_TABLES:
+        cur.execute(f"INSERT INTO {table}({table}, rank) VALUES ('merge', ?)", (pages,))
     conn.commit()
     conn.close()
 
@@ -145,70 +285,270 @@ def _prepare_fts_query(query_str):
     tokens = query_str.strip().split()
     if not tokens:
         return None
-    # Каждый токен ищем как prefix: "term*", объединяем через AND
-    fts_terms = ' '.join(f'"{t}"*' for t in tokens if t)
+    # Каждый токен ищем как prefix: "term*", объединяем через AND.
+    # Кавычки внутри токена удваиваются — иначе запрос не разберётся.
+    fts_terms = ' '.join('"{}"*'.format(t.replace('"', '""')) for t in tokens if t)
     return fts_terms
 
 
-def fts_search(query_str, limit=10):
+# Минимальная длина подстроки для trigram-индекса
+TRIGRAM_MIN_LENGTH = 3
+
+
+def _prepare_stem_query(query_str):
+    """Основы слов запроса как prefix-термы: недописанное слово тоже находится."""
+    stems = [stem_word(w) for w in tokenize(query_str)]
+    return ' '.join(f'"{s}"*' for s in stems) or None
+
+
+def _prepare_trigram_query(query_str):
+    """Подстроки запроса для trigram-индекса; короче TRIGRAM_MIN_LENGTH не ищутся."""
+    tokens = [t for t in query_str.strip().split() if len(t) >= TRIGRAM_MIN_LENGTH]
+    return ' '.join('"{}"'.format(t.replace('"', '""')) for t in tokens) or None
+
+
+_QUERY_BUILDERS = {
+    'word': _prepare_fts_query,
+    'stem': _prepare_stem_query,
+    'trigram': _prepare_trigram_query,
+}
+
+
+# Маркеры совпадений в highlight/snippet
+HIGHLIGHT_OPEN = '<mark>'
+HIGHLIGHT_CLOSE = '</mark>'
+SNIPPET_ELLIPSIS = '…'
+SNIPPET_TOKENS = 12
+
+# Разделитель индексируемых колонок в поле body выдачи
+_BODY_SEPARATOR = '\x1f'
+
+# Дополнительные колонки выдачи, общие для всех веток UNION (NULL, если у типа нет)
+_EXTRA_COLUMNS = (
+    'status_name', 'status_color', 'last_name', 'first_name', 'role',
+    'date', 'type_color', 'parent_id', 'parent_title',
+)
+
+# Ветки поискового запроса: type, ключ результата, источник FTS_SOURCES,
+# алиас content-таблицы, FROM/JOIN (к найденным rowid — hits.rowid),
+# выражение заголовка и дополнительные колонки.
+# Для заметок, договорённостей и комментариев заголовок — родительская
+# сущность (встреча/задача), найденный текст — в snippet.
+_SEARCH_BRANCHES = [
+    {
+        'type': 'task', 'key': 'tasks', 'fts': 'tasks_fts', 'alias': 't',
+        'source': 'JOIN tasks t ON t.id = hits.rowid '
+                  'LEFT JOIN task_statuses s ON s.id = t.status_id',
+        'id': 't.id', 'title': 't.title',
+        'extra': {'status_name': 's.name', 'status_color': 's.color'},
+    },
+    {
+        'type': 'contact', 'key': 'contacts', 'fts': 'contacts_fts', 'alias': 'c',
+        'source': 'JOIN contacts c ON c.id = hits.rowid',
+        'id': 'c.id', 'title': "TRIM(c.last_name || ' ' || COALESCE(c.first_name, ''))",
+        'extra': {'last_name': 'c.last_name', 'first_name': 'c.first_name', 'role': 'c.role'},
+    },
+    {
+        'type': 'project', 'key': 'projects', 'fts': 'projects_fts', 'alias': 'p',
+        'source': 'JOIN projects p ON p.id = hits.rowid',
+        'id': 'p.id', 'title': 'p.title',
+        'extra': {},
+    },
+    {
+        'type': 'meeting', 'key': 'meetings', 'fts': 'meetings_fts', 'alias': 'm',
+        'source': 'JOIN meetings m ON m.id = hits.rowid '
+                  'LEFT JOIN meeting_types mt ON mt.id = m.type_id',
+        'id': 'm.id', 'title': "COALESCE(m.title, mt.name, 'Встреча')",
+        'extra': {'date': 'm.date', 'type_color': 'mt.color'},
+    },
+    {
+        'type': 'meeting_note', 'key': 'meeting_notes', 'fts': 'meeting_notes_fts', 'alias': 'n',
+        'source': 'JOIN meeting_notes n ON n.id = hits.rowid '
+                  'JOIN meetings m ON m.id = n.meeting_id '
+                  'LEFT JOIN meeting_types mt ON mt.id = m.type_id',
+        'id': 'n.id', 'title': "COALESCE(m.title, mt.name, 'Встреча')",
+        'extra': {'date': 'm.date', 'type_color': 'mt.color',
+                  'parent_id': 'm.id', 'parent_title': "COALESCE(m.title, mt.name, 'Встреча')"},
+    },
+    {
+        'type': 'action_item', 'key': 'action_items', 'fts': 'action_items_fts', 'alias': 'a',
+        'source': 'JOIN meeting_action_items a ON a.id = hits.rowid '
+                  'JOIN meetings m ON m.id = a.meeting_id '
+                  'LEFT JOIN meeting_types mt ON mt.id = m.type_id',
+        'id': 'a.id', 'title': 'a.text',
+        'extra': {'date': 'm.date', 'type_color': 'mt.color',
+                  'parent_id': 'm.id', 'parent_title': "COALESCE(m.title, mt.name, 'Встреча')"},
+    },
+    {
+        'type': 'comment', 'key': 'comments', 'fts': 'task_comments_fts', 'alias': 'tc',
+        'source': 'JOIN task_comments tc ON tc.id = hits.rowid '
+                  'JOIN tasks t ON t.id = tc.task_id',
+        'id': 'tc.id', 'title': 't.title',
+        'extra': {'parent_id': 't.id', 'parent_title': 't.title'},
+    },
+]
+
+# Тип -> родительская сущность, на которую ведёт результат
+_PARENT_TYPES = {'meeting_note': 'meeting', 'action_item': 'meeting', 'comment': 'task'}
+
+SEARCH_RESULT_KEYS = tuple(b['key'] for b in _SEARCH_BRANCHES)
+
+
+def _candidates_name(source, kind):
+    return f'{_index_table(source, kind)}_hits'
+
+
+def _candidates_sql(source, kind):
     """
-    Полнотекстовый поиск через FTS5 с ранжированием по rank().
-    Возвращает dict с ключами tasks, contacts, projects.
-    """
-    from core.models import Task, Contact, Project
-
-    fts_query = _prepare_fts_query(query_str)
-    if not fts_query:
-        return {'tasks': [], 'contacts': [], 'projects': []}
-
-    # Поиск задач
-    task_rows = db.session.execute(
-        db.text("""
-            SELECT rowid, rank FROM tasks_fts
-            WHERE tasks_fts MATCH :q
-            ORDER BY rank
-            LIMIT :lim
-        """),
-        {'q': fts_query, 'lim': limit}
-    ).fetchall()
-    task_ids = [row[0] for row in task_rows]
-    tasks = Task.query.filter(Task.id.in_(task_ids)).all() if task_ids else []
-    # Сохраняем порядок ранжирования
-    task_order = {tid: i for i, tid in enumerate(task_ids)}
-    tasks.sort(key=lambda t: task_order.get(t.id, 999))
-
-    # Поиск контактов
-    contact_rows = db.session.execute(
-        db.text("""
-            SELECT rowid, rank FROM contacts_fts
-            WHERE contacts_fts MATCH :q
-            ORDER BY rank
-            LIMIT :lim
-        """),
-        {'q': fts_query, 'lim': limit}
-    ).fetchall()
-    contact_ids = [row[0] for row in contact_rows]
-    contacts = Contact.query.filter(Contact.id.in_(contact_ids)).all() if contact_ids else []
-    contact_order = {cid: i for i, cid in enumerate(contact_ids)}
-    contacts.sort(key=lambda c: contact_order.get(c.id, 999))
-
-    # Поиск проектов
-    project_rows = db.session.execute(
-        db.text("""
-            SELECT rowid, rank FROM projects_fts
-            WHERE projects_fts MATCH :q
-            ORDER BY rank
-            LIMIT :lim
-        """),
-        {'q': fts_query, 'lim': limit}
-    ).fetchall()
-    project_ids = [row[0] for row in project_rows]
-    projects = Project.query.filter(Project.id.in_(project_ids)).all() if project_ids else []
-    project_order = {pid: i for i, pid in enumerate(project_ids)}
-    projects.sort(key=lambda p: project_order.get(p.id, 999))
-
-    return {
-        'tasks': [t.to_dict() for t in tasks],
-        'contacts': [c.to_dict() for c in contacts],
-        'projects': [p.to_dict() for p in projects]
+    Кандидаты одного индекса: не больше :cand лучших строк по bm25 с весом
+    из FTS_TOKENIZERS (rank в FTS5 — bm25; ORDER BY rank LIMIT выбирает
+    лучшие без сортировки всех совпадений).
+    """
+    table = _index_table(source, kind)
+    weight = FTS_TOKENIZERS[kind]['weight']
+    return (f"{_candidates_name(source, kind)} AS (SELECT rowid, {weight} * rank AS score "
+            f"FROM {table} WHERE {table} MATCH :q_{kind} ORDER BY rank LIMIT :cand)")
+
+
+def _hits_sql(source, kinds):
+    """
+    Найденные rowid источника со смешанным рангом: сумма bm25 кандидатов
+    индексов конвейера (bm25 отрицателен — меньше значит лучше, совпадение
+    в нескольких индексах поднимает строку выше). Индексы с fallback
+    подключаются, только если остальные нашли меньше :lim строк: условие
+    на строке gate проверяется до выборки из индекса.
+    """
+    primary = [kind for kind in kinds if not FTS_TOKENIZERS[kind]['fallback']]
+    found = ' UNION '.join(f"SELECT rowid FROM {_candidates_name(source, kind)}" for kind in primary)
+    parts = []
+    for kind in kinds:
+        candidates = _candidates_name(source, kind)
+        if FTS_TOKENIZERS[kind]['fallback'] and primary:
+            parts.append(f"SELECT c.rowid, c.score FROM (SELECT count(*) AS n FROM ({found})) gate "
+                         f"CROSS JOIN {candidates} c WHERE gate.n < :lim")
+        else:
+            parts.append(f"SELECT rowid, score FROM {candidates}")
+    return f"SELECT rowid, SUM(score) AS score FROM ({' UNION ALL '.join(parts)}) GROUP BY rowid"
+
+
+def _branch_sql(branch, kinds):
+    alias = branch['alias']
+    columns = FTS_SOURCES[branch['fts']][1]
+    body = f" || '{_BODY_SEPARATOR}' || ".join(f"COALESCE({alias}.{c}, '')" for c in columns)
+    extra = ', '.join(f"{branch['extra'].get(col, 'NULL')} AS {col}" for col in _EXTRA_COLUMNS)
+    # ORDER BY/LIMIT внутри ветки UNION требуют подзапроса
+    return f"""
+    SELECT * FROM (
+        SELECT '{branch['type']}' AS type, {branch['id']} AS id, {branch['title']} AS title,
+               hits.score AS score, {body} AS body,
+               {extra}
+        FROM ({_hits_sql(branch['fts'], kinds)}) hits {branch['source']}
+        ORDER BY hits.score LIMIT :lim
+    )"""
+
+
+@lru_cache(maxsize=None)
+def _search_sql(kinds):
+    """Поисковый запрос для набора индексов, по которым у запроса есть термы."""
+    candidates = ',\n'.join(_candidates_sql(b['fts'], kind) for b in _SEARCH_BRANCHES for kind in kinds)
+    branches = '\nUNION ALL'.join(_branch_sql(b, kinds) for b in _SEARCH_BRANCHES)
+    return f'WITH {candidates}\n{branches}\nORDER BY type, score'
+
+
+_RESULT_KEYS = {b['type']: b['key'] for b in _SEARCH_BRANCHES}
+
+
+class _Matcher:
+    """
+    Подсветка совпадений в Python: слово совпадает, если начинается с токена
+    запроса, его основа начинается с основы токена или содержит подстроку
+    запроса (от TRIGRAM_MIN_LENGTH символов) — те же правила, что у индексов.
+    """
+
+    def __init__(self, query_str):
+        words = tokenize(query_str)
+        self.prefixes = tuple(words)
+        self.stems = tuple(stem_word(w) for w in words)
+        self.infixes = tuple(t.lower() for t in query_str.split() if len(t) >= TRIGRAM_MIN_LENGTH)
+
+    def matches(self, word):
+        word = word.lower()
+        return (word.startswith(self.prefixes)
+                or stem_word(word).startswith(self.stems)
+                or any(infix in word for infix in self.infixes))
+
+    def highlight(self, text):
+        if not text:
+            return text
+        return WORD_RE.sub(
+            lambda m: f'{HIGHLIGHT_OPEN}{m.group()}{HIGHLIGHT_CLOSE}' if self.matches(m.group()) else m.group(),
+            text
+        )
+
+    def snippet(self, body):
+        """Фрагмент до SNIPPET_TOKENS слов вокруг первого совпадения в колонке с наибольшим их числом."""
+        best, best_count = None, 0
+        for text in body.split(_BODY_SEPARATOR):
+            spans = [m.span() for m in WORD_RE.finditer(text)]
+            hits = [i for i, (a, b) in enumerate(spans) if self.matches(text[a:b])]
+            if (hits and len(hits) > best_count) or (best is None and spans):
+                best, best_count = (text, spans, hits), len(hits)
+        if best is None:
+            return ''
+        text, spans, hits = best
+        first = hits[0] if hits else 0
+        start = max(0, min(first - SNIPPET_TOKENS // 4, len(spans) - SNIPPET_TOKENS))
+        end = min(len(spans), start + SNIPPET_TOKENS)
+        fragment = self.highlight(text[spans[start][0]:spans[end - 1][1]])
+        return (SNIPPET_ELLIPSIS if start > 0 else '') + fragment + (SNIPPET_ELLIPSIS if end < len(spans) else '')
+
+
+def _hit(row, matcher):
+    """Лёгкий объект выдачи без ORM: общие поля плюс поля, нужные списку поиска для типа."""
+    hit = {
+        'type': row.type,
+        'id': row.id,
+        'title': row.title,
+        'score': row.score,
+        'highlight': matcher.highlight(row.body.split(_BODY_SEPARATOR, 1)[0]),
+        'snippet': matcher.snippet(row.body),
     }
+    if row.type == 'task':
+        hit['status'] = {'name': row.status_name, 'color': row.status_color} if row.status_name else None
+    elif row.type == 'contact':
+        hit.update(last_name=row.last_name, first_name=row.first_name, role=row.role)
+    elif row.type == 'meeting':
+        hit.update(date=row.date, type_color=row.type_color)
+
+    if row.type in _PARENT_TYPES:
+        hit['parent'] = {'type': _PARENT_TYPES[row.type], 'id': row.parent_id, 'title': row.parent_title}
+        if row.date:
+            hit['date'] = row.date
+    return hit
+
+
+def fts_search(query_str, limit=10):
+    """
+    Полнотекстовый поиск одним UNION-запросом по всем индексам конвейера
+    (слова, основы, триграммы) со смешанным bm25-рангом.
+    Возвращает dict с ключами SEARCH_RESULT_KEYS (tasks, contacts, projects, meetings,
+    meeting_notes, action_items, comments) — списками лёгких hit-объектов
+    (type, id, title, score, highlight, snippet + поля типа; у заметок,
+    договорённостей и комментариев — parent со ссылкой на встречу/задачу),
+    отсортированных по релевантности. Не больше limit на тип.
+    """
+    result = {key: [] for key in SEARCH_RESULT_KEYS}
+
+    params = {'lim': limit, 'cand': limit * FTS_CANDIDATE_FACTOR}
+    for kind in FTS_PIPELINE:
+        fts_query = _QUERY_BUILDERS[kind](query_str)
+        if fts_query:
+            params[f'q_{kind}'] = fts_query
+    kinds = tuple(kind for kind in FTS_PIPELINE if f'q_{kind}' in params)
+    if not kinds:
+        return result
+
+    matcher = _Matcher(query_str)
+    for row in db.session.execute(db.text(_search_sql(kinds)), params):
+        result[_RESULT_KEYS[row.type]].append(_hit(row, matcher))
+    return result
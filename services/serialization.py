@@ -0,0 +1,264 @@
+"""
+Профили загрузки для сериализации задач без N+1.
+
+Task.to_dict() обращается к status, assignee, author, project и tags,
+а вложенный Contact.to_dict() — к contact_type и тегам контакта.
+Без eager-загрузки каждая строка стоит несколько ленивых SELECT.
+
+Профиль — именованный набор loader-опций. Запрос с профилем выполняет
+фиксированное число запросов независимо от количества строк.
+
+Использование в сервисах:
+    from services.serialization import with_profile, serialize_tasks
+    tasks = with_profile(Task.query.filter(...), 'list').all()
+    return serialize_tasks(tasks)
+
+Компактное представление (view='compact') не создаёт ORM-объектов:
+задачи выбираются column-only проекцией с JOIN на статус, контакты и
+проект, теги — одним дополнительным запросом. В ответе только id,
+названия/имена и цвета.
+
+Сводка встреч (meeting_summaries) — такая же проекция для списков встреч:
+поля карточки и счётчики участников, задач, заметок и действий, посчитанные
+в SQL, вместо Meeting.to_dict() с полным графом связей. Полный граф
+(with_meeting_detail) грузится только для карточки одной встречи.
+"""
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload, selectinload, aliased
+from core.database import db
+from core.models import (
+    Task, Contact, ContactType, TaskStatus, Project, Tag, task_tags,
+    Meeting, MeetingType, MeetingNote, MeetingActionItem, meeting_participants, meeting_tasks
+)
+
+TASK_VIEWS = ('full', 'compact')
+
+
+def _contact_options(rel):
+    """Контакт (исполнитель/автор) вместе с типом и тегами."""
+    return selectinload(rel).options(
+        joinedload(Contact.contact_type),
+        selectinload(Contact.tags),
+    )
+
+
+def _list_options():
+    return [
+        joinedload(Task.status),
+        joinedload(Task.project),
+        selectinload(Task.tags),
+        _contact_options(Task.assignee),
+        _contact_options(Task.author),
+    ]
+
+
+TASK_LOAD_PROFILES = {
+    # Списки задач: всё, что читает Task.to_dict()
+    'list': _list_options,
+    # Карточка задачи: плюс комментарии
+    'detail': lambda: _list_options() + [selectinload(Task.comments)],
+}
+
+
+def contact_load_options():
+    # Функция, а не константа: backref contact_type появляется только после конфигурации мапперов
+    return [joinedload(Contact.contact_type), selectinload(Contact.tags)]
+
+
+def task_load_options(profile='list'):
+    """Loader-опции для профиля. Неизвестный профиль — ValueError."""
+    try:
+        return TASK_LOAD_PROFILES[profile]()
+    except KeyError:
+        raise ValueError(f'Неизвестный профиль загрузки: {profile}')
+
+
+def with_profile(query, profile='list'):
+    """Навешивает на запрос задач опции профиля."""
+    return query.options(*task_load_options(profile))
+
+
+def serialize_tasks(tasks):
+    """to_dict() для списка задач, загруженных через with_profile()."""
+    return [t.to_dict() for t in tasks]
+
+
+def with_contact_profile(query):
+    """Опции для запросов контактов, сериализуемых через Contact.to_dict()."""
+    return query.options(*contact_load_options())
+
+
+# ---------------------------------------------------------------------------
+# Compact view: column-only projection
+# ---------------------------------------------------------------------------
+
+def _compact_person(contact_id, last_name, first_name, color):
+    if contact_id is None:
+        return None
+    return {'id': contact_id, 'last_name': last_name, 'first_name': first_name, 'color': color}
+
+
+def _compact_tags(task_ids):
+    """Теги для набора задач одним запросом: {task_id: [{'id', 'name'}]}."""
+    result = {tid: [] for tid in task_ids}
+    if not task_ids:
+        return result
+    rows = db.session.query(task_tags.c.task_id, Tag.id, Tag.name)\
+        .join(Tag, Tag.id == task_tags.c.tag_id)\
+        .filter(task_tags.c.task_id.in_(task_ids))\
+        .order_by(Tag.name)\
+        .all()
+    for task_id, tag_id, tag_name in rows:
+        result[task_id].append({'id': tag_id, 'name': tag_name})
+    return result
+
+
+def compact_tasks(query):
+    """
+    Выполняет запрос задач (без loader-опций) как column-only проекцию.
+    Фильтры, сортировка и LIMIT исходного запроса сохраняются.
+    """
+    assignee = aliased(Contact)
+    author = aliased(Contact)
+    assignee_type = aliased(ContactType)
+    author_type = aliased(ContactType)
+
+    # Все JOIN — many-to-one, строки не размножаются, поэтому их можно
+    # навесить и на запрос с уже применённым LIMIT
+    rows = query.enable_assertions(False)\
+        .outerjoin(TaskStatus, TaskStatus.id == Task.status_id)\
+        .outerjoin(Project, Project.id == Task.project_id)\
+        .outerjoin(assignee, assignee.id == Task.assignee_id)\
+        .outerjoin(assignee_type, assignee_type.id == assignee.type_id)\
+        .outerjoin(author, author.id == Task.author_id)\
+        .outerjoin(author_type, author_type.id == author.type_id)\
+        .with_entities(
+            Task.id, Task.title, Task.due_date, Task.status_id,
+            TaskStatus.name, TaskStatus.color,
+            Task.assignee_id, assignee.last_name, assignee.first_name, assignee_type.render_color,
+            Task.author_id, author.last_name, author.first_name, author_type.render_color,
+            Task.project_id, Project.title,
+        ).all()
+
+    tags = _compact_tags([r[0] for r in rows])
+
+    return [{
+        'id': r[0],
+        'title': r[1],
+        'due_date': r[2].isoformat() if r[2] else None,
+        'status_id': r[3],
+        'status': {'id': r[3], 'name': r[4], 'color': r[5]} if r[4] is not None else None,
+        'assignee_id': r[6],
+        'assignee': _compact_person(r[6], r[7], r[8], r[9]),
+        'author_id': r[10],
+        'author': _compact_person(r[10], r[11], r[12], r[13]),
+        'project_id': r[14],
+        'project_title': r[15],
+        'tags': tags[r[0]],
+    } for r in rows]
+
+
+def load_tasks(query, view='full'):
+    """Выполняет запрос задач и сериализует в выбранном представлении."""
+    if view == 'compact':
+        return compact_tasks(query)
+    return serialize_tasks(with_profile(query).all())
+
+
+# Id в одном IN (...): старые сборки SQLite допускают не больше 999 параметров запроса
+ID_CHUNK_SIZE = 500
+
+
+def load_tasks_by_ids(task_ids, view='full'):
+    """Пакетная загрузка задач по набору id: {task_id: dict}. Запросы — пачками по ID_CHUNK_SIZE id."""
+    task_ids = list(task_ids)
+    result = {}
+    for start in range(0, len(task_ids), ID_CHUNK_SIZE):
+        chunk = task_ids[start:start + ID_CHUNK_SIZE]
+        result.update((d['id'], d) for d in load_tasks(Task.query.filter(Task.id.in_(chunk)), view))
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Meetings: detail graph and summary projection
+# ---------------------------------------------------------------------------
+
+def with_meeting_detail(query):
+    """Опции для карточки встречи: всё, что читает Meeting.to_dict()."""
+    return query.options(
+        joinedload(Meeting.type),
+        joinedload(Meeting.project),
+        selectinload(Meeting.participants).options(*contact_load_options()),
+        selectinload(Meeting.related_tasks).options(*task_load_options('list')),
+        selectinload(Meeting.action_items),
+        selectinload(Meeting.meeting_notes),
+    )
+
+
+def _count_for_meeting(column, *conditions):
+    """Коррелированный COUNT по дочерней таблице встречи."""
+    return select(func.count()).where(column == Meeting.id, *conditions).scalar_subquery()
+
+
+def _summary_participants(meeting_ids):
+    """Участники набора встреч одним запросом: {meeting_id: [компактный контакт]}."""
+    result = {mid: [] for mid in meeting_ids}
+    if not meeting_ids:
+        return result
+    rows = db.session.query(
+        meeting_participants.c.meeting_id, Contact.id, Contact.last_name, Contact.first_name,
+        ContactType.render_color,
+    ).join(Contact, Contact.id == meeting_participants.c.contact_id)\
+     .outerjoin(ContactType, ContactType.id == Contact.type_id)\
+     .filter(meeting_participants.c.meeting_id.in_(meeting_ids))\
+     .order_by(Contact.last_name_folded, Contact.first_name_folded)\
+     .all()
+    for meeting_id, *person in rows:
+        result[meeting_id].append(_compact_person(*person))
+    return result
+
+
+def meeting_summaries(query):
+    """
+    Выполняет запрос встреч (без loader-опций) как column-only проекцию:
+    поля карточки, тип, проект, счётчики и компактные участники.
+    Фильтры, сортировка и LIMIT исходного запроса сохраняются.
+    """
+    rows = query.enable_assertions(False)\
+        .outerjoin(MeetingType, MeetingType.id == Meeting.type_id)\
+        .outerjoin(Project, Project.id == Meeting.project_id)\
+        .with_entities(
+            Meeting.id, Meeting.title, Meeting.date, Meeting.time, Meeting.duration_minutes,
+            Meeting.type_id, MeetingType.name, MeetingType.color,
+            Meeting.project_id, Project.title, Meeting.status,
+            Meeting.started_at, Meeting.ended_at,
+            func.coalesce(Meeting.summary, '') != '',
+            _count_for_meeting(meeting_tasks.c.meeting_id),
+            _count_for_meeting(MeetingNote.meeting_id),
+            _count_for_meeting(MeetingActionItem.meeting_id),
+            _count_for_meeting(MeetingActionItem.meeting_id, MeetingActionItem.is_done.is_(True)),
+        ).all()
+
+    participants = _summary_participants([r[0] for r in rows])
+
+    return [{
+        'id': r[0],
+        'title': r[1],
+        'date': r[2].isoformat() if r[2] else None,
+        'time': r[3].strftime('%H:%M') if r[3] else None,
+        'duration_minutes': r[4],
+        'type_id': r[5],
+        'type': {'id': r[5], 'name': r[6], 'color': r[7]} if r[6] is not None else None,
+        'project_id': r[8],
+        'project_title': r[9],
+        'status': r[10],
+        'started_at': r[11].isoformat() if r[11] else None,
+        'ended_at': r[12].isoformat() if r[12] else None,
+        'has_summary': bool(r[13]),
+        'participants': participants[r[0]],
+        'participants_count': len(participants[r[0]]),
+        'related_tasks_count': r[14],
+        'meeting_notes_count': r[15],
+        'action_items_count': r[16],
+        'action_items_done': r[17],
+    } for r in rows]
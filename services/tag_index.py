@@ -0,0 +1,271 @@
+"""
+Индекс тегов для поиска по #тегу и автодополнения.
+
+Вместо ILIKE-скана таблицы тегов и EXISTS-подзапросов на каждую сущность
+индекс держит в памяти процесса:
+- префиксное дерево (trie) по именам тегов — ключами служат имя целиком и
+  каждое слово внутри имени («проект-альфа» находится и по «аль»);
+  дети узлов отсортированы, поэтому обход сразу выдаёт теги по алфавиту;
+- postings: тег -> отсортированные id задач, контактов и проектов
+  (проект — через задачи с этим тегом).
+
+Индекс строится тремя запросами при первом обращении. Синхронный подписчик
+services.change_events (как у services.dashboard_cache) после коммита:
+- изменение тегов или проекта задачи, тегов контакта, удаление задачи или
+  контакта — помечает эти id; при следующем обращении их связи перечитываются
+  одним запросом и postings правятся на месте;
+- изменение самих тегов и reset — сбрасывает индекс целиком.
+Запись в обход ORM — вызвать invalidate_tag_index() или change_events.publish_reset().
+"""
+import bisect
+import heapq
+import re
+import threading
+from collections import Counter
+from core.database import db
+from core.models import Task, Tag, task_tags, contact_tags, fold
+from services.change_events import subscribe
+from services.serialization import ID_CHUNK_SIZE
+
+_WORD_RE = re.compile(r'\w+')
+
+
+class _TrieNode:
+    __slots__ = ('children', 'tag_ids', 'keys')
+
+    def __init__(self):
+        self.children = {}
+        self.tag_ids = []
+        self.keys = ()  # отсортированные ключи children, заполняются в freeze()
+
+
+class TagTrie:
+    """Префиксное дерево: ключ -> id тегов; обход поддерева в алфавитном порядке."""
+
+    def __init__(self):
+        self.root = _TrieNode()
+
+    def insert(self, key, tag_id):
+        node = self.root
+        for ch in key:
+            node = node.children.setdefault(ch, _TrieNode())
+        node.tag_ids.append(tag_id)
+
+    def freeze(self):
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            node.keys = tuple(sorted(node.children))
+            stack.extend(node.children.values())
+
+    def search(self, prefix, limit=None):
+        """id тегов, у которых есть ключ с началом prefix, без повторов, не больше limit."""
+        node = self.root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+
+        found, seen = [], set()
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for tag_id in node.tag_ids:
+                if tag_id not in seen:
+                    seen.add(tag_id)
+                    found.append(tag_id)
+                    if limit is not None and len(found) >= limit:
+                        return found
+            stack.extend(node.children[ch] for ch in reversed(node.keys))
+        return found
+
+
+class TagIndex:
+    def __init__(self):
+        tags = db.session.query(Tag.id, Tag.name, Tag.name_folded).order_by(Tag.name_folded).all()
+        self.names = {tag_id: name for tag_id, name, _ in tags}
+
+        self.trie = TagTrie()
+        for tag_id, _, key in tags:
+            self.trie.insert(key, tag_id)
+            for match in _WORD_RE.finditer(key):
+                if match.start() > 0:
+                    self.trie.insert(key[match.start():], tag_id)
+        self.trie.freeze()
+
+        # Связи сущностей: id -> (project_id, frozenset id тегов); только сущности с тегами
+        self.task_links = self._links(self._task_rows())
+        self.contact_links = self._links(self._contact_rows())
+        self.tasks = self._postings(self.task_links)
+        self.contacts = self._postings(self.contact_links)
+        # (тег, проект) -> число задач проекта с этим тегом: проект уходит из postings на нуле
+        self.project_refs = Counter(
+            (tag_id, project_id)
+            for project_id, tag_ids in self.task_links.values() if project_id is not None
+            for tag_id in tag_ids
+        )
+        self.projects = {}
+        for tag_id, project_id in sorted(self.project_refs):
+            self.projects.setdefault(tag_id, []).append(project_id)
+
+    @staticmethod
+    def _task_rows(task_ids=None):
+        query = (db.session.query(task_tags.c.task_id, Task.project_id, task_tags.c.tag_id)
+                 .join(Task, Task.id == task_tags.c.task_id))
+        if task_ids is not None:
+            query = query.filter(task_tags.c.task_id.in_(task_ids))
+        return query
+
+    @staticmethod
+    def _contact_rows(contact_ids=None):
+        query = db.session.query(contact_tags.c.contact_id, contact_tags.c.tag_id)
+        if contact_ids is not None:
+            query = query.filter(contact_tags.c.contact_id.in_(contact_ids))
+        return ((contact_id, None, tag_id) for contact_id, tag_id in query)
+
+    @staticmethod
+    def _links(rows):
+        """{id: (project_id, frozenset id тегов)} из строк (id, project_id, tag_id)."""
+        links = {}
+        for entity_id, project_id, tag_id in rows:
+            links.setdefault(entity_id, (project_id, set()))[1].add(tag_id)
+        return {entity_id: (project_id, frozenset(tag_ids)) for entity_id, (project_id, tag_ids) in links.items()}
+
+    @staticmethod
+    def _postings(links):
+        postings = {}
+        for entity_id in sorted(links):
+            for tag_id in links[entity_id][1]:
+                postings.setdefault(tag_id, []).append(entity_id)
+        return postings
+
+    # Postings меняются копированием списка: читатель, который уже взял старый
+    # список в merge(), дочитывает его без блокировки
+
+    @staticmethod
+    def _post(postings, tag_id, entity_id):
+        ids = list(postings.get(tag_id, ()))
+        bisect.insort(ids, entity_id)
+        postings[tag_id] = ids
+
+    @staticmethod
+    def _unpost(postings, tag_id, entity_id):
+        ids = [i for i in postings.get(tag_id, ()) if i != entity_id]
+        if ids:
+            postings[tag_id] = ids
+        else:
+            postings.pop(tag_id, None)
+
+    def _relink(self, links, postings, entity_id, new):
+        """Заменяет связи сущности на new и правит postings; возвращает прежние связи."""
+        old = links.pop(entity_id, (None, frozenset()))
+        if new:
+            links[entity_id] = new
+        new_tags = new[1] if new else frozenset()
+        for tag_id in old[1] - new_tags:
+            self._unpost(postings, tag_id, entity_id)
+        for tag_id in new_tags - old[1]:
+            self._post(postings, tag_id, entity_id)
+        return old
+
+    def refresh(self, task_ids=(), contact_ids=()):
+        """Перечитывает теги (и проект) задач task_ids и контактов contact_ids, postings — на месте."""
+        if task_ids:
+            fresh = self._links(self._task_rows(task_ids))
+            for task_id in task_ids:
+                new = fresh.get(task_id)
+                old_project, old_tags = self._relink(self.task_links, self.tasks, task_id, new)
+                if old_project is not None:
+                    for tag_id in old_tags:
+                        self.project_refs[(tag_id, old_project)] -= 1
+                        if not self.project_refs[(tag_id, old_project)]:
+                            del self.project_refs[(tag_id, old_project)]
+                            self._unpost(self.projects, tag_id, old_project)
+                if new and new[0] is not None:
+                    for tag_id in new[1]:
+                        self.project_refs[(tag_id, new[0])] += 1
+                        if self.project_refs[(tag_id, new[0])] == 1:
+                            self._post(self.projects, tag_id, new[0])
+        if contact_ids:
+            fresh = self._links(self._contact_rows(contact_ids))
+            for contact_id in contact_ids:
+                self._relink(self.contact_links, self.contacts, contact_id, fresh.get(contact_id))
+
+    def suggest(self, prefix, limit=None):
+        """[{'id', 'name'}] тегов по префиксу имени или слова в имени, по алфавиту."""
+        prefix = fold(prefix.strip())
+        if not prefix:
+            # names собраны в порядке имени — без обхода ключей-слов
+            return [{'id': tag_id, 'name': name} for tag_id, name in list(self.names.items())[:limit]]
+        return [{'id': tag_id, 'name': self.names[tag_id]} for tag_id in self.trie.search(prefix, limit)]
+
+    @staticmethod
+    def merge(postings, tag_ids, limit):
+        """Первые limit id (по возрастанию) из объединения postings выбранных тегов."""
+        merged = heapq.merge(*(postings.get(tag_id, ()) for tag_id in tag_ids))
+        result = []
+        for entity_id in merged:
+            if not result or result[-1] != entity_id:
+                result.append(entity_id)
+                if len(result) >= limit:
+                    break
+        return result
+
+
+_index = None
+# id задач и контактов, чьи связи с тегами изменились после построения индекса
+_stale_tasks = set()
+_stale_contacts = set()
+_lock = threading.Lock()
+
+
+def get_tag_index():
+    """Текущий индекс: строится заново, если был сброшен, иначе дочитывает изменённые связи."""
+    global _index
+    with _lock:
+        # Большую пачку изменений дешевле перечитать целиком, чем длинным IN (...)
+        if _index is None or len(_stale_tasks) + len(_stale_contacts) > ID_CHUNK_SIZE:
+            _index = TagIndex()
+        elif _stale_tasks or _stale_contacts:
+            _index.refresh(list(_stale_tasks), list(_stale_contacts))
+        _stale_tasks.clear()
+        _stale_contacts.clear()
+        return _index
+
+
+def invalidate_tag_index():
+    global _index
+    with _lock:
+        _index = None
+        _stale_tasks.clear()
+        _stale_contacts.clear()
+
+
+# --- Обновление по событиям изменения данных ---
+
+# Тип сущности -> поля, изменение которых меняет связи с тегами
+_INDEXED_FIELDS = {
+    'task': {'tags', 'project_id'},
+    'contact': {'tags'},
+}
+
+_STALE_IDS = {'task': _stale_tasks, 'contact': _stale_contacts}
+
+
+def _affects_index(e):
+    return e.op == 'delete' or not _INDEXED_FIELDS[e.entity].isdisjoint(e.fields)
+
+
+def _on_changes(events):
+    if any(e.entity == 'tag' or e.op == 'reset' for e in events):
+        invalidate_tag_index()
+        return
+    with _lock:
+        if _index is None:
+            return  # индекс всё равно будет построен заново
+        for e in events:
+            if _affects_index(e):
+                _STALE_IDS[e.entity].add(e.entity_id)
+
+
+subscribe(_on_changes, entities=('tag', 'task', 'contact'), sync=True)
@@ -1,5 +1,5 @@
 from core.database import db
-from core.models import Tag
+from core.models import Tag, fold
 
 def process_tags(tag_names):
     """Принимает список строк тегов, возвращает список объектов Tag"""
@@ -12,7 +12,7 @@ def process_tags(tag_names):
         if not clean_name:
             continue
             
-        tag = Tag.query.filter_by(name=clean_name).first()
+        tag = Tag.query.filter_by(name_folded=fold(clean_name)).first()
         if not tag:
             tag = Tag(name=clean_name)
             db.session.add(tag)
@@ -22,7 +22,7 @@ def process_tags(tag_names):
 
 def get_all_tags():
     """Возвращает все теги, отсортированные по имени."""
-    return Tag.query.order_by(Tag.name).all()
+    return Tag.query.order_by(Tag.name_folded).all()
 
 def create_tag(name):
     tag = Tag(name=name)
@@ -1,23 +1,145 @@
+import base64
+import json
 from core.database import db
-from core.models import Task, TaskStatus, TaskComment, Contact, Project
-from datetime import datetime
+from core.models import Task, TaskStatus, TaskComment, Contact, Project, Tag, task_tags, fold
+from datetime import datetime, date
+from sqlalchemy import and_, or_
 from services.tag_service import process_tags
 from services.activity_service import log_change, get_activity_log
+from services.serialization import with_profile, load_tasks
+from services.lookup_service import status_id as lookup_status_id
 
 def get_task_statuses():
     return TaskStatus.query.all()
 
-def get_all_tasks(status_filter=None):
-    query = Task.query
+# Порядок выдачи списка задач. Он же — ключ keyset-пагинации: (status_id, due_date, id).
+# Задачи без срока идут в конце своей группы статуса.
+TASK_LIST_ORDER = (Task.status_id.asc(), Task.due_date.is_(None), Task.due_date.asc(), Task.id.asc())
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def _apply_task_filters(query, filters):
+    """
+    Накладывает серверные фильтры на запрос задач.
+
+    filters — dict с необязательными ключами:
+        status_id  — int или список int
+        assignee_id, author_id, project_id — int
+        tag        — имя тега
+        due_from, due_to — date (включительно)
+    """
+    if not filters:
+        return query
+
+    status_ids = filters.get('status_id')
+    if status_ids:
+        if not isinstance(status_ids, (list, tuple, set)):
+            status_ids = [status_ids]
+        query = query.filter(Task.status_id.in_(status_ids))
+
+    if filters.get('assignee_id'):
+        query = query.filter(Task.assignee_id == filters['assignee_id'])
+    if filters.get('author_id'):
+        query = query.filter(Task.author_id == filters['author_id'])
+    if filters.get('project_id'):
+        query = query.filter(Task.project_id == filters['project_id'])
+
+    if filters.get('tag'):
+        tagged_ids = db.session.query(task_tags.c.task_id)\
+            .join(Tag, Tag.id == task_tags.c.tag_id)\
+            .filter(Tag.name_folded == fold(filters['tag'].strip()))
+        query = query.filter(Task.id.in_(tagged_ids))
+
+    if filters.get('due_from'):
+        query = query.filter(Task.due_date >= filters['due_from'])
+    if filters.get('due_to'):
+        query = query.filter(Task.due_date <= filters['due_to'])
+
+    return query
+
+
+def encode_task_cursor(item):
+    """Упаковывает ключ сортировки сериализованной задачи в непрозрачную строку курсора."""
+    key = [item['status_id'], item['due_date'], item['id']]
+    raw = json.dumps(key, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_task_cursor(cursor):
+    """Распаковывает курсор. При некорректном значении бросает ValueError."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        status_id, due, task_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        due_date = date.fromisoformat(due) if due is not None else None
+        return int(status_id), due_date, int(task_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError('Некорректный курсор')
+
+
+def _after_cursor(query, cursor):
+    """Условие keyset: строки строго после (status_id, due_date, id) в порядке TASK_LIST_ORDER."""
+    status_id, due_date, task_id = decode_task_cursor(cursor)
+
+    if due_date is None:
+        # Внутри статуса остались только задачи без срока с большим id
+        same_status = and_(Task.due_date.is_(None), Task.id > task_id)
+    else:
+        same_status = or_(
+            Task.due_date.is_(None),
+            Task.due_date > due_date,
+            and_(Task.due_date == due_date, Task.id > task_id)
+        )
+
+    return query.filter(or_(
+        Task.status_id > status_id,
+        and_(Task.status_id == status_id, same_status)
+    ))
+
+
+def get_all_tasks(status_filter=None, filters=None):
+    filters = dict(filters or {})
     if status_filter:
-        pass 
-    return query.order_by(Task.status_id, Task.due_date).all()
+        filters['status_id'] = status_filter
+    query = _apply_task_filters(with_profile(Task.query), filters)
+    return query.order_by(*TASK_LIST_ORDER).all()
+
+
+def get_task_list(filters=None, view='full'):
+    """Отфильтрованный список задач, сериализованный в представлении view ('full' | 'compact')."""
+    query = _apply_task_filters(Task.query, filters)
+    return load_tasks(query.order_by(*TASK_LIST_ORDER), view)
+
+
+def get_tasks_page(filters=None, cursor=None, limit=DEFAULT_PAGE_SIZE, view='full'):
+    """
+    Страница задач с keyset-пагинацией по (status_id, due_date, id).
+    Стоимость запроса не зависит от номера страницы — OFFSET не используется.
+
+    Возвращает dict: items (сериализованные задачи), next_cursor (str или None), has_more.
+    """
+    limit = max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+
+    query = _apply_task_filters(Task.query, filters)
+    if cursor:
+        query = _after_cursor(query, cursor)
+
+    # Берём на одну строку больше, чтобы понять, есть ли следующая страница
+    rows = load_tasks(query.order_by(*TASK_LIST_ORDER).limit(limit + 1), view)
+    has_more = len(rows) > limit
+    items = rows[:limit]
+
+    return {
+        'items': items,
+        'next_cursor': encode_task_cursor(items[-1]) if has_more else None,
+        'has_more': has_more,
+    }
 
 def create_task(data):
     status_id = data.get('status_id')
     if not status_id:
-        default_s = TaskStatus.query.filter_by(name='К выполнению').first()
-        if default_s: status_id = default_s.id
+        status_id = lookup_status_id('К выполнению')
     
     due_date = None
     if data.get('due_date'):
@@ -46,7 +168,7 @@ def create_task(data):
 
 
 def get_task_full_details(task_id):
-    t = Task.query.get(task_id)
+    t = with_profile(Task.query, 'detail').filter(Task.id == task_id).first()
     if not t:
         return None
     
@@ -13,7 +13,7 @@
 
 import re
 from datetime import date, time
-from flask import jsonify
+from flask import jsonify, request
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -144,6 +144,17 @@ def validate(data, schema, partial=False):
     return errors
 
 
+def task_view_arg():
+    """
+    Читает представление задач из query string: ?view=compact или ?fields=compact.
+    Возвращает (view, errors) — errors пустой список, если значение допустимо.
+    """
+    view = request.args.get('view') or request.args.get('fields') or 'full'
+    if view not in ('full', 'compact'):
+        return view, ['Допустимые значения: full, compact']
+    return view, []
+
+
 def validation_error(errors):
     """Формирует единообразный JSON-ответ 400 с деталями ошибок валидации."""
     return jsonify({
@@ -171,6 +182,17 @@ TASK_CREATE_SCHEMA = {
 
 TASK_UPDATE_SCHEMA = TASK_CREATE_SCHEMA  # partial=True при вызове
 
+# Query-параметры GET /api/tasks (значения уже приведены к int в роуте)
+TASK_LIST_QUERY_SCHEMA = {
+    'assignee_id': {'type': 'int', 'min': 1},
+    'author_id': {'type': 'int', 'min': 1},
+    'project_id': {'type': 'int', 'min': 1},
+    'tag': {'type': 'str', 'max_length': 50},
+    'due_from': {'type': 'date'},
+    'due_to': {'type': 'date'},
+    'limit': {'type': 'int', 'min': 1, 'max': 500},
+}
+
 TASK_COMMENT_SCHEMA = {
     'text': {'required': True, 'type': 'str', 'max_length': 5000},
 }
@@ -243,6 +265,13 @@ MEETING_CREATE_SCHEMA = {
 
 MEETING_UPDATE_SCHEMA = MEETING_CREATE_SCHEMA
 
+MEETING_LIST_QUERY_SCHEMA = {
+    'type_id': {'type': 'int', 'min': 1},
+    'date_from': {'type': 'date'},
+    'date_to': {'type': 'date'},
+    'limit': {'type': 'int', 'min': 1, 'max': 500},
+}
+
 MEETING_NOTE_SCHEMA = {
     'text': {'required': True, 'type': 'str', 'max_length': 5000},
     'source': {'type': 'str', 'choices': ['manual', 'voice', 'ai']},
@@ -155,12 +155,30 @@ const API = {
             return await response.json();
         } catch (err) { console.error(err); return []; }
     },
-    async getTasks() {
+    // filters: { status_id, assignee_id, author_id, project_id, tag, due_from, due_to, view }
+    async getTasks(filters = {}) {
         try {
-            const response = await fetch('/api/tasks');
+            const params = new URLSearchParams();
+            Object.entries(filters).forEach(([k, v]) => {
+                if (v !== null && v !== undefined && v !== '') params.append(k, v);
+            });
+            const query = params.toString();
+            const response = await fetch('/api/tasks' + (query ? '?' + query : ''));
             return await response.json();
         } catch (err) { console.error(err); return []; }
     },
+    // Постраничная загрузка: { items, next_cursor, has_more }
+    async getTasksPage(filters = {}, cursor = null, limit = 50) {
+        try {
+            const params = new URLSearchParams({ limit });
+            if (cursor) params.append('cursor', cursor);
+            Object.entries(filters).forEach(([k, v]) => {
+                if (v !== null && v !== undefined && v !== '') params.append(k, v);
+            });
+            const response = await fetch(`/api/tasks?${params.toString()}`);
+            return await response.json();
+        } catch (err) { console.error(err); return { items: [], next_cursor: null, has_more: false }; }
+    },
     async createTask(data) {
         const res = await apiMutate('/api/tasks', 'POST', data);
         if (res.details) return res;
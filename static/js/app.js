@@ -9,6 +9,8 @@ import Inbox from './components/Inbox.js';
 import DailyStandup from './components/DailyStandup.js';
 import OneOnOnePrep from './components/OneOnOnePrep.js';
 import DeadlineNotifier from './components/DeadlineNotifier.js';
+import EventStream from './utils/eventStream.js';
+import TaskIndex from './utils/taskIndex.js';
 
 import { TaskController } from './controllers/TaskController.js';
 import { ContactController } from './controllers/ContactController.js';
@@ -200,19 +202,55 @@ async function loadInitialData() {
     // Populate project select in meeting modal
     updateMeetingProjectSelect(ProjectController.getData());
 
-    // Обновляем счётчик inbox
-    await updateInboxBadge();
+    // Компактные задачи для счётчика inbox и дедлайнов — один раз, дальше их патчит поток изменений
+    await TaskIndex.load();
+    updateInboxBadge();
 
     // Проверяем дедлайны
-    DeadlineNotifier.check();
+    DeadlineNotifier.check(TaskIndex.values());
+
+    subscribeToChanges();
+}
+
+function isVisible(viewName) {
+    const el = document.getElementById(`view-${viewName}`);
+    return el && !el.classList.contains('hidden');
+}
+
+let dashboardRefresh = null;
+
+function subscribeToChanges() {
+    EventStream.on('task', ({ op, id, task }) => {
+        TaskIndex.apply(op, id, task);
+        updateInboxBadge();
+        Inbox.applyTaskChange(op, id, task);
+    });
+
+    EventStream.on('meeting', ({ op, id, meeting }) => {
+        MeetingController.applyMeetingChange(op, id, meeting);
+    });
+
+    EventStream.on('dashboard', () => {
+        if (!isVisible('dashboard')) return;
+        // Пачка изменений приходит несколькими событиями — перечитываем снимок один раз
+        clearTimeout(dashboardRefresh);
+        dashboardRefresh = setTimeout(() => Dashboard.init(), 300);
+    });
+
+    EventStream.on('reset', async () => {
+        await TaskIndex.load();
+        updateInboxBadge();
+        if (isVisible('inbox')) Inbox.init();
+        if (isVisible('meetings')) MeetingController.loadAll();
+        if (isVisible('dashboard')) Dashboard.init();
+    });
+
+    EventStream.connect();
 }
 
 async function updateInboxBadge() {
-    const tasks = await API.getTasks();
-    const inboxCount = (tasks || []).filter(t => {
-        const isDone = t.status && t.status.name === 'Готово';
-        return !isDone && (!t.assignee_id || !t.due_date);
-    }).length;
+    const tasks = await TaskIndex.fresh();
+    const inboxCount = tasks.filter(t => Inbox.needsTriage(t)).length;
 
     const badge = document.getElementById('inbox-badge');
     if (badge) {
@@ -13,8 +13,9 @@ const DailyStandup = {
     },
 
     async loadData() {
-        const data = await API.getDailyStandup();
-        if (!data) return;
+        const raw = await API.getDailyStandup();
+        if (!raw) return;
+        const data = this._resolveTasks(raw);
         standupData = data;
 
         // Определяем режим: если есть self или team — показываем группировку
@@ -37,6 +38,27 @@ const DailyStandup = {
         if (window.lucide) lucide.createIcons();
     },
 
+    // Списки и блоки по людям приходят как id задач — подставляем задачи из data.tasks
+    _resolveTasks(data) {
+        const tasks = data.tasks || {};
+        const resolve = ids => (ids || []).map(id => tasks[id]).filter(Boolean);
+        const resolveBlock = block => block
+            ? Object.fromEntries(Object.entries(block).map(([cat, ids]) => [cat, resolve(ids)]))
+            : null;
+
+        return {
+            ...data,
+            completed: resolve(data.completed),
+            in_progress: resolve(data.in_progress),
+            due_today: resolve(data.due_today),
+            overdue: resolve(data.overdue),
+            waiting: resolve(data.waiting),
+            self_tasks: resolveBlock(data.self_tasks),
+            team: (data.team || []).map(member => ({ ...member, tasks: resolveBlock(member.tasks) })),
+            other_tasks: resolveBlock(data.other_tasks),
+        };
+    },
+
     // ========= FLAT VIEW (старый вид без команды) =========
     renderFlatView(data) {
         const mainContainer = document.getElementById('standup-team-container');
@@ -3,17 +3,21 @@ import API from '../api.js';
 const DISMISSED_KEY = 'deadline_notifier_dismissed';
 
 const DeadlineNotifier = {
-    async check() {
+    // tasks — уже загруженные компактные задачи (app.js); без них запрашиваем только сроки до сегодня
+    async check(tasks = null) {
         // Не показывать повторно в рамках одной сессии (до перезагрузки страницы)
         const dismissed = sessionStorage.getItem(DISMISSED_KEY);
         if (dismissed) return;
 
-        const tasks = await API.getTasks();
-        if (!tasks || tasks.length === 0) return;
-
         const today = new Date();
         today.setHours(0, 0, 0, 0);
 
+        if (!tasks) {
+            const todayIso = `${today.getFullYear()}-${String(today.getMonth() + 1).padStart(2, '0')}-${String(today.getDate()).padStart(2, '0')}`;
+            tasks = await API.getTasks({ due_to: todayIso, view: 'compact' });
+        }
+        if (!tasks || tasks.length === 0) return;
+
         const tomorrow = new Date(today);
         tomorrow.setDate(tomorrow.getDate() + 1);
 
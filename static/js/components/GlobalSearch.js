@@ -63,8 +63,16 @@ const GlobalSearch = {
         const hasProjects = data.projects && data.projects.length > 0;
         const hasContacts = data.contacts && data.contacts.length > 0;
         const hasTagSuggestions = data.tag_suggestions && data.tag_suggestions.length > 0;
-
-        if (!hasTasks && !hasProjects && !hasContacts && !hasTagSuggestions) {
+        // Встречи, их заметки и договорённости ведут на карточку встречи
+        const meetingHits = [
+            ...(data.meetings || []),
+            ...(data.meeting_notes || []),
+            ...(data.action_items || [])
+        ];
+        const hasMeetings = meetingHits.length > 0;
+        const hasComments = data.comments && data.comments.length > 0;
+
+        if (!hasTasks && !hasProjects && !hasContacts && !hasTagSuggestions && !hasMeetings && !hasComments) {
             container.innerHTML = `<div class="p-4 text-sm text-center text-slate-500 dark:text-slate-400">Ничего не найдено</div>`;
             container.classList.remove('hidden');
             return;
@@ -89,7 +97,7 @@ const GlobalSearch = {
                 <div onclick="openProjectDetail(${p.id}); document.getElementById('globalHeaderSearchResults').classList.add('hidden');"
                      class="px-4 py-2 hover:bg-slate-50 cursor-pointer flex items-center transition-colors dark:hover:bg-slate-700">
                     <i data-lucide="briefcase" class="w-4 h-4 mr-3 text-slate-400"></i>
-                    <span class="text-sm font-medium text-slate-800 dark:text-slate-200">${p.title}</span>
+                    <span class="text-sm font-medium text-slate-800 dark:text-slate-200">${p.highlight || p.title}</span>
                 </div>
             `).join('');
         }
@@ -114,7 +122,38 @@ const GlobalSearch = {
                 <div onclick="openTaskDetail(${t.id}); document.getElementById('globalHeaderSearchResults').classList.add('hidden');"
                      class="px-4 py-2 hover:bg-slate-50 cursor-pointer flex items-center transition-colors dark:hover:bg-slate-700">
                     <div class="w-2 h-2 rounded-full mr-3 flex-shrink-0" style="background-color: ${t.status ? t.status.color : '#ccc'}"></div>
-                    <span class="text-sm text-slate-800 truncate dark:text-slate-200">${t.title}</span>
+                    <span class="text-sm text-slate-800 truncate dark:text-slate-200">${t.highlight || t.title}</span>
+                </div>
+            `).join('');
+        }
+
+        if (hasMeetings) {
+            html += `<div class="px-3 py-2 text-[10px] font-bold text-slate-400 uppercase bg-slate-50 border-t border-slate-100 dark:bg-slate-700/50 dark:border-slate-700 dark:text-slate-300">Встречи</div>`;
+            html += meetingHits.map(m => {
+                const meetingId = m.parent ? m.parent.id : m.id;
+                const title = m.parent ? m.parent.title : (m.highlight || m.title);
+                return `
+                <div onclick="openMeetingDetail(${meetingId}); document.getElementById('globalHeaderSearchResults').classList.add('hidden');"
+                     class="px-4 py-2 hover:bg-slate-50 cursor-pointer flex items-center transition-colors dark:hover:bg-slate-700">
+                    <i data-lucide="${m.type === 'meeting' ? 'calendar' : 'message-square'}" class="w-4 h-4 mr-3 text-slate-400 flex-shrink-0"></i>
+                    <div class="min-w-0">
+                        <div class="text-sm text-slate-800 truncate dark:text-slate-200">${title}</div>
+                        ${m.snippet ? `<div class="text-xs text-slate-500 truncate">${m.snippet}</div>` : ''}
+                    </div>
+                </div>`;
+            }).join('');
+        }
+
+        if (hasComments) {
+            html += `<div class="px-3 py-2 text-[10px] font-bold text-slate-400 uppercase bg-slate-50 border-t border-slate-100 dark:bg-slate-700/50 dark:border-slate-700 dark:text-slate-300">Комментарии</div>`;
+            html += data.comments.map(c => `
+                <div onclick="openTaskDetail(${c.parent.id}); document.getElementById('globalHeaderSearchResults').classList.add('hidden');"
+                     class="px-4 py-2 hover:bg-slate-50 cursor-pointer flex items-center transition-colors dark:hover:bg-slate-700">
+                    <i data-lucide="message-circle" class="w-4 h-4 mr-3 text-slate-400 flex-shrink-0"></i>
+                    <div class="min-w-0">
+                        <div class="text-sm text-slate-800 truncate dark:text-slate-200">${c.parent.title}</div>
+                        <div class="text-xs text-slate-500 truncate">${c.snippet}</div>
+                    </div>
                 </div>
             `).join('');
         }
@@ -1,7 +1,9 @@
 import API from '../api.js';
 import Dashboard from './Dashboard.js';
+import TaskIndex from '../utils/taskIndex.js';
 
 let inboxTasks = [];
+let loaded = false;
 let contacts = [];
 let projects = [];
 
@@ -12,8 +14,9 @@ const Inbox = {
     },
 
     async loadData() {
+        // Задачи — из общего индекса (utils/taskIndex.js), а не новой загрузкой всего списка
         const [tasks, contactsData, projectsData] = await Promise.all([
-            API.getTasks(),
+            TaskIndex.fresh(),
             API.getContacts(),
             API.getProjects()
         ]);
@@ -22,12 +25,30 @@ const Inbox = {
         projects = projectsData || [];
 
         // Фильтруем задачи: нет исполнителя ИЛИ нет срока (и не завершены)
-        inboxTasks = (tasks || []).filter(t => {
-            const isDone = t.status && t.status.name === 'Готово';
-            const needsAssignee = !t.assignee_id;
-            const needsDueDate = !t.due_date;
-            return !isDone && (needsAssignee || needsDueDate);
-        });
+        inboxTasks = tasks.filter(t => this.needsTriage(t));
+        loaded = true;
+    },
+
+    needsTriage(t) {
+        const isDone = t.status && t.status.name === 'Готово';
+        const needsAssignee = !t.assignee_id;
+        const needsDueDate = !t.due_date;
+        return !isDone && (needsAssignee || needsDueDate);
+    },
+
+    // Изменение задачи из потока событий: патчим локальный список вместо перезагрузки
+    applyTaskChange(op, id, task) {
+        if (!loaded) return;
+        const index = inboxTasks.findIndex(t => t.id === id);
+        const keep = op !== 'delete' && task && this.needsTriage(task);
+
+        if (index >= 0 && keep) inboxTasks[index] = task;
+        else if (index >= 0) inboxTasks.splice(index, 1);
+        else if (keep) inboxTasks.unshift(task);
+        else return;
+
+        const view = document.getElementById('view-inbox');
+        if (view && !view.classList.contains('hidden')) this.render();
     },
 
     getCount() {
@@ -198,7 +198,7 @@ function renderCard(m, today) {
     const typeColor = m.type?.color || '#94a3b8';
 
     const notesCount = m.meeting_notes_count || 0;
-    const tasksCount = m.related_tasks ? m.related_tasks.length : 0;
+    const tasksCount = m.related_tasks_count || 0;
     const actionsDone = m.action_items_done || 0;
     const actionsTotal = m.action_items_count || 0;
 
@@ -126,7 +126,7 @@ const OneOnOnePrep = {
                     <div class="text-[11px] text-slate-400 flex items-center gap-3">
                         ${noteCount > 0 ? `<span>${noteCount} заметок</span>` : ''}
                         ${actionCount > 0 ? `<span>${actionDone}/${actionCount} действий</span>` : ''}
-                        ${m.summary ? '<span class="text-green-500">Есть итоги</span>' : ''}
+                        ${m.has_summary ? '<span class="text-green-500">Есть итоги</span>' : ''}
                     </div>
                 </div>
             </div>`;
@@ -120,6 +120,22 @@ export const MeetingController = {
         return meetingTypesData;
     },
 
+    // Изменение встречи из потока событий: сводка заменяется на месте, без перезагрузки списка
+    applyMeetingChange(op, id, meeting) {
+        if (!meetingsData.length && op !== 'create') return;
+        const index = meetingsData.findIndex(m => m.id === id);
+
+        if (op === 'delete' || !meeting) {
+            if (index < 0) return;
+            meetingsData.splice(index, 1);
+        } else if (index >= 0) {
+            meetingsData[index] = meeting;
+        } else {
+            meetingsData.push(meeting);
+        }
+        renderMeetings(meetingsData, meetingTypesData);
+    },
+
     getData() { return meetingsData; },
     getTypes() { return meetingTypesData; },
 
@@ -236,13 +252,9 @@ export const MeetingController = {
     },
 
     async editMeeting(id) {
-        const meeting = meetingsData.find(m => m.id === id);
-        if (!meeting) {
-            const data = await API.getMeeting(id);
-            if (data) this.populateModal(data);
-            return;
-        }
-        this.populateModal(meeting);
+        // В списке только сводки (без повестки и участников) — форма заполняется из карточки
+        const data = await API.getMeeting(id);
+        if (data) this.populateModal(data);
     },
 
     populateModal(meeting) {
@@ -0,0 +1,55 @@
+/**
+ * Поток изменений с сервера (/api/events, Server-Sent Events).
+ *
+ * События: task / meeting — {op, id, fields, task|meeting} для точечного
+ * обновления локальных данных; dashboard — {sections}; reset — {entities}:
+ * данные изменились целиком, списки нужно перечитать.
+ *
+ * При обрыве браузер сам переподключается с заголовком Last-Event-ID.
+ * Если соединение закрыто окончательно — переподключаемся вручную
+ * с ?last_event_id= последнего полученного события.
+ */
+const EVENT_TYPES = ['ready', 'reset', 'task', 'meeting', 'dashboard'];
+const RECONNECT_DELAY_MS = 5000;
+
+const handlers = {};
+let source = null;
+let lastEventId = null;
+
+function on(type, handler) {
+    (handlers[type] = handlers[type] || []).push(handler);
+}
+
+function emit(type, data) {
+    (handlers[type] || []).forEach(handler => {
+        try { handler(data); } catch (err) { console.error(err); }
+    });
+}
+
+function connect() {
+    if (source || !window.EventSource) return;
+
+    const url = lastEventId ? `/api/events?last_event_id=${encodeURIComponent(lastEventId)}` : '/api/events';
+    source = new EventSource(url);
+
+    EVENT_TYPES.forEach(type => {
+        source.addEventListener(type, e => {
+            if (e.lastEventId) lastEventId = e.lastEventId;
+            emit(type, JSON.parse(e.data));
+        });
+    });
+
+    source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) {
+            source = null;
+            setTimeout(connect, RECONNECT_DELAY_MS);
+        }
+    };
+}
+
+// Поток открыт: локальные копии данных получают изменения. Иначе их нужно перечитывать
+function isConnected() {
+    return !!source && source.readyState === EventSource.OPEN;
+}
+
+export default { on, connect, isConnected };
@@ -0,0 +1,35 @@
+/**
+ * Общий индекс компактных задач (view=compact): id -> задача.
+ *
+ * Загружается один раз при старте; дальше его патчат события потока
+ * изменений (utils/eventStream.js). Из него строятся inbox, счётчик inbox
+ * и проверка дедлайнов — без повторной загрузки всего списка задач.
+ * Пока поток не подключён, события теряются: fresh() перечитывает индекс.
+ */
+import API from '../api.js';
+import EventStream from './eventStream.js';
+
+const tasks = new Map();
+
+async function load() {
+    const data = await API.getTasks({ view: 'compact' });
+    tasks.clear();
+    (data || []).forEach(t => tasks.set(t.id, t));
+}
+
+function apply(op, id, task) {
+    if (op === 'delete' || !task) tasks.delete(id);
+    else tasks.set(id, task);
+}
+
+function values() {
+    return [...tasks.values()];
+}
+
+// Актуальные задачи: без потока изменений индекс мог устареть — перечитываем
+async function fresh() {
+    if (!EventStream.isConnected()) await load();
+    return values();
+}
+
+export default { load, apply, values, fresh };
@@ -14,6 +14,8 @@ def app():
     """Создаёт тестовое приложение с in-memory БД."""
     flask_app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
     flask_app.config['TESTING'] = True
+    # Задачи импорта — прямо в запросе, без фонового потока (services.import_jobs)
+    flask_app.config['IMPORT_JOBS_INLINE'] = True
 
     with flask_app.app_context():
         db.create_all()
@@ -33,3 +35,39 @@ def db_session(app):
     """Сессия БД для прямой работы с моделями."""
     with app.app_context():
         yield db.session
+
+
+@pytest.fixture
+def count_queries(app):
+    """count_queries(fn) — число SQL-запросов, выполненных при вызове fn."""
+    import threading
+    from sqlalchemy import event
+
+    def count(fn):
+        statements = []
+        # Только запросы вызывающего потока: подписчики change_events читают БД в фоне
+        thread_id = threading.get_ident()
+
+        def before_execute(conn, cursor, statement, params, context, executemany):
+            if threading.get_ident() == thread_id:
+                statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_execute)
+        try:
+            fn()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_execute)
+        return len(statements)
+
+    return count
+
+
+@pytest.fixture
+def status_id(app):
+    """status_id(name) — id статуса задачи по имени (статусы создаёт init_db)."""
+    from core.models import TaskStatus
+
+    def lookup(name):
+        return TaskStatus.query.filter_by(name=name).first().id
+
+    return lookup
@@ -157,6 +157,55 @@ class TestTasksAPI:
         data = response.get_json()
         assert 'title' in data['details']
 
+    def test_tasks_pagination(self, client):
+        """Постраничная выдача через cursor."""
+        for i in range(5):
+            client.post('/api/tasks', json={'title': f'Задача {i}'})
+
+        first = client.get('/api/tasks?limit=2').get_json()
+        assert len(first['items']) == 2
+        assert first['has_more'] is True
+
+        second = client.get(f"/api/tasks?limit=2&cursor={first['next_cursor']}").get_json()
+        first_ids = {t['id'] for t in first['items']}
+        assert not first_ids & {t['id'] for t in second['items']}
+
+    def test_tasks_filter_by_status(self, client):
+        statuses = client.get('/api/task-statuses').get_json()
+        done_id = next(s['id'] for s in statuses if s['name'] == 'Готово')
+        client.post('/api/tasks', json={'title': 'Открытая'})
+        client.post('/api/tasks', json={'title': 'Закрытая', 'status_id': done_id})
+
+        data = client.get(f'/api/tasks?status_id={done_id}').get_json()
+        assert [t['title'] for t in data] == ['Закрытая']
+
+    def test_tasks_compact_view(self, client):
+        """view=compact отдаёт облегчённые задачи без полных контактов."""
+        contact_id = client.post('/api/contacts', json={
+            'last_name': 'Компактный', 'phone': '+7', 'notes': 'длинные заметки'
+        }).get_json()['id']
+        client.post('/api/tasks', json={'title': 'Компакт', 'assignee_id': contact_id, 'tags': ['bi']})
+
+        data = client.get('/api/tasks?view=compact').get_json()
+        assert len(data) == 1
+        task = data[0]
+        assert task['assignee']['last_name'] == 'Компактный'
+        assert 'phone' not in task['assignee']
+        assert 'notes' not in task['assignee']
+        assert task['status']['name'] == 'К выполнению'
+        assert task['tags'] == [{'id': task['tags'][0]['id'], 'name': 'bi'}]
+        assert 'description' not in task
+
+        page = client.get('/api/tasks?fields=compact&limit=1').get_json()
+        assert page['items'][0]['id'] == task['id']
+
+        assert client.get('/api/tasks?view=huge').status_code == 400
+
+    def test_tasks_list_invalid_params(self, client):
+        assert client.get('/api/tasks?due_from=2025-13-01').status_code == 400
+        assert client.get('/api/tasks?assignee_id=abc').status_code == 400
+        assert client.get('/api/tasks?limit=10&cursor=garbage').status_code == 400
+
 
 # =========================================================================
 # Contacts API
@@ -377,6 +426,40 @@ class TestMeetingsAPI:
         assert response.status_code == 200
         assert isinstance(response.get_json(), list)
 
+    def test_meetings_list_is_summary_and_detail_is_full(self, client):
+        mid = client.post('/api/meetings', json={'date': '2025-06-15', 'agenda': 'Повестка'}).get_json()['id']
+        client.post(f'/api/meetings/{mid}/notes', json={'text': 'Заметка'})
+
+        [summary] = client.get('/api/meetings').get_json()
+        assert summary['meeting_notes_count'] == 1
+        assert 'meeting_notes' not in summary and 'agenda' not in summary
+
+        detail = client.get(f'/api/meetings/{mid}').get_json()
+        assert detail['agenda'] == 'Повестка'
+        assert [n['text'] for n in detail['meeting_notes']] == ['Заметка']
+
+    def test_meetings_pagination(self, client):
+        for day in ['2025-06-13', '2025-06-14', '2025-06-15']:
+            client.post('/api/meetings', json={'date': day})
+
+        first = client.get('/api/meetings?limit=2').get_json()
+        assert [m['date'] for m in first['items']] == ['2025-06-15', '2025-06-14']
+        assert first['has_more'] is True
+
+        second = client.get(f"/api/meetings?limit=2&cursor={first['next_cursor']}").get_json()
+        assert [m['date'] for m in second['items']] == ['2025-06-13']
+        assert second['has_more'] is False and second['next_cursor'] is None
+
+    def test_meetings_filters_and_bad_args(self, client):
+        client.post('/api/meetings', json={'date': '2025-06-10'})
+        client.post('/api/meetings', json={'date': '2025-06-20'})
+        data = client.get('/api/meetings?date_from=2025-06-15').get_json()
+        assert [m['date'] for m in data] == ['2025-06-20']
+
+        assert client.get('/api/meetings?date_to=вчера').status_code == 400
+        assert client.get('/api/meetings?type_id=abc').status_code == 400
+        assert client.get('/api/meetings?limit=2&cursor=мусор').status_code == 400
+
     def test_get_meeting_types(self, client):
         response = client.get('/api/meeting-types')
         assert response.status_code == 200
@@ -496,6 +579,12 @@ class TestDashboardAPI:
         assert 'top_projects' in data
         assert 'recent_activity' in data
 
+    def test_dashboard_reflects_quick_link_changes(self, client):
+        assert client.get('/api/dashboard').get_json()['quick_links'] == []
+        client.post('/api/quick-links', json={'title': 'Док', 'url': 'https://example.com'})
+        links = client.get('/api/dashboard').get_json()['quick_links']
+        assert [l['title'] for l in links] == ['Док']
+
     def test_search_empty(self, client):
         response = client.get('/api/search?q=test')
         assert response.status_code == 200
@@ -529,6 +618,16 @@ class TestDashboardAPI:
         data = response.get_json()
         assert 'generated_at' in data
 
+    def test_daily_standup_compact(self, client):
+        statuses = client.get('/api/task-statuses').get_json()
+        in_progress_id = next(s['id'] for s in statuses if s['name'] == 'В работе')
+        client.post('/api/tasks', json={'title': 'В процессе', 'status_id': in_progress_id})
+
+        data = client.get('/api/daily-standup?view=compact').get_json()
+        tasks = [data['tasks'][str(task_id)] for task_id in data['in_progress']]
+        assert [t['title'] for t in tasks] == ['В процессе']
+        assert 'description' not in tasks[0]
+
     def test_one_on_one_prep(self, client):
         response = client.get('/api/one-on-one-prep')
         assert response.status_code == 200
@@ -632,3 +731,166 @@ class TestReportsAPI:
         assert 'date_range' in data
         assert 'completed' in data
         assert 'in_progress' in data
+
+    def test_weekly_report_compact(self, client):
+        client.post('/api/tasks', json={'title': 'Новая', 'description': 'Текст'})
+        data = client.get('/api/reports/weekly?view=compact').get_json()
+        assert [t['title'] for t in data['created']] == ['Новая']
+        assert 'description' not in data['created'][0]
+
+
+# =========================================================================
+# Export API
+# =========================================================================
+
+class TestExportAPI:
+    """Тесты экспорта."""
+
+    def _seed(self, client):
+        client.post('/api/contacts', json={'last_name': 'Петров', 'first_name': 'Пётр'})
+        client.post('/api/projects', json={'title': 'Экспортный проект'})
+        for i in range(3):
+            client.post('/api/tasks', json={'title': f'Экспорт {i}', 'tags': ['отчёт']})
+
+    def test_export_json_is_streamed_and_valid(self, client):
+        import json
+        self._seed(client)
+        response = client.get('/api/export/json')
+        assert response.status_code == 200
+        assert response.is_streamed
+        data = json.loads(response.get_data(as_text=True))
+        assert data['version'] == '1.0'
+        assert sorted(t['title'] for t in data['tasks']) == ['Экспорт 0', 'Экспорт 1', 'Экспорт 2']
+        assert [p['title'] for p in data['projects']] == ['Экспортный проект']
+        assert data['comments'] == []
+
+    def test_export_ndjson(self, client):
+        import json
+        self._seed(client)
+        response = client.get('/api/export/ndjson')
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        lines = [json.loads(l) for l in response.get_data(as_text=True).splitlines()]
+        assert lines[0]['type'] == 'meta'
+        assert [l['data']['title'] for l in lines if l['type'] == 'tasks'] == ['Экспорт 0', 'Экспорт 1', 'Экспорт 2']
+        assert sum(1 for l in lines if l['type'] == 'contacts') == 1
+
+    def test_export_tasks_csv(self, client):
+        self._seed(client)
+        response = client.get('/api/export/tasks-csv')
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert 'Content-Encoding' not in response.headers
+        lines = response.get_data(as_text=True).lstrip('\ufeff').splitlines()
+        assert lines[0].startswith('ID;Название')
+        assert len(lines) == 4
+        assert 'отчёт' in lines[1]
+
+    def test_export_contacts_csv_gzip(self, client):
+        import gzip
+        self._seed(client)
+        response = client.get('/api/export/contacts-csv', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        text = gzip.decompress(response.get_data()).decode('utf-8')
+        assert text.startswith('\ufeffID;Фамилия')
+        assert 'Петров;Пётр' in text
+
+        plain = client.get('/api/export/contacts-csv?gzip=0', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in plain.headers
+
+
+class TestImportAPI:
+    """Тесты импорта (задачи выполняются сразу — IMPORT_JOBS_INLINE в conftest)."""
+
+    PAYLOAD = {
+        'version': '1.0',
+        'tags': [{'name': 'импорт'}],
+        'contacts': [{'id': 7, 'last_name': 'Орлов', 'first_name': 'Олег', 'tags': [{'name': 'импорт'}]}],
+        'projects': [{'id': 3, 'title': 'Загруженный'}],
+        'tasks': [{'title': 'Из файла', 'assignee_id': 7, 'project_id': 3, 'tags': [{'name': 'импорт'}]}],
+    }
+
+    def test_import_file_creates_job(self, client):
+        import io, json
+        data = {'file': (io.BytesIO(json.dumps(self.PAYLOAD, ensure_ascii=False).encode()), 'dump.json')}
+        response = client.post('/api/import/json', data=data, content_type='multipart/form-data')
+        assert response.status_code == 202
+        job = response.get_json()
+        assert job['status'] == 'done'
+        assert job['stats'] == {'tags': 1, 'contacts': 1, 'projects': 1, 'tasks': 1}
+
+        status = client.get(f"/api/import/jobs/{job['id']}").get_json()
+        assert status['status'] == 'done'
+        assert status['filename'] == 'dump.json'
+
+        task = client.get('/api/tasks').get_json()[0]
+        assert task['assignee']['last_name'] == 'Орлов'
+        assert task['project_title'] == 'Загруженный'
+
+    def test_export_roundtrip_ndjson(self, client):
+        client.post('/api/contacts', json={'last_name': 'Круг', 'first_name': 'Кира'})
+        client.post('/api/tasks', json={'title': 'Туда-обратно', 'tags': ['цикл']})
+        dump = client.get('/api/export/ndjson').get_data()
+        client.delete(f"/api/tasks/{client.get('/api/tasks').get_json()[0]['id']}")
+
+        response = client.post('/api/import/json?format=ndjson', data=dump,
+                               content_type='application/x-ndjson')
+        assert response.get_json()['stats']['tasks'] == 1
+        titles = [t['title'] for t in client.get('/api/tasks').get_json()]
+        assert titles == ['Туда-обратно']
+
+    def test_invalid_json_fails_job(self, client):
+        response = client.post('/api/import/json', data=b'{"tags": [oops', content_type='application/json')
+        assert response.status_code == 202
+        job = response.get_json()
+        assert job['status'] == 'failed'
+        assert job['error']
+
+    def test_empty_body_and_unknown_job(self, client):
+        assert client.post('/api/import/json', data=b'', content_type='application/json').status_code == 400
+        assert client.get('/api/import/jobs/999').status_code == 404
+
+
+# =========================================================================
+# Events API
+# =========================================================================
+
+class TestEventsAPI:
+    """Тесты потока изменений."""
+
+    def test_events_since_resumes_from_id(self, client):
+        from services.change_events import drain
+        drain(timeout=5)
+        start = client.get('/api/events/since').get_json()
+        assert start['events'] == [] and start['reset'] is False
+
+        client.post('/api/tasks', json={'title': 'Из потока'})
+        drain(timeout=5)
+        data = client.get(f"/api/events/since?last_event_id={start['last_event_id']}").get_json()
+        assert any(e['type'] == 'task' and e['data']['task']['title'] == 'Из потока' for e in data['events'])
+
+        again = client.get(f"/api/events/since?last_event_id={data['last_event_id']}").get_json()
+        assert again['events'] == []
+
+    def test_events_since_foreign_id_resets(self, client):
+        data = client.get('/api/events/since?last_event_id=0-1').get_json()
+        assert data['reset'] is True
+
+    def test_event_stream_replays_after_last_event_id(self, app, client, monkeypatch):
+        from services.change_events import drain
+        monkeypatch.setitem(app.config, 'EVENT_STREAM_MAX_AGE', 0.2)
+        drain(timeout=5)
+        start = client.get('/api/events/since').get_json()['last_event_id']
+        client.post('/api/tasks', json={'title': 'SSE'})
+        drain(timeout=5)
+
+        response = client.get('/api/events', headers={'Last-Event-ID': start})
+        assert response.mimetype == 'text/event-stream'
+        body = response.get_data(as_text=True)
+        assert body.startswith('retry: ')
+        assert 'event: task' in body and '"title":"SSE"' in body
+
+    def test_event_stream_new_client_gets_ready(self, app, client, monkeypatch):
+        monkeypatch.setitem(app.config, 'EVENT_STREAM_MAX_AGE', 0.1)
+        body = client.get('/api/events').get_data(as_text=True)
+        assert 'event: ready' in body
@@ -1,13 +1,14 @@
 """Unit-тесты для сервисов."""
+import re
 import pytest
 from core.models import (
     Task, TaskStatus, TaskComment, Contact, ContactType,
-    Project, Tag, FavoriteContact, Meeting, MeetingType
+    Project, Tag, FavoriteContact, Meeting, MeetingType, ActivityLog
 )
 from services.task_service import (
     create_task, get_all_tasks, get_task_by_id,
     update_task, delete_task, add_comment_to_task, delete_comment,
-    get_task_statuses
+    get_task_statuses, get_tasks_page
 )
 from services.contact_service import (
     create_contact, get_all_contacts, update_contact, delete_contact,
@@ -121,6 +122,52 @@ class TestTaskService:
         task = create_task({'title': 'Плохая дата', 'due_date': 'not-a-date'})
         assert task.due_date is None
 
+    def test_get_all_tasks_status_filter(self, db_session):
+        done = TaskStatus.query.filter_by(name='Готово').first()
+        create_task({'title': 'Открытая'})
+        create_task({'title': 'Закрытая', 'status_id': done.id})
+        tasks = get_all_tasks(status_filter=done.id)
+        assert [t.title for t in tasks] == ['Закрытая']
+
+    def test_get_tasks_page_walks_all_rows(self, db_session):
+        """Keyset-пагинация обходит все задачи без пропусков и дублей, включая задачи без срока."""
+        done = TaskStatus.query.filter_by(name='Готово').first()
+        for i in range(7):
+            create_task({'title': f'T{i}', 'due_date': f'2025-01-0{i % 3 + 1}' if i % 2 else None})
+        create_task({'title': 'Done', 'status_id': done.id, 'due_date': '2025-01-01'})
+
+        seen, cursor = [], None
+        while True:
+            page = get_tasks_page(cursor=cursor, limit=3)
+            seen.extend(t['id'] for t in page['items'])
+            if not page['has_more']:
+                break
+            cursor = page['next_cursor']
+
+        assert sorted(seen) == sorted(t.id for t in get_all_tasks())
+        assert seen == [t.id for t in get_all_tasks()]
+
+    def test_get_tasks_page_filters(self, db_session):
+        contact = Contact(last_name='Исполнитель')
+        db_session.add(contact)
+        db_session.commit()
+        create_task({'title': 'Моя', 'assignee_id': contact.id, 'tags': ['BI'], 'due_date': '2025-03-10'})
+        create_task({'title': 'Чужая', 'tags': ['BI'], 'due_date': '2025-03-20'})
+
+        page = get_tasks_page({'assignee_id': contact.id}, limit=10)
+        assert [t['title'] for t in page['items']] == ['Моя']
+
+        page = get_tasks_page({'tag': 'bi'}, limit=10)
+        assert len(page['items']) == 2
+
+        from datetime import date
+        page = get_tasks_page({'due_from': date(2025, 3, 15)}, limit=10)
+        assert [t['title'] for t in page['items']] == ['Чужая']
+
+    def test_get_tasks_page_invalid_cursor(self, db_session):
+        with pytest.raises(ValueError):
+            get_tasks_page(cursor='not-a-cursor')
+
 
 # =========================================================================
 # Contact Service
@@ -343,3 +390,1112 @@ class TestTagService:
         db_session.commit()
         assert len(tags) == 1
         assert tags[0].name == 'spaced'
+
+
+# =========================================================================
+# Serialization profiles
+# =========================================================================
+
+class TestSerializationProfiles:
+
+    @staticmethod
+    def _seed(db_session, n):
+        project = Project(title=f'Проект {n}')
+        db_session.add(project)
+        db_session.commit()
+        for i in range(n):
+            assignee = create_contact({'last_name': f'Исп{n}_{i}', 'tags': [f'c{i}']})
+            author = create_contact({'last_name': f'Авт{n}_{i}'})
+            create_task({
+                'title': f'T{n}_{i}', 'assignee_id': assignee.id, 'author_id': author.id,
+                'project_id': project.id, 'tags': [f't{i}', 'общий']
+            })
+        db_session.expunge_all()
+
+    def _list_and_serialize(self, db_session):
+        db_session.expunge_all()
+        [t.to_dict() for t in get_all_tasks()]
+
+    def test_list_query_count_is_constant(self, db_session, count_queries):
+        self._seed(db_session, 3)
+        small = count_queries(lambda: self._list_and_serialize(db_session))
+
+        self._seed(db_session, 12)
+        large = count_queries(lambda: self._list_and_serialize(db_session))
+
+        assert small == large
+
+    def test_unknown_profile(self, db_session):
+        from services.serialization import task_load_options
+        with pytest.raises(ValueError):
+            task_load_options('nope')
+
+    def test_load_by_ids_in_chunks(self, db_session, monkeypatch):
+        from services import serialization
+        ids = [create_task({'title': f'Пачка {i}'}).id for i in range(5)]
+        monkeypatch.setattr(serialization, 'ID_CHUNK_SIZE', 2)
+        loaded = serialization.load_tasks_by_ids(set(ids), 'compact')
+        assert sorted(loaded) == sorted(ids)
+        assert loaded[ids[0]]['title'] == 'Пачка 0'
+        assert serialization.load_tasks_by_ids([]) == {}
+
+
+# =========================================================================
+# Report Service
+# =========================================================================
+
+class TestReportService:
+
+    def test_project_breakdown_counts(self, db_session, status_id):
+        from services.report_service import get_project_breakdown
+        p = create_project({'title': 'Отчётный'})
+        create_project({'title': 'Архив', 'status': 'Archived'})
+        create_task({'title': 'A', 'project_id': p.id, 'status_id': status_id('Готово')})
+        create_task({'title': 'B', 'project_id': p.id, 'status_id': status_id('В работе')})
+        create_task({'title': 'C', 'project_id': p.id})
+
+        result = get_project_breakdown()
+        assert result == [{
+            'project_id': p.id, 'project_title': 'Отчётный', 'total': 3,
+            'completed': 1, 'in_progress': 1, 'todo': 1, 'progress': 33
+        }]
+
+    def test_team_workload_counts(self, db_session, status_id):
+        from datetime import datetime, timedelta
+        from services.report_service import get_team_workload
+        c = create_contact({'last_name': 'Нагруженный'})
+        create_task({'title': 'A1', 'assignee_id': c.id})
+        create_task({'title': 'A2', 'assignee_id': c.id})
+        done = create_task({'title': 'D', 'assignee_id': c.id})
+        update_task(done.id, {'status_id': status_id('Готово')})
+
+        now = datetime.now()
+        result = get_team_workload(now - timedelta(days=1), now + timedelta(days=1))
+        assert len(result) == 1
+        assert result[0]['contact']['last_name'] == 'Нагруженный'
+        assert result[0]['completed_count'] == 1
+        assert result[0]['active_count'] == 2
+
+    def test_stuck_tasks(self, db_session, status_id):
+        from datetime import datetime, timedelta
+        from services.report_service import get_blockers_and_risks
+        stuck = create_task({'title': 'Застряла', 'status_id': status_id('В работе')})
+        moved = create_task({'title': 'Сдвинулась', 'status_id': status_id('Готово')})
+        old = datetime.now() - timedelta(days=10)
+        for t in (stuck, moved):
+            db_session.add(ActivityLog(entity_type='task', entity_id=t.id, event_type='update',
+                                       field_name='Статус', new_value='В работе', created_at=old))
+        db_session.commit()
+
+        result = get_blockers_and_risks()
+        assert [t['title'] for t in result['stuck']] == ['Застряла']
+
+    def test_weekly_report_query_count_is_constant(self, db_session, count_queries, status_id):
+        from services.report_service import get_weekly_report_data
+
+        def seed(n):
+            p = create_project({'title': f'P{n}'})
+            for i in range(n):
+                c = create_contact({'last_name': f'C{n}_{i}'})
+                create_task({'title': f'T{n}_{i}', 'project_id': p.id, 'assignee_id': c.id,
+                             'status_id': status_id('В работе'), 'due_date': '2020-01-01'})
+            db_session.expunge_all()
+
+        seed(2)
+        get_weekly_report_data()  # прогрев кэша справочников
+        small = count_queries(get_weekly_report_data)
+        seed(10)
+        large = count_queries(get_weekly_report_data)
+        assert small == large
+
+
+# =========================================================================
+# Lookup registry
+# =========================================================================
+
+class TestLookupService:
+
+    def test_status_id_resolves_from_memory(self, db_session, count_queries):
+        from services.lookup_service import status_id
+        expected = TaskStatus.query.filter_by(name='Готово').first().id
+        assert status_id('Готово') == expected
+        queries = count_queries(lambda: status_id('Готово'))
+        assert queries == 0
+
+    def test_missing_name_returns_default(self, db_session):
+        from services.lookup_service import status_id, contact_type_id
+        assert status_id('Нет такого') is None
+        assert contact_type_id('Нет такого', -1) == -1
+
+    def test_invalidated_on_change(self, db_session):
+        from services.lookup_service import status_id, meeting_type_id
+        assert status_id('Архив') is None
+        db_session.add(TaskStatus(name='Архив'))
+        db_session.commit()
+        assert status_id('Архив') is not None
+
+        mt = MeetingType.query.filter_by(name='1-1').first()
+        assert meeting_type_id('1-1') == mt.id
+        mt.name = 'One-on-one'
+        db_session.commit()
+        assert meeting_type_id('1-1') is None
+        assert meeting_type_id('One-on-one') == mt.id
+
+    def test_rolled_back_rows_not_cached(self, db_session, count_queries):
+        from services.lookup_service import status_id, invalidate
+        invalidate()
+        db_session.add(TaskStatus(name='Черновая'))
+        db_session.flush()
+        assert status_id('Черновая') is not None  # своя транзакция строку видит
+        db_session.rollback()
+        assert status_id('Черновая') is None
+
+        status_id('Готово')
+        db_session.add(TaskStatus(name='Черновая'))
+        db_session.flush()
+        db_session.rollback()
+        queries = count_queries(lambda: status_id('Готово'))
+        assert queries == 0  # откат не сбрасывает кэш
+
+
+class TestDashboardCache:
+
+    def test_snapshot_served_from_memory(self, db_session, count_queries):
+        from services.dashboard_cache import get_dashboard_snapshot
+        create_task({'title': 'Срочная задача'})
+        first = get_dashboard_snapshot()
+        assert [t['title'] for t in first['priority_tasks']] == ['Срочная задача']
+
+        queries = count_queries(get_dashboard_snapshot)
+        assert queries == 0
+
+    def test_task_write_invalidates_task_sections_only(self, db_session):
+        from services import dashboard_cache
+        dashboard_cache.get_dashboard_snapshot()
+        t = create_task({'title': 'Новая'})
+        assert 'priority_tasks' not in dashboard_cache._snapshot
+        assert 'quick_links' in dashboard_cache._snapshot
+
+        snapshot = dashboard_cache.get_dashboard_snapshot()
+        assert [x['id'] for x in snapshot['priority_tasks']] == [t.id]
+
+    def test_rollback_does_not_invalidate(self, db_session):
+        from services import dashboard_cache
+        dashboard_cache.get_dashboard_snapshot()
+        db_session.add(Task(title='Откатится', status_id=TaskStatus.query.first().id))
+        db_session.flush()
+        db_session.rollback()
+        assert 'priority_tasks' in dashboard_cache._snapshot
+
+    def test_status_recolour_refreshes_task_sections(self, db_session):
+        from services.dashboard_cache import get_dashboard_snapshot
+        t = create_task({'title': 'Срочная задача'})
+        get_dashboard_snapshot()
+        t.status.color = '#123456'
+        db_session.commit()
+        snapshot = get_dashboard_snapshot()
+        assert snapshot['priority_tasks'][0]['status']['color'] == '#123456'
+
+
+class TestEntityResolver:
+
+    def test_resolves_mixed_refs_one_query_per_type(self, db_session, count_queries):
+        from services.entity_resolver import resolve_entities
+        tasks = [create_task({'title': f'Задача {i}'}) for i in range(5)]
+        project = create_project({'title': 'Проект'})
+        contact = create_contact({'last_name': 'Иванов', 'first_name': 'Иван'})
+        refs = [('task', t.id) for t in tasks] + [('project', project.id), ('contact', contact.id),
+                                                  ('task', 999999), ('meeting', 1)]
+
+        result = {}
+        queries = count_queries(lambda: result.update(resolve_entities(refs)))
+        assert queries == 3
+
+        assert result[('task', tasks[0].id)]['status_name'] == 'К выполнению'
+        assert result[('project', project.id)]['title'] == 'Проект'
+        assert result[('contact', contact.id)]['title'] == 'Иванов Иван'
+        assert ('task', 999999) not in result
+        assert ('meeting', 1) not in result
+
+    def test_recent_activity_uses_titles(self, db_session):
+        from services.dashboard_service import get_recent_activity
+        t = create_task({'title': 'Записанная'})
+        feed = get_recent_activity()
+        assert feed[0]['entity_id'] == t.id
+        assert feed[0]['entity_title'] == 'Записанная'
+
+
+class TestBulkImport:
+
+    @staticmethod
+    def _payload(n, prefix='Импорт'):
+        return {
+            'tags': [{'name': 'импорт'}, {'name': 'срочно'}, {'name': 'импорт'}],
+            'contacts': [
+                {'id': 10, 'last_name': 'Сидоров', 'first_name': 'Сидор',
+                 'type': {'name_type': 'Моя команда'}, 'tags': [{'name': 'импорт'}]},
+                {'id': 11, 'last_name': 'Сидоров', 'first_name': 'Сидор'},
+            ],
+            'projects': [{'id': 20, 'title': 'Импортный проект'}],
+            'tasks': [
+                {'title': f'{prefix} {i}', 'status': {'name': 'В работе'}, 'due_date': '2030-01-02',
+                 'assignee_id': 11, 'project_id': 20, 'tags': [{'name': 'импорт'}, {'name': 'срочно'}]}
+                for i in range(n)
+            ],
+        }
+
+    def test_import_creates_rows_and_links(self, db_session):
+        from services.export_service import import_from_json
+        stats = import_from_json(self._payload(3))
+        assert stats == {'tags': 2, 'contacts': 1, 'projects': 1, 'tasks': 3}
+
+        contact = Contact.query.filter_by(last_name='Сидоров').one()
+        assert [t.name for t in contact.tags] == ['импорт']
+        assert contact.contact_type.name_type == 'Моя команда'
+
+        task = Task.query.filter_by(title='Импорт 0').one()
+        assert task.status.name == 'В работе'
+        assert task.assignee_id == contact.id
+        assert task.project.title == 'Импортный проект'
+        assert sorted(t.name for t in task.tags) == ['импорт', 'срочно']
+
+    def test_reimport_skips_existing(self, db_session):
+        from services.export_service import import_from_json
+        import_from_json(self._payload(2))
+        stats = import_from_json(self._payload(3))
+        assert stats == {'tags': 0, 'contacts': 0, 'projects': 0, 'tasks': 1}
+        # Ссылка на уже существующий контакт разрешается
+        task = Task.query.filter_by(title='Импорт 2').one()
+        assert task.assignee.last_name == 'Сидоров'
+
+    def test_query_count_does_not_grow_with_rows(self, db_session, count_queries):
+        from services.import_service import bulk_import
+        small = count_queries(lambda: bulk_import(self._payload(5, 'Мало')))
+        large = count_queries(lambda: bulk_import(self._payload(300, 'Много')))
+        # executemany-пачки считаются одним вызовом курсора
+        assert large <= small + 2
+
+    def test_progress_reported(self, db_session):
+        from services.import_service import bulk_import
+        events = []
+        bulk_import(self._payload(2), progress=lambda stage, done, total: events.append((stage, done, total)))
+        assert ('tasks', 2, 2) in events
+        assert events[0] == ('tags', 0, 3)
+
+
+class TestImportJobs:
+
+    def test_interrupted_jobs_fail_on_startup(self, db_session):
+        import io
+        import os
+        from core.models import ImportJob
+        from services.import_jobs import save_upload, fail_interrupted_jobs, INTERRUPTED_ERROR
+        path = save_upload(io.BytesIO(b'{"tags": []}'))
+        running = ImportJob(filename='dump.json', status='running', upload_path=path)
+        pending = ImportJob(filename='next.json', status='pending')
+        done = ImportJob(filename='old.json', status='done')
+        db_session.add_all([running, pending, done])
+        db_session.commit()
+
+        assert fail_interrupted_jobs() == 2
+        assert not os.path.exists(path)
+        assert (running.status, running.error, running.upload_path) == ('failed', INTERRUPTED_ERROR, None)
+        assert running.finished_at is not None
+        assert pending.status == 'failed'
+        assert done.status == 'done'
+        assert fail_interrupted_jobs() == 0
+
+    def test_failed_start_fails_job_and_removes_upload(self, db_session, monkeypatch):
+        import io
+        import os
+        from core.models import ImportJob
+        from services.import_jobs import save_upload, start_import_job
+        path = save_upload(io.BytesIO(b'{"tags": []}'))
+        real_commit = db_session.commit
+        calls = []
+
+        def locked_once():
+            calls.append(1)
+            if len(calls) == 2:  # первый — создание задачи, второй — статус running
+                raise RuntimeError('database is locked')
+            real_commit()
+
+        monkeypatch.setattr(db_session, 'commit', locked_once)
+        job = start_import_job(path, 'dump.json')
+        monkeypatch.undo()
+
+        job = db_session.get(ImportJob, job.id)
+        assert (job.status, job.error, job.upload_path) == ('failed', 'database is locked', None)
+        assert not os.path.exists(path)
+
+
+class TestFtsSearch:
+
+    def test_single_query_with_highlight_and_snippet(self, db_session, count_queries):
+        from services.search_service import fts_search
+        create_task({'title': 'Подготовить бюджет', 'description': 'Свести бюджет отдела на квартал'})
+        create_task({'title': 'Созвон', 'description': 'Обсудить бюджет'})
+        create_contact({'last_name': 'Бюджетов', 'role': 'Финансист'})
+        create_project({'title': 'Бюджет 2027'})
+
+        result = {}
+        queries = count_queries(lambda: result.update(fts_search('бюджет')))
+        assert queries == 1
+
+        titles = [h['title'] for h in result['tasks']]
+        assert titles[0] == 'Подготовить бюджет'
+        assert set(titles) == {'Подготовить бюджет', 'Созвон'}
+        hit = result['tasks'][0]
+        assert hit['highlight'] == 'Подготовить <mark>бюджет</mark>'
+        assert '<mark>' in hit['snippet']
+        assert hit['status']['name'] == 'К выполнению'
+        assert 'assignee' not in hit
+
+        assert result['contacts'][0]['last_name'] == 'Бюджетов'
+        assert result['contacts'][0]['role'] == 'Финансист'
+        assert result['projects'][0]['highlight'] == '<mark>Бюджет</mark> 2027'
+
+    def test_quotes_in_query(self, db_session):
+        from services.search_service import fts_search
+        create_task({'title': 'Договор "Ромашка"'})
+        result = fts_search('"Ромашка')
+        assert [h['title'] for h in result['tasks']] == ['Договор "Ромашка"']
+
+
+class TestFtsMaintenance:
+
+    def test_startup_skips_rebuild_when_consistent(self, db_session):
+        from services.search_service import ensure_fts_index, fts_stale_tables
+        create_task({'title': 'Индексируемая'})
+        assert fts_stale_tables() == []
+        assert ensure_fts_index() == []
+
+    def test_detects_and_repairs_drift(self, db_session):
+        from services.search_service import ensure_fts_index, fts_stale_tables, fts_search
+        from core.database import db
+        create_task({'title': 'Потерянная'})
+        # Запись в обход триггеров: индексы задач расходятся с таблицей
+        task_indexes = ['tasks_fts', 'tasks_fts_stem', 'tasks_fts_tri']
+        for table in task_indexes:
+            db.session.execute(db.text(f"INSERT INTO {table}({table}) VALUES ('delete-all')"))
+        db.session.commit()
+        assert fts_stale_tables() == task_indexes
+        assert fts_search('Потерянная')['tasks'] == []
+
+        assert ensure_fts_index() == task_indexes
+        assert [h['title'] for h in fts_search('Потерянная')['tasks']] == ['Потерянная']
+
+    def test_update_trigger_limited_to_indexed_columns(self, db_session):
+        from core.database import db
+        sql = db.session.execute(db.text("SELECT sql FROM sqlite_master WHERE name = 'tasks_au'")).scalar()
+        assert 'AFTER UPDATE OF title, description, title_stem, description_stem ON tasks' in sql
+
+    def test_schema_version_change_rebuilds_all(self, db_session, monkeypatch):
+        from services import search_service
+        monkeypatch.setattr(search_service, 'FTS_SCHEMA_VERSION', search_service.FTS_SCHEMA_VERSION + 1)
+        assert search_service.fts_stale_tables() == list(search_service.FTS_TABLES)
+        assert search_service.ensure_fts_index() == list(search_service.FTS_TABLES)
+        assert search_service.fts_stale_tables() == []
+
+    def test_optimize_and_merge(self, db_session):
+        from services.search_service import optimize_fts_index, merge_fts_index, fts_search
+        create_task({'title': 'Сегмент'})
+        optimize_fts_index()
+        merge_fts_index(16)
+        assert len(fts_search('Сегмент')['tasks']) == 1
+
+
+class TestFtsMeetingsAndComments:
+
+    def test_new_sources_in_single_query(self, db_session, count_queries):
+        from services.search_service import fts_search, SEARCH_RESULT_KEYS
+        from services.meeting_service import create_meeting, add_note, add_action_item
+        m = create_meeting({'title': 'Планёрка', 'agenda': 'Согласовать миграцию'})
+        note = add_note(m.id, {'text': 'Решили делать миграцию в выходные'})
+        item = add_action_item(m.id, {'text': 'Подготовить план миграции'})
+        t = create_task({'title': 'Перенос базы'})
+        comment = add_comment_to_task(t.id, 'Миграция блокирует релиз')
+
+        result = {}
+        queries = count_queries(lambda: result.update(fts_search('миграц')))
+        assert queries == 1
+        assert set(result) == set(SEARCH_RESULT_KEYS)
+
+        assert [h['id'] for h in result['meetings']] == [m.id]
+        assert result['meeting_notes'][0]['id'] == note.id
+        assert result['meeting_notes'][0]['parent'] == {'type': 'meeting', 'id': m.id, 'title': 'Планёрка'}
+        assert result['action_items'][0]['id'] == item.id
+        assert result['comments'][0]['parent'] == {'type': 'task', 'id': t.id, 'title': 'Перенос базы'}
+        assert '<mark>Миграция</mark>' in result['comments'][0]['snippet']
+
+    def test_triggers_follow_updates_and_deletes(self, db_session):
+        from services.search_service import fts_search
+        t = create_task({'title': 'Задача'})
+        comment = add_comment_to_task(t.id, 'черновик')
+        assert len(fts_search('черновик')['comments']) == 1
+        delete_comment(comment.id)
+        assert fts_search('черновик')['comments'] == []
+
+
+class TestStemmer:
+
+    def test_russian_inflections_share_stem(self):
+        from core.stemmer import stem_word
+        assert {stem_word(w) for w in ('задача', 'задачи', 'задачу', 'задачами')} == {'задач'}
+        assert stem_word('Встречу') == stem_word('встреча') == 'встреч'
+        assert stem_word('ёлка') == 'елк'
+
+    def test_english_and_other_tokens(self):
+        from core.stemmer import stem_word, stem_text
+        assert stem_word('running') == stem_word('runs') == 'run'
+        assert stem_word('connection') == 'connect'
+        assert stem_word('2027') == '2027'
+        assert stem_text('Задачи, tasks!') == 'задач task'
+        assert stem_text(None) is None
+
+
+class TestFtsTokenizers:
+
+    def test_inflected_query_finds_other_forms(self, db_session):
+        from services.search_service import fts_search
+        create_task({'title': 'Согласовать задачу с подрядчиком'})
+        result = fts_search('задачи')
+        assert [h['title'] for h in result['tasks']] == ['Согласовать задачу с подрядчиком']
+        assert result['tasks'][0]['highlight'] == 'Согласовать <mark>задачу</mark> с подрядчиком'
+
+    def test_infix_match_via_trigram(self, db_session):
+        from services.search_service import fts_search
+        create_task({'title': 'Телеграмма партнёрам'})
+        result = fts_search('грамм')
+        assert [h['title'] for h in result['tasks']] == ['Телеграмма партнёрам']
+        assert result['tasks'][0]['highlight'] == '<mark>Телеграмма</mark> партнёрам'
+        # Подстроки короче трёх символов trigram-индекс не ищет
+        assert fts_search('ле')['tasks'] == []
+
+    def test_stem_columns_follow_updates(self, db_session):
+        from services.search_service import fts_search
+        t = create_task({'title': 'Черновик', 'description': 'Проверить отчёты'})
+        assert t.title_stem == 'черновик'
+        assert t.description_stem == 'провер отчет'
+
+        update_task(t.id, {'title': 'Согласовать договоры'})
+        assert t.title_stem == 'согласова договор'
+        assert [h['id'] for h in fts_search('договору')['tasks']] == [t.id]
+        assert fts_search('черновика')['tasks'] == []
+
+    def test_plain_connection_can_write_indexed_tables(self, db_session):
+        # Триггеры FTS — чистый SQL: писать можно соединением без функций приложения
+        import sqlite3
+        from core.database import db
+        from services.search_service import fts_search
+        t = create_task({'title': 'Регламент закупок'})
+        task_id = t.id
+        conn = sqlite3.connect(db.engine.url.database)
+        try:
+            conn.execute("UPDATE tasks SET description = 'правки' WHERE id = ?", (task_id,))
+            conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+            conn.commit()
+        finally:
+            conn.close()
+        db.session.expire_all()
+        assert fts_search('регламент')['tasks'] == []
+
+    def test_blended_rank_prefers_word_matches(self, db_session):
+        from services.search_service import fts_search
+        create_task({'title': 'Микросервисы платформы'})
+        create_task({'title': 'Сервисы платформы'})
+        titles = [h['title'] for h in fts_search('сервисы')['tasks']]
+        assert titles == ['Сервисы платформы', 'Микросервисы платформы']
+
+    def test_global_search_has_no_scan_fallback(self, db_session, monkeypatch):
+        from services import search_service
+        from services.dashboard_service import global_search
+
+        def broken(query_str, limit=10):
+            raise RuntimeError('FTS недоступен')
+
+        monkeypatch.setattr(search_service, 'fts_search', broken)
+        with pytest.raises(RuntimeError):
+            global_search('задача')
+
+
+class TestTagIndex:
+
+    def test_trie_prefix_and_word_search_sorted(self):
+        from services.tag_index import TagTrie
+        trie = TagTrie()
+        # Как в TagIndex: теги вставляются в порядке имени
+        for tag_id, key in [(3, 'альфа'), (4, 'бэклог'), (2, 'продажи'), (1, 'проект-альфа')]:
+            trie.insert(key, tag_id)
+            if '-' in key:
+                trie.insert(key.split('-', 1)[1], tag_id)
+        trie.freeze()
+        assert trie.search('про') == [2, 1]
+        assert trie.search('аль') == [3, 1]
+        assert trie.search('про', limit=1) == [2]
+        assert trie.search('х') == []
+
+    def test_search_by_tag_uses_postings(self, db_session):
+        from services.dashboard_service import search_by_tag
+        project = create_project({'title': 'Портал'})
+        t1 = create_task({'title': 'Задача 1', 'tags': ['бэкенд'], 'project_id': project.id})
+        t2 = create_task({'title': 'Задача 2', 'tags': ['бэкенд-api']})
+        create_task({'title': 'Задача 3', 'tags': ['фронтенд']})
+        contact = create_contact({'last_name': 'Иванов', 'tags': ['бэкенд']})
+
+        result = search_by_tag('бэк')
+        assert [t['name'] for t in result['tag_suggestions']] == ['бэкенд', 'бэкенд-api']
+        assert [t['id'] for t in result['tasks']] == [t1.id, t2.id]
+        assert [c['id'] for c in result['contacts']] == [contact.id]
+        assert [p['id'] for p in result['projects']] == [project.id]
+        # Слово внутри имени тега тоже находится
+        assert [t['id'] for t in search_by_tag('api')['tasks']] == [t2.id]
+
+    def test_index_answers_without_tag_scans(self, db_session, count_queries):
+        from services.dashboard_service import search_by_tag
+        create_task({'title': 'Задача', 'tags': ['отчёт']})
+        search_by_tag('отч')  # строит индекс
+        queries = count_queries(lambda: search_by_tag('zzz'))
+        assert queries == 0
+
+    def test_index_invalidated_on_commit(self, db_session):
+        from services.dashboard_service import search_by_tag
+        t = create_task({'title': 'Задача', 'tags': ['старый']})
+        assert len(search_by_tag('стар')['tasks']) == 1
+
+        update_task(t.id, {'tags': ['новый']})
+        assert search_by_tag('стар')['tasks'] == []
+        assert [x['id'] for x in search_by_tag('нов')['tasks']] == [t.id]
+        assert [x['name'] for x in search_by_tag('')['tag_suggestions']] == ['новый', 'старый']
+
+    def test_links_updated_in_place(self, db_session):
+        from services.dashboard_service import search_by_tag
+        from services.tag_index import get_tag_index
+        p1, p2 = create_project({'title': 'Первый'}), create_project({'title': 'Второй'})
+        t1 = create_task({'title': 'Задача 1', 'tags': ['релиз', 'qa'], 'project_id': p1.id})
+        t2 = create_task({'title': 'Задача 2', 'tags': ['релиз'], 'project_id': p1.id})
+        contact = create_contact({'last_name': 'Иванов', 'tags': ['qa']})
+        index = get_tag_index()
+
+        update_task(t1.id, {'tags': ['qa'], 'project_id': p2.id})
+        update_contact(contact.id, {'tags': ['релиз']})
+        result = search_by_tag('рел')
+        assert get_tag_index() is index
+        assert [t['id'] for t in result['tasks']] == [t2.id]
+        assert [p['id'] for p in result['projects']] == [p1.id]
+        assert [c['id'] for c in result['contacts']] == [contact.id]
+        assert [p['id'] for p in search_by_tag('qa')['projects']] == [p2.id]
+
+        delete_task(t2.id)
+        assert search_by_tag('рел')['projects'] == []
+        assert get_tag_index() is index
+
+        # Новый тег меняет дерево имён — индекс строится заново
+        update_task(t1.id, {'tags': ['qa', 'хотфикс']})
+        assert get_tag_index() is not index
+        assert [t['id'] for t in search_by_tag('хот')['tasks']] == [t1.id]
+
+
+class TestCaseFolding:
+
+    def test_folded_columns_maintained_on_write(self, db_session):
+        c = create_contact({'last_name': 'ЯКОВЛЕВ', 'first_name': 'Ёжик'})
+        assert (c.last_name_folded, c.first_name_folded) == ('яковлев', 'ёжик')
+        update_contact(c.id, {'last_name': 'Абрамов'})
+        db_session.refresh(c)
+        assert c.last_name_folded == 'абрамов'
+
+    def test_core_bulk_insert_fills_folded(self, db_session):
+        from services.import_service import bulk_import
+        bulk_import({'tags': [{'name': 'Срочно'}], 'contacts': [{'id': 1, 'last_name': 'ПЕТРОВ'}]})
+        assert Tag.query.filter_by(name='Срочно').one().name_folded == 'срочно'
+        assert Contact.query.filter_by(last_name='ПЕТРОВ').one().last_name_folded == 'петров'
+
+    def test_contacts_sorted_case_insensitively_via_index(self, db_session):
+        from core.database import db
+        for name in ('борисов', 'Андреев', 'Вязов'):
+            create_contact({'last_name': name})
+        assert [c.last_name for c in get_all_contacts()] == ['Андреев', 'борисов', 'Вязов']
+
+        plan = db.session.execute(db.text(
+            "EXPLAIN QUERY PLAN SELECT id FROM contacts ORDER BY last_name_folded, first_name_folded"
+        )).all()
+        assert any('ix_contacts_name_folded' in row[-1] for row in plan)
+
+    def test_tag_lookup_ignores_case(self, db_session):
+        from services.tag_service import create_tag, process_tags
+        tag = create_tag('Отчёт')
+        assert process_tags(['ОТЧЁТ']) == [tag]
+
+    def test_migration_backfills_existing_rows(self, db_session):
+        from core.migrations import MIGRATIONS, build_indexes
+        from sqlalchemy import inspect
+        from core.database import db
+        create_contact({'last_name': 'Смирнов'})
+        db.session.execute(db.text("DROP INDEX ix_contacts_name_folded"))
+        db.session.execute(db.text("ALTER TABLE contacts DROP COLUMN last_name_folded"))
+        db.session.commit()
+
+        folded_migration = next(fn for version, _, fn in MIGRATIONS if version == 2)
+        folded_migration()
+        build_indexes()
+        assert db.session.execute(db.text("SELECT last_name_folded FROM contacts")).scalar() == 'смирнов'
+        assert 'ix_contacts_name_folded' in {i['name'] for i in inspect(db.engine).get_indexes('contacts')}
+
+
+class TestSqliteProfile:
+
+    def test_profile_applied_on_connect(self, db_session):
+        from core.database import db
+        from core.config import Config
+        profile = Config.SQLITE_PROFILES['performance']
+
+        def pragma(name):
+            return db.session.execute(db.text(f"PRAGMA {name}")).scalar()
+
+        assert pragma('foreign_keys') == 1
+        assert pragma('cache_size') == profile['cache_size']
+        assert pragma('busy_timeout') == profile['busy_timeout']
+        assert pragma('temp_store') == 2      # MEMORY
+        assert pragma('synchronous') == 1     # NORMAL
+
+    def test_wal_file_db_and_consistent_backup(self, tmp_path):
+        import sqlite3
+        from core.config import Config
+        from core.database import apply_sqlite_pragmas
+        from services.backup_service import copy_database
+        db_path = str(tmp_path / 'kbase.db')
+        conn = sqlite3.connect(db_path)
+        apply_sqlite_pragmas(conn, Config.SQLITE_PROFILES['performance'])
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        conn.execute("PRAGMA wal_autocheckpoint=0")
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+        conn.commit()
+
+        # Данные ещё только в -wal: копия файла БД их бы не содержала
+        backup_path = str(tmp_path / 'backup.db')
+        copy_database(db_path, backup_path)
+        conn.close()
+        backup = sqlite3.connect(backup_path)
+        assert backup.execute("SELECT x FROM t").fetchall() == [(1,)]
+        backup.close()
+
+
+class TestQueryPlans:
+    """EXPLAIN QUERY PLAN для горячих запросов: ни одна большая таблица не читается полным сканом."""
+
+    # Полный скан таблицы без индекса: "SCAN tasks" (но не "SCAN tasks USING INDEX ...")
+    _FULL_SCAN = re.compile(
+        r'SCAN (tasks|activity_logs|meetings|task_comments|meeting_notes|meeting_action_items'
+        r'|task_tags|contact_tags)\b(?! USING)'
+    )
+
+    @staticmethod
+    def _hot_calls():
+        from datetime import date
+        from services import dashboard_service, report_service, activity_service, meeting_service, task_service
+        return {
+            'priority_tasks': dashboard_service.get_priority_tasks,
+            'waiting_tasks': dashboard_service.get_waiting_tasks,
+            'top_projects': dashboard_service.get_top_projects_data,
+            'recent_activity': dashboard_service.get_recent_activity,
+            'standup': dashboard_service.get_daily_standup_data,
+            'one_on_one': dashboard_service.get_one_on_one_prep_data,
+            'blockers': report_service.get_blockers_and_risks,
+            'weekly_report': report_service.get_weekly_report_data,
+            'activity_log': lambda: activity_service.get_activity_log('task', 1),
+            'upcoming_meetings': meeting_service.get_upcoming_meetings,
+            'tasks_by_assignee': lambda: task_service.get_tasks_page({'assignee_id': 1}),
+            'tasks_by_project': lambda: task_service.get_tasks_page({'project_id': 1}),
+            'tasks_due_range': lambda: task_service.get_tasks_page({'due_from': date.today()}),
+        }
+
+    def test_hot_queries_use_indexes(self, db_session):
+        from sqlalchemy import event
+        from core.database import db
+        from services.contact_service import set_self, toggle_team
+        me = create_contact({'last_name': 'Я'})
+        set_self(me.id)
+        toggle_team(create_contact({'last_name': 'Коллега'}).id)
+        create_task({'title': 'Задача', 'assignee_id': me.id})
+
+        statements = []
+
+        def record(conn, cursor, statement, params, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT') and not executemany:
+                statements.append((statement, params))
+
+        offenders = []
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            for name, call in self._hot_calls().items():
+                statements.clear()
+                call()
+                assert statements, name
+                for sql, params in list(statements):
+                    plan = db.session.connection().exec_driver_sql('EXPLAIN QUERY PLAN ' + sql, params).all()
+                    offenders += [(name, row[-1]) for row in plan if self._FULL_SCAN.search(row[-1])]
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        assert offenders == []
+
+    def test_partial_due_date_index(self, db_session):
+        from datetime import date
+        from core.database import db
+        plan = db.session.execute(db.text(
+            "EXPLAIN QUERY PLAN SELECT id FROM tasks WHERE due_date < :today ORDER BY due_date"
+        ), {'today': date.today()}).all()
+        assert any('ix_tasks_due_date' in row[-1] for row in plan)
+
+
+
+class TestMigrations:
+
+    def test_up_to_date_startup_is_single_query(self, db_session, count_queries):
+        from core.migrations import migrate, current_version, latest_version
+        assert current_version() == latest_version()
+        queries = count_queries(migrate)
+        assert queries == 1
+
+    def test_legacy_database_is_upgraded(self, db_session):
+        from sqlalchemy import inspect
+        from core.database import db
+        from core.migrations import migrate, current_version, latest_version, MIGRATIONS
+        # БД до появления миграций: нет schema_version, нет поздних колонок и индексов
+        db.session.execute(db.text("DROP TABLE schema_version"))
+        db.session.execute(db.text("DROP INDEX ix_tasks_status_due"))
+        db.session.execute(db.text("ALTER TABLE contacts DROP COLUMN is_team"))
+        db.session.commit()
+        assert current_version() is None
+
+        assert migrate() == [version for version, _, _ in MIGRATIONS]
+        assert current_version() == latest_version()
+        assert 'is_team' in {c['name'] for c in inspect(db.engine).get_columns('contacts')}
+        assert 'ix_tasks_status_due' in {i['name'] for i in inspect(db.engine).get_indexes('tasks')}
+        assert migrate() == []
+
+    def test_backfill_commits_in_batches(self, db_session, monkeypatch):
+        from core.database import db
+        from core.migrations import backfill
+        for i in range(5):
+            create_contact({'last_name': f'Контакт{i}'})
+        commits = []
+        monkeypatch.setattr(db.session, 'commit', lambda: commits.append(1))
+        assert backfill('contacts', 'last_name_folded', 'last_name', lambda v: v.upper(), batch_size=2) == 5
+        assert len(commits) == 3
+
+    def test_versions_must_be_ordered(self):
+        from core.migrations import migration, latest_version
+        with pytest.raises(ValueError):
+            migration(latest_version(), 'дубликат')(lambda: None)
+
+
+class TestDailyStandup:
+
+    def test_tasks_serialized_once_and_referenced_by_id(self, db_session, status_id):
+        from datetime import date, timedelta
+        from services.dashboard_service import get_daily_standup_data
+        me = create_contact({'last_name': 'Я'})
+        set_self(me.id)
+        mate = create_contact({'last_name': 'Коллега'})
+        toggle_team(mate.id)
+
+        yesterday = (date.today() - timedelta(days=1)).isoformat()
+        overdue = create_task({'title': 'Просрочена', 'assignee_id': me.id,
+                               'status_id': status_id('В работе'), 'due_date': yesterday})
+        today = create_task({'title': 'Сегодня', 'assignee_id': mate.id, 'due_date': date.today().isoformat()})
+        waiting = create_task({'title': 'Жду', 'status_id': status_id('Жду ответа')})
+        done = create_task({'title': 'Сделана', 'assignee_id': me.id, 'status_id': status_id('В работе')})
+        update_task(done.id, {'status_id': status_id('Готово')})
+        create_task({'title': 'Без дедлайна'})
+
+        data = get_daily_standup_data()
+        assert sorted(data['tasks']) == sorted([overdue.id, today.id, waiting.id, done.id])
+        assert data['in_progress'] == [overdue.id]
+        assert data['overdue'] == [overdue.id]
+        assert data['completed'] == [done.id]
+        # В блоке по человеку задача попадает в одну категорию
+        assert data['self_tasks']['overdue'] == [overdue.id]
+        assert data['self_tasks']['in_progress'] == []
+        assert data['self_tasks']['completed'] == [done.id]
+        assert data['team'][0]['tasks']['due_today'] == [today.id]
+        assert data['other_tasks']['waiting'] == [waiting.id]
+
+    def test_query_count_is_constant(self, db_session, count_queries, status_id):
+        from services.dashboard_service import get_daily_standup_data
+        mate_id = create_contact({'last_name': 'Коллега'}).id
+        toggle_team(mate_id)
+
+        def seed(n):
+            for i in range(n):
+                create_task({'title': f'T{n}_{i}', 'assignee_id': mate_id,
+                             'status_id': status_id('В работе'), 'due_date': '2020-01-01'})
+            db_session.expunge_all()
+
+        seed(2)
+        get_daily_standup_data()  # прогрев кэша справочников
+        small = count_queries(get_daily_standup_data)
+        seed(20)
+        large = count_queries(get_daily_standup_data)
+        assert small == large
+
+
+class TestOneOnOnePrep:
+
+    def test_project_progress_counts(self, db_session, status_id):
+        from services.dashboard_service import get_one_on_one_prep_data
+        busy = create_project({'title': 'Загруженный'})
+        calm = create_project({'title': 'Спокойный'})
+        create_project({'title': 'Пустой'})
+        create_task({'title': 'A', 'project_id': busy.id, 'status_id': status_id('В работе'), 'due_date': '2020-01-01'})
+        create_task({'title': 'B', 'project_id': busy.id})
+        create_task({'title': 'C', 'project_id': calm.id, 'status_id': status_id('Готово')})
+
+        progress = get_one_on_one_prep_data()['projects_progress']
+        assert progress == [
+            {'id': busy.id, 'title': 'Загруженный', 'total_tasks': 2, 'done_tasks': 0,
+             'active_tasks': 2, 'overdue_tasks': 1, 'progress_pct': 0},
+            {'id': calm.id, 'title': 'Спокойный', 'total_tasks': 1, 'done_tasks': 1,
+             'active_tasks': 0, 'overdue_tasks': 0, 'progress_pct': 100},
+        ]
+
+    def test_history_is_summary_with_counts(self, db_session):
+        from services.dashboard_service import get_one_on_one_prep_data
+        from services.meeting_service import create_meeting, add_note, add_action_item, update_action_item
+        from services.lookup_service import meeting_type_id
+        c = create_contact({'last_name': 'Руководитель'})
+        m = create_meeting({'title': 'Встреча 1-1', 'date': '2020-01-01', 'type_id': meeting_type_id('1-1'),
+                            'participant_ids': [c.id], 'summary': 'Договорились'})
+        add_note(m.id, {'text': 'Заметка'})
+        add_action_item(m.id, {'text': 'Сделать'})
+        update_action_item(add_action_item(m.id, {'text': 'Сделано'}).id, {'is_done': True})
+
+        [history] = get_one_on_one_prep_data()['past_one_on_ones']
+        assert history['title'] == 'Встреча 1-1'
+        assert history['type']['name'] == '1-1'
+        assert history['has_summary'] is True
+        assert (history['participants_count'], history['meeting_notes_count'],
+                history['action_items_count'], history['action_items_done']) == (1, 1, 2, 1)
+        assert 'meeting_notes' not in history and 'action_items' not in history
+
+    def test_query_count_is_constant(self, db_session, count_queries, status_id):
+        from services.dashboard_service import get_one_on_one_prep_data
+
+        def seed(n):
+            for i in range(n):
+                p = create_project({'title': f'P{n}_{i}'})
+                create_task({'title': f'T{n}_{i}', 'project_id': p.id,
+                             'status_id': status_id('В работе'), 'due_date': '2020-01-01'})
+            db_session.expunge_all()
+
+        seed(2)
+        get_one_on_one_prep_data()  # прогрев кэша справочников
+        small = count_queries(get_one_on_one_prep_data)
+        seed(20)
+        large = count_queries(get_one_on_one_prep_data)
+        assert small == large
+
+
+class TestMeetingList:
+
+    def test_summary_counts_and_participants(self, db_session):
+        from services.meeting_service import get_meeting_list, add_note, add_action_item, create_meeting
+        c = create_contact({'last_name': 'Участник'})
+        t = create_task({'title': 'Связанная'})
+        m = create_meeting({'title': 'Планёрка', 'date': '2025-06-15', 'participant_ids': [c.id], 'task_ids': [t.id]})
+        add_note(m.id, {'text': 'Заметка'})
+        add_action_item(m.id, {'text': 'Действие'})
+
+        [summary] = get_meeting_list()
+        assert summary['participants'] == [{'id': c.id, 'last_name': 'Участник', 'first_name': None,
+                                            'color': c.contact_type.render_color}]
+        assert (summary['participants_count'], summary['related_tasks_count'],
+                summary['meeting_notes_count'], summary['action_items_count']) == (1, 1, 1, 1)
+        assert 'agenda' not in summary and 'related_tasks' not in summary
+
+    def test_filters_by_type_and_date_range(self, db_session):
+        from services.meeting_service import get_meeting_list, create_meeting
+        from services.lookup_service import meeting_type_id
+        daily = meeting_type_id('Дейлик')
+        create_meeting({'title': 'Дейлик 1', 'date': '2025-06-10', 'type_id': daily})
+        create_meeting({'title': 'Дейлик 2', 'date': '2025-06-20', 'type_id': daily})
+        create_meeting({'title': 'Другая', 'date': '2025-06-15'})
+
+        assert [m['title'] for m in get_meeting_list({'type_id': daily})] == ['Дейлик 2', 'Дейлик 1']
+        from datetime import date
+        in_range = get_meeting_list({'date_from': date(2025, 6, 12), 'date_to': date(2025, 6, 20)})
+        assert [m['title'] for m in in_range] == ['Дейлик 2', 'Другая']
+
+    def test_cursor_pages_cover_list_in_order(self, db_session):
+        from services.meeting_service import get_meeting_list, get_meetings_page, create_meeting
+        for day, at in [('2025-06-15', '10:00'), ('2025-06-15', None), ('2025-06-15', '09:00'),
+                        ('2025-06-14', '12:00'), ('2025-06-16', None)]:
+            create_meeting({'date': day, 'time': at})
+
+        expected = [m['id'] for m in get_meeting_list()]
+        seen, cursor = [], None
+        while True:
+            page = get_meetings_page(cursor=cursor, limit=2)
+            seen.extend(m['id'] for m in page['items'])
+            if not page['has_more']:
+                break
+            cursor = page['next_cursor']
+        assert seen == expected
+
+    def test_list_query_count_is_constant(self, db_session, count_queries):
+        from services.meeting_service import get_meeting_list, create_meeting, add_note
+        c = create_contact({'last_name': 'Участник'})
+
+        def seed(n):
+            for i in range(n):
+                m = create_meeting({'title': f'M{n}_{i}', 'participant_ids': [c.id]})
+                add_note(m.id, {'text': 'Заметка'})
+
+        seed(2)
+        small = count_queries(get_meeting_list)
+        seed(20)
+        large = count_queries(get_meeting_list)
+        assert small == large
+
+
+class TestChangeEvents:
+
+    @staticmethod
+    def _record(entities=None, sync=False):
+        from services.change_events import subscribe
+        received = []
+        subscribe(received.extend, entities=entities, sync=sync)
+        return received
+
+    def test_task_lifecycle_events(self, db_session):
+        from services.change_events import unsubscribe, drain
+        received = self._record(entities=('task',))
+        try:
+            t = create_task({'title': 'Событие', 'tags': ['cdc']})
+            update_task(t.id, {'title': 'Переименована'})
+            delete_task(t.id)
+            drain(timeout=5)
+        finally:
+            unsubscribe(received.extend)
+
+        ops = [(e.op, e.entity_id) for e in received]
+        assert ops == [('create', t.id), ('update', t.id), ('delete', t.id)]
+        assert {'title', 'tags'} <= set(received[0].fields)
+        assert 'title' in received[1].fields and 'tags' not in received[1].fields
+
+    def test_child_changes_are_parent_updates(self, db_session):
+        from services.change_events import unsubscribe
+        t = create_task({'title': 'С комментарием'})
+        received = self._record(sync=True)
+        try:
+            add_comment_to_task(t.id, 'Комментарий')
+        finally:
+            unsubscribe(received.extend)
+        assert [e.to_dict() for e in received if e.entity == 'task'] == [
+            {'entity': 'task', 'id': t.id, 'op': 'update', 'fields': ['comments']}
+        ]
+
+    def test_flushes_in_one_transaction_merge(self, db_session):
+        from services.change_events import unsubscribe
+        received = self._record(entities=('project',), sync=True)
+        try:
+            p = Project(title='Черновик')
+            db_session.add(p)
+            db_session.flush()
+            p.status = 'Archived'
+            db_session.commit()
+        finally:
+            unsubscribe(received.extend)
+        assert len(received) == 1
+        assert received[0].op == 'create' and {'title', 'status'} <= set(received[0].fields)
+
+    def test_rollback_publishes_nothing(self, db_session):
+        from services.change_events import unsubscribe
+        received = self._record(sync=True)
+        try:
+            db_session.add(Task(title='Откатится', status_id=TaskStatus.query.first().id))
+            db_session.flush()
+            db_session.rollback()
+        finally:
+            unsubscribe(received.extend)
+        assert received == []
+
+    def test_failing_subscriber_does_not_break_commit(self, db_session, caplog):
+        from services.change_events import subscribe, unsubscribe
+
+        def broken(events):
+            raise RuntimeError('сбой подписчика')
+
+        subscribe(broken, sync=True)
+        try:
+            t = create_task({'title': 'Сохранится'})
+        finally:
+            unsubscribe(broken)
+        assert get_task_by_id(t.id).title == 'Сохранится'
+        # Ошибка уходит в лог с трассировкой
+        record = next(r for r in caplog.records if r.name == 'services.change_events')
+        assert 'broken' in record.getMessage() and record.exc_info[0] is RuntimeError
+
+
+class TestEventStream:
+
+    def test_task_change_carries_compact_payload(self, db_session):
+        from services.change_events import drain
+        from services.event_stream import get_event_log, events_since
+        drain(timeout=5)
+        start = get_event_log().last_event_id
+        t = create_task({'title': 'В потоке'})
+        drain(timeout=5)
+
+        result = events_since(start)
+        assert result['reset'] is False
+        [task_event] = [e for e in result['events'] if e['type'] == 'task']
+        assert task_event['data']['op'] == 'create'
+        assert task_event['data']['task']['title'] == 'В потоке'
+        assert 'description' not in task_event['data']['task']
+        dashboard = [e for e in result['events'] if e['type'] == 'dashboard']
+        assert 'priority_tasks' in dashboard[0]['data']['sections']
+        assert result['last_event_id'] == result['events'][-1]['id']
+
+        delete_task(t.id)
+        drain(timeout=5)
+        deleted = [e for e in events_since(result['last_event_id'])['events'] if e['type'] == 'task']
+        assert deleted[0]['data'] == {'op': 'delete', 'id': t.id, 'fields': [], 'task': None}
+
+    def test_view_log_does_not_refresh_dashboard(self, db_session):
+        from core.models import ViewLog
+        from services.change_events import drain
+        from services.event_stream import get_event_log, events_since
+        t = create_task({'title': 'Открыта'})
+        drain(timeout=5)
+        start = get_event_log().last_event_id
+        db_session.add(ViewLog(entity_type='task', entity_id=t.id))
+        db_session.commit()
+        drain(timeout=5)
+        assert events_since(start)['events'] == []
+
+    def test_meeting_change_carries_summary(self, db_session):
+        from services.change_events import drain
+        from services.event_stream import get_event_log, events_since
+        from services.meeting_service import create_meeting, add_note
+        m = create_meeting({'title': 'Ретро'})
+        drain(timeout=5)
+        start = get_event_log().last_event_id
+        add_note(m.id, {'text': 'Заметка'})
+        drain(timeout=5)
+
+        [event] = [e for e in events_since(start)['events'] if e['type'] == 'meeting']
+        assert event['data']['fields'] == ['meeting_notes']
+        assert event['data']['meeting']['meeting_notes_count'] == 1
+
+    def test_unknown_or_evicted_id_requests_reset(self):
+        from services.event_stream import EventLog
+        log = EventLog(size=2)
+        start = log.last_event_id
+        log.append([('task', {'id': i}) for i in range(3)])
+
+        assert log.since(log.parse(start)) == ([], True)
+        events, reset = log.since(log.parse(start) + 1)
+        assert not reset and [e['data']['id'] for e in events] == [1, 2]
+        assert log.parse('другая-эпоха-5') is None